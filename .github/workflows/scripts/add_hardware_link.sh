@@ -2,7 +2,8 @@
 
 # Script para agregar enlace a hardware.html en el index.html de Sphinx
 # Ubicación: .github/workflows/scripts/add_hardware_link.sh
-# Uso: .github/workflows/scripts/add_hardware_link.sh
+# Uso: .github/workflows/scripts/add_hardware_link.sh [DIRECTORIO_DOCS]
+#      (por defecto docs/; build_site.py pasa su directorio de staging)
 
 set -e  # Salir si hay algún error
 
@@ -12,7 +13,8 @@ echo "🔗 Agregando enlace a documentación de hardware en Sphinx..."
 PROJECT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../../.." && pwd)"
 cd "$PROJECT_DIR"
 
-INDEX_FILE="docs/index.html"
+DOCS_PATH="${1:-docs}"
+INDEX_FILE="$DOCS_PATH/index.html"
 
 # Verificar que existe el index.html de Sphinx
 if [ ! -f "$INDEX_FILE" ]; then
@@ -22,8 +24,8 @@ if [ ! -f "$INDEX_FILE" ]; then
 fi
 
 # Verificar que hardware.html existe
-if [ ! -f "docs/hardware.html" ]; then
-    echo "⚠️  Advertencia: docs/hardware.html no existe"
+if [ ! -f "$DOCS_PATH/hardware.html" ]; then
+    echo "⚠️  Advertencia: $DOCS_PATH/hardware.html no existe"
     exit 0
 fi
 
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks de los generadores de documentación con corpus sintéticos.
+
+Mide tiempo de pared y pico de memoria de las rutas críticas:
+
+- scan_copied_files: árbol de hardware creado en disco, con distintas profundidades;
+- generate_html_page: hardware.html para una estructura armada desde un manifiesto;
+- parse_readme_md: READMEs con cientos de secciones, tablas e imágenes;
+- markdown_table_to_latex: tablas Markdown grandes;
+- render_latex: muchos READMEs contra la plantilla del product brief.
+
+El tiempo es el mínimo de varias repeticiones y se compara normalizado por una
+medición de calibración, para que la línea base sirva en máquinas distintas.
+La calibración es Python puro: solo normaliza casos limitados por CPU. El
+tiempo de los casos de disco (scan_copied_files) y de los que tardan menos de
+MIN_GATED_SECONDS se informa pero no hace fallar la ejecución.
+La memoria es el pico de tracemalloc en una ejecución aparte (solo
+asignaciones de Python, determinista entre máquinas).
+
+Las líneas base se guardan en benchmark_baselines.json junto a este script y
+se graban con el mismo Python que usa CI (3.10). Termina con código 1 si algún
+caso supera la línea base por más del umbral.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import copy_hardware_docs
+from benchmark_hardware_scan import create_tree, synthetic_manifest
+from copy_hardware_docs import BASE_DIR, build_structure, finish_stats, new_stats, scan_copied_files
+
+DOCUMENTATION_DIR = BASE_DIR / "software" / "documentation"
+if str(DOCUMENTATION_DIR) not in sys.path:
+    sys.path.insert(0, str(DOCUMENTATION_DIR))
+
+from benchmark_parse import make_readme, make_table  # noqa: E402
+from generate_pdf import markdown_table_to_latex, parse_readme_md, render_latex  # noqa: E402
+
+BASELINE_FILE = Path(__file__).resolve().parent / "benchmark_baselines.json"
+BASELINE_VERSION = 1
+BRIEF_TEMPLATE = DOCUMENTATION_DIR / "product_brief_template.tex"
+DEFAULT_TIME_THRESHOLD = 0.5
+DEFAULT_MEMORY_THRESHOLD = 0.2
+# Por debajo de estas diferencias absolutas no se considera regresión (ruido)
+MIN_TIME_DELTA = 0.02
+MIN_MEMORY_DELTA_KB = 256
+# Casos más cortos que esto son ruido del runner: su tiempo solo se informa
+MIN_GATED_SECONDS = 0.1
+
+
+@contextlib.contextmanager
+def scan_case(size, depth):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "hardware"
+        create_tree(root, size, depth)
+        manifest_path = Path(tmp) / "hardware_manifest.json"
+        # El pico con varios hilos depende de cuántos lotes hay en vuelo: la
+        # memoria se mide con un solo hilo para que sea determinista
+        yield (lambda: scan_copied_files(use_cache=False, manifest_path=manifest_path, root_dir=root),
+               lambda: scan_copied_files(use_cache=False, manifest_path=manifest_path, root_dir=root,
+                                         workers=1))
+
+
+@contextlib.contextmanager
+def html_case(size, depth):
+    stats = new_stats()
+    structure = build_structure(synthetic_manifest(size, depth), stats=stats)
+    finish_stats(stats)
+    structure['stats'] = stats
+    original = copy_hardware_docs.DOCS_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        copy_hardware_docs.set_docs_dir(tmp)
+        try:
+            yield lambda: copy_hardware_docs.generate_html_page(structure, build_time=0)
+        finally:
+            copy_hardware_docs.set_docs_dir(original)
+
+
+@contextlib.contextmanager
+def parse_case(size):
+    with tempfile.TemporaryDirectory() as tmp:
+        readme = Path(tmp) / "README.md"
+        readme.write_text(make_readme(size), encoding='utf-8')
+        yield lambda: parse_readme_md(str(readme), epoch=0)
+
+
+@contextlib.contextmanager
+def table_case(size):
+    table = make_table(random.Random(0), size)
+    yield lambda: markdown_table_to_latex(table)
+
+
+@contextlib.contextmanager
+def render_case(size):
+    with tempfile.TemporaryDirectory() as tmp:
+        readmes = []
+        for i in range(size):
+            readme = Path(tmp) / f"README_{i}.md"
+            readme.write_text(make_readme(50, seed=i), encoding='utf-8')
+            readmes.append(parse_readme_md(str(readme), epoch=0))
+        output = Path(tmp) / "brief.tex"
+        yield lambda: [render_latex(str(BRIEF_TEMPLATE), str(output), data) for data in readmes]
+
+
+# nombre: (fábrica del caso, argumentos extra); el tamaño es el primer argumento
+CASES = {
+    'scan_copied_files[depth=2]': (scan_case, {'depth': 2}),
+    'scan_copied_files[depth=6]': (scan_case, {'depth': 6}),
+    'generate_html_page[depth=2]': (html_case, {'depth': 2}),
+    'generate_html_page[depth=6]': (html_case, {'depth': 6}),
+    'parse_readme_md': (parse_case, {}),
+    'markdown_table_to_latex': (table_case, {}),
+    'render_latex': (render_case, {}),
+}
+# Limitados por disco e hilos: la calibración no los normaliza, solo se informa el tiempo
+REPORT_ONLY_TIME = {'scan_copied_files[depth=2]', 'scan_copied_files[depth=6]'}
+
+# Tamaños por perfil: archivos, secciones, filas o READMEs según el caso
+PROFILES = {
+    'quick': {
+        'scan_copied_files[depth=2]': [1_000, 10_000],
+        'scan_copied_files[depth=6]': [10_000],
+        'generate_html_page[depth=2]': [1_000, 10_000],
+        'generate_html_page[depth=6]': [10_000],
+        'parse_readme_md': [500, 20_000],
+        'markdown_table_to_latex': [1_000, 100_000],
+        'render_latex': [100, 1_000],
+    },
+    'full': {
+        'scan_copied_files[depth=2]': [100_000, 1_000_000],
+        'scan_copied_files[depth=6]': [100_000],
+        'generate_html_page[depth=2]': [100_000, 1_000_000],
+        'generate_html_page[depth=6]': [100_000],
+        'parse_readme_md': [5_000, 50_000],
+        'markdown_table_to_latex': [10_000, 100_000],
+        'render_latex': [1_000],
+    },
+}
+DEFAULT_REPEAT = {'quick': 3, 'full': 1}
+
+
+def calibrate(repeat=30):
+    """Segundos de una carga fija de Python puro (referencia de velocidad de la máquina)
+
+    Muchas repeticiones cortas: el mínimo es estable aunque la máquina esté ocupada.
+    """
+    def workload():
+        data = {}
+        for i in range(50_000):
+            data[f"key{i % 5000}"] = data.get(f"key{i % 5000}", 0) + i * i
+        return sorted(data.items())
+
+    return min(timed(workload) for _ in range(repeat))
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def measure(name, size, repeat, with_memory=True):
+    """Tiempo mínimo y pico de memoria (KB) de un caso; la preparación no se mide"""
+    factory, kwargs = CASES[name]
+    # Los generadores imprimen progreso; no se mezcla con la tabla de resultados
+    with factory(size, **kwargs) as runs, contextlib.redirect_stdout(io.StringIO()):
+        # Un caso entrega una función, o (función para el tiempo, función para la memoria)
+        run, memory_run = runs if isinstance(runs, tuple) else (runs, runs)
+        seconds = min(timed(run) for _ in range(repeat))
+        peak_kb = None
+        if with_memory:
+            tracemalloc.start()
+            try:
+                memory_run()
+                peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+            finally:
+                tracemalloc.stop()
+    return {'seconds': round(seconds, 6), 'peak_kb': peak_kb}
+
+
+def load_baselines(path):
+    """Líneas base guardadas; vacío si no existen o son de otra versión"""
+    try:
+        baselines = json.loads(Path(path).read_text(encoding='utf-8'))
+        if baselines.get('version') == BASELINE_VERSION:
+            return baselines
+    except (OSError, ValueError):
+        pass
+    return {'version': BASELINE_VERSION, 'cases': {}}
+
+
+def gates_time(name, expected):
+    """Si el tiempo de un caso puede marcar una regresión"""
+    return name not in REPORT_ONLY_TIME and expected >= MIN_GATED_SECONDS
+
+
+def compare(name, result, baseline, calibration, args):
+    """Lista de regresiones de un caso respecto a su línea base"""
+    regressions = []
+    if not baseline:
+        return regressions
+    # Tiempo esperado en esta máquina según la relación con la calibración
+    expected = baseline['normalized'] * calibration
+    if gates_time(name, expected) and result['seconds'] > expected * (1 + args.time_threshold) and \
+            result['seconds'] - expected > MIN_TIME_DELTA:
+        regressions.append(f"tiempo {result['seconds'] / expected - 1:+.0%}")
+    if result['peak_kb'] is not None and baseline.get('peak_kb') is not None:
+        allowed = baseline['peak_kb'] * (1 + args.memory_threshold)
+        if result['peak_kb'] > allowed and result['peak_kb'] - baseline['peak_kb'] > MIN_MEMORY_DELTA_KB:
+            regressions.append(f"memoria {result['peak_kb'] / baseline['peak_kb'] - 1:+.0%}")
+    return regressions
+
+
+def format_delta(value, reference):
+    return f"{value / reference - 1:+.0%}" if reference else "-"
+
+
+def parse_args(argv=None):
+    """Leer las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Benchmarks de los generadores de documentación con corpus sintéticos"
+    )
+    parser.add_argument(
+        '--profile', choices=list(PROFILES), default='quick',
+        help="tamaños a medir: quick (segundos) o full (hasta 1M de archivos)"
+    )
+    parser.add_argument(
+        '--cases', nargs='+', choices=list(CASES),
+        help="medir solo estos casos (default: todos)"
+    )
+    parser.add_argument(
+        '--repeat', type=int,
+        help="repeticiones por caso; se toma el mínimo (default: 3 en quick, 1 en full)"
+    )
+    parser.add_argument(
+        '--no-memory', action='store_true',
+        help="no medir el pico de memoria (la ejecución con tracemalloc es más lenta)"
+    )
+    parser.add_argument(
+        '--baseline', default=str(BASELINE_FILE),
+        help=f"archivo de líneas base (default: {BASELINE_FILE.name})"
+    )
+    parser.add_argument(
+        '--update-baseline', action='store_true',
+        help="guardar los resultados como nueva línea base en lugar de comparar"
+    )
+    parser.add_argument(
+        '--time-threshold', type=float, default=DEFAULT_TIME_THRESHOLD,
+        help=f"regresión de tiempo tolerada (default: {DEFAULT_TIME_THRESHOLD:.0%})"
+    )
+    parser.add_argument(
+        '--memory-threshold', type=float, default=DEFAULT_MEMORY_THRESHOLD,
+        help=f"regresión de memoria tolerada (default: {DEFAULT_MEMORY_THRESHOLD:.0%})"
+    )
+    parser.add_argument(
+        '--output', metavar='FILE',
+        help="guardar los resultados en un archivo JSON"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal"""
+    args = parse_args(argv)
+    repeat = args.repeat or DEFAULT_REPEAT[args.profile]
+    baselines = load_baselines(args.baseline)
+    keys = [(name, size) for name, sizes in PROFILES[args.profile].items()
+            if not args.cases or name in args.cases for size in sizes]
+
+    # Se calibra antes y después de cada caso y se usa el mínimo de todas las mediciones
+    calibration = calibrate()
+    results = {}
+    for name, size in keys:
+        print(f"   ⏳ {name}/{size}...", flush=True)
+        results[f"{name}/{size}"] = measure(name, size, repeat, with_memory=not args.no_memory)
+        calibration = min(calibration, calibrate())
+
+    print(f"📊 Benchmarks ({args.profile}), calibración: {calibration * 1000:.1f} ms, "
+          f"Python {platform.python_version()}")
+    print(f"{'caso':<30} {'tamaño':>9} {'tiempo (ms)':>12} {'Δ':>6} {'pico (KB)':>10} {'Δ':>6}  estado")
+    failed = []
+    for name, size in keys:
+        key = f"{name}/{size}"
+        result = results[key]
+        result['normalized'] = round(result['seconds'] / calibration, 4)
+        baseline = baselines['cases'].get(key)
+        regressions = [] if args.update_baseline else compare(name, result, baseline, calibration, args)
+        if regressions:
+            failed.append(key)
+        status = ("❌ " + ", ".join(regressions) if regressions
+                  else "sin línea base" if not baseline
+                  else "✅" if gates_time(name, baseline['normalized'] * calibration)
+                  else "✅ (tiempo informativo)")
+        peak = f"{result['peak_kb']:>10}" if result['peak_kb'] is not None else f"{'-':>10}"
+        time_delta = format_delta(result['normalized'], baseline and baseline['normalized'])
+        memory_delta = format_delta(result['peak_kb'] or 0, baseline and baseline.get('peak_kb')) \
+            if result['peak_kb'] is not None else "-"
+        print(f"{name:<30} {size:>9} {result['seconds'] * 1000:>12.1f} {time_delta:>6} {peak} "
+              f"{memory_delta:>6}  {status}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({'calibration': calibration, 'cases': results}, indent=2),
+                                     encoding='utf-8')
+
+    if args.update_baseline:
+        baselines['cases'].update(results)
+        baselines['cases'] = dict(sorted(baselines['cases'].items()))
+        tmp = Path(args.baseline).with_name(f".{Path(args.baseline).name}.tmp")
+        tmp.write_text(json.dumps(baselines, indent=1) + "\n", encoding='utf-8')
+        os.replace(tmp, args.baseline)
+        print(f"💾 Líneas base actualizadas: {args.baseline} ({len(results)} casos)")
+        return 0
+
+    if failed:
+        print(f"❌ {len(failed)} caso(s) superan el umbral: {', '.join(failed)}")
+        return 1
+    print("✅ Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
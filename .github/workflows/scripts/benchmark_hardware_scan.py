@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria de la estructura de hardware con árboles sintéticos.
+
+Para cada tamaño se lanza un proceso aparte que arma un manifiesto como el
+que lee scan_copied_files(), construye la estructura y cuenta las
+estadísticas de hardware.html; se reporta el pico de RSS del proceso. El
+árbol HTML se genera en streaming, así que no cambia el pico.
+
+- record: build_structure() con FileRecord y estadísticas en el mismo recorrido;
+- legacy: un dict de siete campos por archivo y calculate_stats() como
+  segunda pasada (implementación anterior, se conserva aquí como referencia).
+
+Con --on-disk el árbol se crea de verdad (archivos dispersos de tamaño
+fijo) y se mide scan_copied_files() completo en lugar del manifiesto.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from copy_hardware_docs import (
+    build_structure, finish_stats, format_size, get_file_type, iter_files, join_relative,
+    new_manifest, new_stats, scan_copied_files,
+)
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+FILES_PER_FOLDER = 100
+FOLDERS_PER_FOLDER = 100
+EXTENSIONS = ('.kicad_sym', '.kicad_mod', '.step', '.pdf', '.png', '.json', '.md')
+BASE_MTIME_NS = 1_700_000_000 * 10**9
+
+
+def synthetic_dir(folder, depth):
+    """Ruta de la carpeta número folder: lib_0001/part_000123 con depth=2
+
+    Cada nivel extra agrega un lib_ intermedio que agrupa 100 carpetas más.
+    """
+    parts = [f"part_{folder:06d}"]
+    group = folder
+    for _ in range(depth - 1):
+        group //= FOLDERS_PER_FOLDER
+        parts.append(f"lib_{group:04d}")
+    return "/".join(reversed(parts))
+
+
+def synthetic_layout(count, depth=2):
+    """(carpeta, nombre, tamaño) de count archivos: 100 por carpeta, depth niveles"""
+    for i in range(count):
+        relative_dir = synthetic_dir(i // FILES_PER_FOLDER, depth)
+        yield relative_dir, f"part_{i:07d}{EXTENSIONS[i % len(EXTENSIONS)]}", 1024 + i % 4096
+
+
+def synthetic_manifest(count, depth=2):
+    """Manifiesto con la forma de hardware_manifest.json, sin tocar disco"""
+    manifest = new_manifest()
+    directories = manifest['directories']
+
+    def directory(relative):
+        if relative not in directories:
+            directories[relative] = {'mtime_ns': BASE_MTIME_NS, 'files': [], 'folders': []}
+            if relative:
+                parent, _, name = relative.rpartition('/')
+                directory(parent)['folders'].append(name)
+        return directories[relative]
+
+    directory('')
+    for i, (relative_dir, name, size) in enumerate(synthetic_layout(count, depth)):
+        directory(relative_dir)['files'].append(name)
+        manifest['files'][join_relative(relative_dir, name)] = {
+            'size': size,
+            'mtime_ns': BASE_MTIME_NS + i,
+            'type': get_file_type(os.path.splitext(name)[1]),
+            'sha256': f"{i:064x}",
+        }
+    return manifest
+
+
+def create_tree(root, count, depth=2):
+    """Crear el árbol sintético en disco con archivos dispersos"""
+    root.mkdir(parents=True, exist_ok=True)
+    for relative_dir, name, size in synthetic_layout(count, depth):
+        folder = root / relative_dir
+        folder.mkdir(parents=True, exist_ok=True)
+        with open(folder / name, 'wb') as f:
+            f.truncate(size)
+
+
+def legacy_build_structure(manifest, relative_dir=''):
+    record = manifest['directories'][relative_dir]
+    node = {'files': [], 'folders': {}}
+    for name in record['files']:
+        relative = join_relative(relative_dir, name)
+        entry = manifest['files'][relative]
+        extension = Path(name).suffix.lower()
+        node['files'].append({
+            'name': name,
+            'size': entry['size'],
+            'size_human': format_size(entry['size']),
+            'modified': datetime.fromtimestamp(entry['mtime_ns'] / 1e9).strftime('%Y-%m-%d %H:%M:%S'),
+            'extension': extension,
+            'type': get_file_type(extension),
+            'path': str(Path('hardware') / relative),
+            'sha256': entry.get('sha256'),
+        })
+    for name in record['folders']:
+        node['folders'][name] = legacy_build_structure(manifest, join_relative(relative_dir, name))
+    return node
+
+
+def legacy_calculate_stats(structure):
+    stats = new_stats()
+    for file_info in iter_files(structure):
+        stats['total_files'] += 1
+        stats['total_size_bytes'] += file_info['size']
+        stats['images'] += file_info['type'] == 'image'
+        stats['documents'] += file_info['type'] == 'document'
+    return finish_stats(stats)
+
+
+def run_child(count, impl, on_disk):
+    """Medir un tamaño en este proceso e imprimir el resultado como JSON"""
+    start = time.perf_counter()
+    if on_disk:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "hardware"
+            create_tree(root, count)
+            # El recorrido cuenta desde aquí: la creación del árbol no usa memoria extra
+            start = time.perf_counter()
+            structure = scan_copied_files(use_cache=False, manifest_path=Path(tmp) / "manifest.json",
+                                          with_hash=False, root_dir=root)
+            stats = structure['stats']
+    else:
+        manifest = synthetic_manifest(count)
+        if impl == 'legacy':
+            structure = legacy_build_structure(manifest)
+            stats = legacy_calculate_stats(structure)
+        else:
+            stats = new_stats()
+            structure = build_structure(manifest, stats=stats)
+            finish_stats(stats)
+
+    print(json.dumps({
+        'files': stats['total_files'],
+        'seconds': time.perf_counter() - start,
+        # ru_maxrss está en KB en Linux
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+
+def measure(count, impl, on_disk):
+    command = [sys.executable, __file__, '--child', str(count), '--impl', impl]
+    if on_disk:
+        command.append('--on-disk')
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def parse_args(argv=None):
+    """Leer las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Pico de RSS de la estructura de hardware para árboles sintéticos"
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+        help=f"número de archivos por árbol (default: {' '.join(map(str, DEFAULT_SIZES))})"
+    )
+    parser.add_argument(
+        '--impl', choices=('record', 'legacy', 'both'), default='both',
+        help="implementación a medir (default: both)"
+    )
+    parser.add_argument(
+        '--on-disk', action='store_true',
+        help="crear el árbol en disco y medir scan_copied_files() (solo record)"
+    )
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal"""
+    args = parse_args(argv)
+    if args.child is not None:
+        run_child(args.child, args.impl, args.on_disk)
+        return 0
+
+    impls = ['legacy', 'record'] if args.impl == 'both' and not args.on_disk else [
+        'record' if args.on_disk else args.impl]
+    baseline = {impl: measure(0, impl, args.on_disk)['peak_rss_kb'] for impl in impls}
+
+    print(f"📊 Pico de RSS ({'árbol en disco' if args.on_disk else 'manifiesto sintético'}, "
+          f"línea base del intérprete: {max(baseline.values()) / 1024:.0f} MB)")
+    print(f"{'archivos':>10} {'impl':>7} {'RSS (MB)':>9} {'B/archivo':>10} {'tiempo (s)':>11}")
+    for count in args.sizes:
+        for impl in impls:
+            result = measure(count, impl, args.on_disk)
+            per_file = (result['peak_rss_kb'] - baseline[impl]) * 1024 / max(count, 1)
+            print(f"{count:>10} {impl:>7} {result['peak_rss_kb'] / 1024:>9.0f} {per_file:>10.0f} "
+                  f"{result['seconds']:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
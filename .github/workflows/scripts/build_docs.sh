@@ -34,11 +34,24 @@ source "$TEMP_VENV/bin/activate"
 # Instalar dependencias
 echo " Instalando dependencias..."
 pip install --upgrade pip --quiet
-pip install Jinja2 --quiet
+pip install Jinja2 Pillow brotli --quiet
 
 # Ejecutar script de copia
 echo "📋 Ejecutando script de copia..."
-python3 .github/workflows/scripts/copy_hardware_docs.py
+python3 .github/workflows/scripts/copy_hardware_docs.py "$@"
+
+# Enlace a hardware.html en el index.html de Sphinx; va antes de precomprimir y
+# de --record, que deben ver el index.html final
+bash .github/workflows/scripts/add_hardware_link.sh
+
+# Índice de búsqueda particionado (Sphinx + archivos de hardware)
+echo "🔎 Generando índice de búsqueda..."
+python3 .github/workflows/scripts/build_search_index.py
+
+# Nombres con hash para _static/ e _images/ y archivos precomprimidos
+echo "🔏 Generando assets con hash y archivos .gz/.br..."
+python3 .github/workflows/scripts/fingerprint_assets.py
+python3 .github/workflows/scripts/publish_docs.py --record
 
 # Limpiar entorno virtual temporal
 echo " Limpiando entorno virtual temporal..."
@@ -51,6 +64,10 @@ if [ -f "docs/hardware.html" ]; then
     echo "📄 Archivos generados:"
     echo "   - docs/hardware.html (página de hardware)"
     echo "   - docs/hardware/ (archivos copiados)"
+    echo "   - docs/hardware_manifest.json (metadatos de archivos)"
+    echo "   - docs/hardware_thumbs/ (miniaturas y vistas previas)"
+    echo "   - docs/search_index/ (índice de búsqueda por prefijo)"
+    echo "   - docs/asset_manifest.json (assets con hash y tamaños comprimidos)"
     
     # Mostrar estadísticas
     if [ -d "docs/hardware" ]; then
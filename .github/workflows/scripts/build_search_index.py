@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Script para generar un índice de búsqueda particionado para docs/.
+
+Combina el índice de Sphinx (docs/searchindex.js) con los archivos de
+hardware que devuelve scan_copied_files(), y lo reparte en archivos JSON
+pequeños por prefijo de término (docs/search_index/). El navegador solo
+descarga los fragmentos de los términos que se buscan, en lugar de todo
+searchindex.js antes de la primera consulta.
+"""
+
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+
+from copy_hardware_docs import (
+    BLOBS_DIR, DOCS_DIR, DOCS_HARDWARE_DIR, HARDWARE_DIR, MANIFEST_FILE, blob_name, get_file_link,
+    iter_files, reproducible_file_times, scan_copied_files, source_date_epoch, write_if_changed,
+)
+
+SPHINX_INDEX_FILE = DOCS_DIR / "searchindex.js"
+SEARCH_PAGE = DOCS_DIR / "search.html"
+SEARCH_INDEX_DIR = DOCS_DIR / "search_index"
+SEARCH_INDEX_VERSION = 1
+DEFAULT_PREFIX_LENGTH = 2
+
+# Mismos pesos que Scorer en searchtools.js de Sphinx
+TITLE_WEIGHT = 15
+TERM_WEIGHT = 5
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+SPHINX_SCRIPT_TAG = '<script src="searchindex.js"></script>'
+SHARDED_SCRIPT_TAG = '<script src="search_index/search.js"></script>'
+
+# Cliente del índice: reemplaza la carga de searchindex.js en search.html y
+# le entrega los resultados a la interfaz de búsqueda de Sphinx
+SEARCH_JS = r'''/* Generado por build_search_index.py: búsqueda sobre el índice particionado */
+(() => {
+  const ROOT = document.currentScript.src.replace(/[^/]*$/, "");
+  const BASE = ROOT.replace(/search_index\/$/, "");
+  const PARTIAL = 0.4;
+  const shards = {};
+  let meta = null;
+
+  const fetchJSON = (url) => fetch(url).then((r) => (r.ok ? r.json() : {}));
+  const loadMeta = () => meta || (meta = fetchJSON(ROOT + "meta.json"));
+  const loadShard = (name) => shards[name] || (shards[name] = fetchJSON(ROOT + name + ".json"));
+
+  // Igual que shard_name() en Python
+  const shardName = (term, length) =>
+    Array.from(term).slice(0, length)
+      .map((c) => (/[a-z0-9]/.test(c) ? c : "_" + c.codePointAt(0).toString(16)))
+      .join("");
+
+  async function scoreWord(word, info) {
+    const forms = new Set([word]);
+    if (typeof Stemmer === "function") forms.add(new Stemmer().stemWord(word));
+    const scores = new Map();
+    for (const form of forms) {
+      const prefix = shardName(form, info.prefix);
+      const names = info.shards.filter((name) => name.startsWith(prefix));
+      const loaded = await Promise.all(names.map(loadShard));
+      for (const shard of loaded) {
+        for (const term in shard) {
+          if (!term.startsWith(form)) continue;
+          const factor = term === form ? 1 : PARTIAL;
+          for (const [doc, weight] of shard[term]) {
+            scores.set(doc, Math.max(scores.get(doc) || 0, weight * factor));
+          }
+        }
+      }
+    }
+    return scores;
+  }
+
+  async function query(text) {
+    const info = await loadMeta();
+    const words = [...new Set(text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [])];
+    let total = null;
+    for (const word of words) {
+      const scores = await scoreWord(word, info);
+      if (total === null) {
+        total = scores;
+        continue;
+      }
+      // Todas las palabras deben aparecer en el documento
+      const merged = new Map();
+      for (const [doc, score] of scores) {
+        if (total.has(doc)) merged.set(doc, total.get(doc) + score);
+      }
+      total = merged;
+    }
+    return [...(total || new Map())]
+      .sort((a, b) => b[1] - a[1])
+      .map(([doc, score]) => {
+        const [url, title, kind, detail] = info.docs[doc];
+        return { url: BASE + url, title, kind, detail, score };
+      });
+  }
+
+  window.ShardedSearch = { query };
+  if (typeof Search === "undefined") return;
+
+  const gettext = typeof _ === "function" ? _ : (s) => s;
+  Search.hasIndex = () => true;
+  Search.query = (text) => {
+    query(text).then((results) => {
+      Search.stopPulse();
+      Search.title.innerText = gettext("Search Results");
+      for (const result of results) {
+        const item = document.createElement("li");
+        item.className = "kind-" + result.kind;
+        const link = item.appendChild(document.createElement("a"));
+        link.href = result.url;
+        link.textContent = result.title;
+        if (result.detail) {
+          const context = item.appendChild(document.createElement("p"));
+          context.className = "context";
+          context.textContent = result.detail;
+        }
+        Search.output.appendChild(item);
+      }
+      Search.status.innerText = results.length
+        ? gettext("Search finished, found ${resultCount} page(s) matching the search query.")
+            .replace("${resultCount}", results.length)
+        : gettext("Your search did not match any documents. Please make sure that all words are spelled correctly and that you've selected enough categories.");
+    });
+  };
+})();
+'''
+
+
+def tokenize(text):
+    """Términos en minúsculas de un texto (letras y números)"""
+    return [token for token in TOKEN_RE.findall(text.lower()) if token]
+
+
+def shard_name(term, length):
+    """Nombre de archivo del fragmento de un término (seguro para URLs)"""
+    return "".join(c if c.isascii() and c.isalnum() else f"_{ord(c):x}" for c in term[:length])
+
+
+def load_sphinx_index(index_file=None):
+    """Leer el índice que genera Sphinx (Search.setIndex({...}))"""
+    index_file = Path(index_file or SPHINX_INDEX_FILE)
+    if not index_file.exists():
+        print(f"   ⚠️  {index_file} no existe, se indexa solo el hardware")
+        return None
+    text = index_file.read_text(encoding='utf-8').strip()
+    start, end = text.index('(') + 1, text.rindex(')')
+    return json.loads(text[start:end])
+
+
+def add_postings(postings, term, doc, weight):
+    """Registrar un término para un documento conservando el mayor peso"""
+    if not term:
+        return
+    docs = postings.setdefault(term, {})
+    docs[doc] = max(docs.get(doc, 0), weight)
+
+
+def add_sphinx_documents(index, documents, postings):
+    """Páginas de Sphinx con sus términos (ya normalizados por Sphinx)"""
+    offset = len(documents)
+    for docname, title in zip(index['docnames'], index['titles']):
+        documents.append([f"{docname}.html", title, 'doc', ""])
+
+    for key, weight in (('terms', TERM_WEIGHT), ('titleterms', TITLE_WEIGHT)):
+        for term, docs in index.get(key, {}).items():
+            for doc in (docs if isinstance(docs, list) else [docs]):
+                add_postings(postings, term, offset + doc, weight)
+
+
+def scan_hardware(use_cache=True, docs_dir=None, file_times=None):
+    """Estructura de hardware desde scan_copied_files()
+
+    En modo --dedup no existe docs/hardware: se escanea hardware/ y los
+    enlaces apuntan al blob de cada contenido, igual que en hardware.html.
+    file_times son las fechas de git del modo reproducible: el escaneo vuelve
+    a guardar hardware_manifest.json y debe dejarlo igual que copy_hardware_docs.py.
+    """
+    docs_dir = Path(docs_dir or DOCS_DIR)
+    manifest_path = docs_dir / MANIFEST_FILE.name
+    if (docs_dir / DOCS_HARDWARE_DIR.name).exists():
+        return scan_copied_files(use_cache=use_cache, manifest_path=manifest_path,
+                                 root_dir=docs_dir / DOCS_HARDWARE_DIR.name, file_times=file_times)
+    if (docs_dir / BLOBS_DIR.name).exists():
+        structure = scan_copied_files(use_cache=use_cache, manifest_path=manifest_path,
+                                      root_dir=HARDWARE_DIR, trust_dir_mtime=False,
+                                      file_times=file_times)
+        for file_info in iter_files(structure):
+            if file_info.sha256:
+                file_info.blob = f"{BLOBS_DIR.name}/{blob_name(file_info.sha256, file_info.extension)}"
+        return structure
+    print("   ⚠️  No hay archivos de hardware publicados, se indexa solo Sphinx")
+    return None
+
+
+def add_hardware_documents(structure, documents, postings):
+    """Archivos de hardware: nombre como título, carpeta y tipo como texto"""
+    for file_info in iter_files(structure):
+        doc = len(documents)
+        folder = str(Path(file_info.path).parent)
+        detail = f"{folder} · {file_info.type} · {file_info.size_human}"
+        documents.append([get_file_link(file_info), file_info.name, 'hardware', detail])
+
+        for term in tokenize(file_info.name):
+            add_postings(postings, term, doc, TITLE_WEIGHT)
+        for term in tokenize(f"{folder} {file_info.type} {file_info.extension} hardware"):
+            add_postings(postings, term, doc, TERM_WEIGHT)
+
+
+def write_shards(documents, postings, prefix_length, index_dir=None):
+    """Escribir un JSON por prefijo, meta.json y el cliente search.js
+
+    Solo se reescriben los archivos cuyo contenido cambió y se eliminan los
+    fragmentos de prefijos que ya no existen.
+    """
+    index_dir = Path(index_dir or SEARCH_INDEX_DIR)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    shards = {}
+    for term in sorted(postings):
+        docs = postings[term]
+        shards.setdefault(shard_name(term, prefix_length), {})[term] = sorted(docs.items())
+
+    written = 0
+    for name, terms in shards.items():
+        written += write_if_changed(index_dir / f"{name}.json",
+                                    json.dumps(terms, ensure_ascii=False, separators=(',', ':')))
+
+    meta = {
+        'version': SEARCH_INDEX_VERSION,
+        'prefix': prefix_length,
+        'shards': sorted(shards),
+        'docs': documents,
+    }
+    write_if_changed(index_dir / "meta.json", json.dumps(meta, ensure_ascii=False, separators=(',', ':')))
+    write_if_changed(index_dir / "search.js", SEARCH_JS)
+
+    removed = 0
+    for stale in index_dir.glob("*.json"):
+        if stale.stem not in shards and stale.name != "meta.json":
+            stale.unlink()
+            removed += 1
+
+    sizes = [(index_dir / f"{name}.json").stat().st_size for name in shards]
+    print(f"   🧩 Fragmentos: {len(shards)} (escritos: {written}, eliminados: {removed})")
+    if sizes:
+        print(f"   📏 Tamaño por fragmento: máx {max(sizes) / 1024:.1f} KB, "
+              f"promedio {sum(sizes) / len(sizes) / 1024:.1f} KB")
+    return shards
+
+
+def patch_search_page(search_page=None):
+    """Hacer que search.html use el índice particionado en lugar de searchindex.js"""
+    search_page = Path(search_page or SEARCH_PAGE)
+    if not search_page.exists():
+        return False
+    html = search_page.read_text(encoding='utf-8')
+    if SHARDED_SCRIPT_TAG in html:
+        return False
+    if SPHINX_SCRIPT_TAG not in html:
+        print(f"   ⚠️  {search_page.name} no carga searchindex.js, no se modificó")
+        return False
+    write_if_changed(search_page, html.replace(SPHINX_SCRIPT_TAG, SHARDED_SCRIPT_TAG))
+    print(f"   🔗 {search_page.name} ahora usa search_index/search.js")
+    return True
+
+
+def build_search_index(prefix_length=DEFAULT_PREFIX_LENGTH, use_cache=True, docs_dir=None,
+                       reproducible=False):
+    """Generar docs/search_index/ a partir de Sphinx y del hardware"""
+    print("🔎 Generando índice de búsqueda particionado...")
+    docs_dir = Path(docs_dir or DOCS_DIR)
+    file_times = None
+    if reproducible or os.environ.get('SOURCE_DATE_EPOCH'):
+        epoch = source_date_epoch()
+        file_times = reproducible_file_times(epoch) if epoch is not None else None
+    documents = []
+    postings = {}
+
+    index = load_sphinx_index(docs_dir / SPHINX_INDEX_FILE.name)
+    if index:
+        add_sphinx_documents(index, documents, postings)
+    structure = scan_hardware(use_cache, docs_dir, file_times)
+    if structure:
+        add_hardware_documents(structure, documents, postings)
+
+    print(f"   📚 Documentos: {len(documents)}, términos: {len(postings)}")
+    write_shards(documents, postings, prefix_length, docs_dir / SEARCH_INDEX_DIR.name)
+    patch_search_page(docs_dir / SEARCH_PAGE.name)
+
+
+def parse_args(argv=None):
+    """Leer las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Genera docs/search_index/ con el índice de Sphinx y los archivos de hardware"
+    )
+    parser.add_argument(
+        '--prefix-length', type=int, default=DEFAULT_PREFIX_LENGTH,
+        help=f"caracteres del prefijo que agrupa términos en un fragmento (default: {DEFAULT_PREFIX_LENGTH})"
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help="ignorar hardware_manifest.json y volver a escanear el hardware"
+    )
+    parser.add_argument(
+        '--docs-dir', default=str(DOCS_DIR),
+        help=f"directorio publicado (default: {DOCS_DIR})"
+    )
+    parser.add_argument(
+        '--reproducible', action='store_true',
+        help="usar fechas de git en hardware_manifest.json (activo si SOURCE_DATE_EPOCH está definido)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal"""
+    args = parse_args(argv)
+    build_search_index(args.prefix_length, use_cache=not args.no_cache, docs_dir=args.docs_dir,
+                       reproducible=args.reproducible)
+    print(f"✅ Índice de búsqueda disponible en: {Path(args.docs_dir) / SEARCH_INDEX_DIR.name}")
+
+
+if __name__ == "__main__":
+    main()
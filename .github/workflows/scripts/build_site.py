@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Script para construir todo el sitio de docs/ en una sola ejecución.
+
+Las etapas que antes corrían en workflows y scripts separados se modelan como
+un grafo de tareas con dependencias:
+
+    hardware     copy_hardware_docs.py (docs/hardware, hardware.html, ...)
+    sphinx_html  HTML incremental de Sphinx (caché de build_docs.py)
+    sphinx_pdf   LaTeX + PDF de Sphinx, después de sphinx_html
+    briefs       product briefs de generate_pdf.py para los README de placas
+    publish      publish_docs.py, enlace a hardware, índice de búsqueda y
+                 assets con hash, cuando terminaron todas las anteriores
+
+Las tareas independientes corren en paralelo en un pool de procesos. Todas
+escriben en un directorio de staging (.build_cache/stage), creado con
+hardlinks a partir de docs/: los generadores reemplazan archivos con
+os.replace y nunca escriben a través de un hardlink, así docs/ no cambia
+mientras se construye. Si todo termina bien, el staging reemplaza a docs/ con
+dos renombres; si alguna etapa falla, docs/ queda como estaba.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import build_trace
+from copy_hardware_docs import BASE_DIR, DOCS_DIR, HARDWARE_DIR, file_hash
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+SPHINX_DIR = BASE_DIR / "software" / "sphinx"
+DOCUMENTATION_DIR = BASE_DIR / "software" / "documentation"
+BUILD_CACHE = BASE_DIR / ".build_cache"
+STAGE_DIR = BUILD_CACHE / "stage"
+BRIEFS_CACHE = BUILD_CACHE / "briefs"
+BRIEF_TEMPLATE = DOCUMENTATION_DIR / "product_brief_template.tex"
+# README con frontmatter de product brief: el de la placa está junto a la plantilla
+BRIEF_SOURCES = [HARDWARE_DIR, DOCUMENTATION_DIR]
+# Carpeta de docs/ con los product briefs (la administra este script)
+BRIEFS_DIR_NAME = "product_briefs"
+
+# build_docs.py y generate_pdf.py importan módulos de su propia carpeta
+for _path in (SPHINX_DIR, DOCUMENTATION_DIR):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+
+def task_hardware(options, results):
+    """Espejo de hardware/ y hardware.html dentro del staging"""
+    import copy_hardware_docs
+
+    argv = ['--docs-dir', str(options['stage'])] + options['hardware_args']
+    if options['reproducible']:
+        argv.append('--reproducible')
+    copy_hardware_docs.main(argv)
+    return {'hardware': True}
+
+
+def task_sphinx_html(options, results):
+    """HTML incremental en el caché de build_docs.py"""
+    import build_docs
+
+    if options['reproducible']:
+        build_docs.enable_reproducible(build_docs.SOURCE_DIR)
+    cache_dir = build_docs.CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    manifest, changed = build_docs.stabilize_mtimes(build_docs.SOURCE_DIR, cache_dir)
+    with build_trace.stage('sphinx.html', changed=changed) as record:
+        read = record['files'] = build_docs.run_sphinx('html', cache_dir / "html", cache_dir / "doctrees",
+                                                       options['quiet'], options['jobs'])
+    print(f"   📖 Sphinx: {changed} fuentes modificados, {read} documentos leídos")
+    # Sin PDF el manifiesto se guarda aquí; si no, cuando el PDF esté listo
+    if not options['pdf']:
+        build_docs.save_sources_manifest(manifest, cache_dir)
+    return {'html_dir': str(cache_dir / "html"), 'changed': changed, 'manifest': manifest}
+
+
+def task_sphinx_pdf(options, results):
+    """LaTeX y PDF a partir de los doctrees que dejó sphinx_html"""
+    import build_docs
+
+    if options['reproducible']:
+        build_docs.enable_reproducible(build_docs.SOURCE_DIR)
+    html = results['sphinx_html']
+    cache_dir = build_docs.CACHE_DIR
+    latex_dir = cache_dir / "latex"
+    if html['changed'] == 0 and any(latex_dir.glob("*.pdf")):
+        print("♻️  Fuentes de Sphinx sin cambios, se reutiliza el PDF anterior")
+    else:
+        with build_trace.stage('sphinx.latex'):
+            build_docs.run_sphinx('latex', latex_dir, cache_dir / "doctrees", options['quiet'], options['jobs'])
+        with build_trace.stage('sphinx.pdf'):
+            subprocess.run(['make', '-C', str(latex_dir), 'all-pdf'], check=True,
+                           stdout=subprocess.DEVNULL if options['quiet'] else None)
+    build_docs.save_sources_manifest(html['manifest'], cache_dir)
+    return {'pdf_dir': str(latex_dir)}
+
+
+def task_briefs(options, results):
+    """Product briefs de todos los README de placas"""
+    import generate_pdf
+
+    readmes = generate_pdf.discover_readmes(options['briefs_from'])
+    if not readmes:
+        # Una tarea seleccionada sin entrada es un error de configuración, no un build vacío
+        raise RuntimeError(f"sin README de placas (con frontmatter) en {', '.join(options['briefs_from'])}; "
+                           "usar --briefs-from o --skip briefs")
+    built = generate_pdf.build_batch(readmes, str(BRIEF_TEMPLATE), str(BRIEFS_CACHE),
+                                     reproducible=options['reproducible'])
+    failed = [readme for readme, pdf in built.items() if pdf is None]
+    if failed:
+        raise RuntimeError(f"fallaron {len(failed)} product briefs: {', '.join(failed)}")
+    return {'briefs': {Path(pdf).name: pdf for pdf in built.values()}}
+
+
+def publish_briefs(briefs, target_dir):
+    """Copiar los PDFs a docs/product_briefs/ y borrar los que ya no se generan"""
+    target_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for name, source in sorted(briefs.items()):
+        target = target_dir / name
+        if target.is_file() and file_hash(target) == file_hash(source):
+            continue
+        tmp = target.with_name(f".{name}.tmp")
+        shutil.copy2(source, tmp)
+        os.replace(tmp, target)
+        written += 1
+    for stale in target_dir.glob("*.pdf"):
+        if stale.name not in briefs:
+            stale.unlink()
+    if not briefs:
+        target_dir.rmdir()
+    print(f"   📄 Product briefs: {len(briefs)} (actualizados: {written})")
+
+
+def task_publish(options, results):
+    """Ensamblar el sitio en el staging con los resultados de las otras tareas"""
+    import build_docs
+    from build_search_index import build_search_index
+    from fingerprint_assets import build_asset_manifest
+    from publish_docs import publish_docs, record_published
+
+    stage_dir = Path(options['stage'])
+    html = results.get('sphinx_html')
+    if html:
+        pdf = results.get('sphinx_pdf') or {}
+        # Sin tarea de PDF se vuelve a publicar el último PDF del caché
+        with build_trace.stage('publish.docs') as record:
+            plan = publish_docs(html_dir=html['html_dir'],
+                                pdf_dir=pdf.get('pdf_dir') or str(build_docs.CACHE_DIR / "latex"),
+                                docs_dir=stage_dir)
+            record['files'] = len(plan['add']) + len(plan['update'])
+    if results.get('briefs'):
+        with build_trace.stage('publish.briefs'):
+            publish_briefs(results['briefs']['briefs'], stage_dir / BRIEFS_DIR_NAME)
+    subprocess.run(['bash', str(SCRIPTS_DIR / "add_hardware_link.sh"), str(stage_dir)], check=True)
+    with build_trace.stage('publish.search_index'):
+        build_search_index(docs_dir=stage_dir, reproducible=options['reproducible'])
+    with build_trace.stage('publish.fingerprint'):
+        build_asset_manifest(stage_dir)
+    record_published(stage_dir)
+    return {'stage': str(stage_dir)}
+
+
+# nombre: (función, dependencias)
+TASKS = {
+    'hardware': (task_hardware, ()),
+    'sphinx_html': (task_sphinx_html, ()),
+    'sphinx_pdf': (task_sphinx_pdf, ('sphinx_html',)),
+    'briefs': (task_briefs, ()),
+    'publish': (task_publish, ('hardware', 'sphinx_html', 'sphinx_pdf', 'briefs')),
+}
+
+
+def run_task(name, options, results):
+    """Ejecutar una tarea en un proceso del pool y medir su duración"""
+    start = time.perf_counter()
+    func, deps = TASKS[name]
+    with build_trace.stage(f"task.{name}"):
+        result = func(options, {dep: results.get(dep) for dep in deps})
+    return result, time.perf_counter() - start
+
+
+def dependents(name):
+    """Tareas que dependen de name, directa o indirectamente"""
+    found = set()
+    pending = [name]
+    while pending:
+        current = pending.pop()
+        for task, (_, deps) in TASKS.items():
+            if current in deps and task not in found:
+                found.add(task)
+                pending.append(task)
+    return found
+
+
+def run_graph(selected, options, workers=None):
+    """Ejecutar las tareas seleccionadas respetando sus dependencias
+
+    Una tarea se envía al pool en cuanto terminan todas sus dependencias; las
+    dependencias que no se seleccionaron cuentan como terminadas sin resultado.
+    Si una tarea falla se cancelan las que dependen de ella y las demás siguen.
+    Devuelve ({tarea: resultado}, {tarea: estado}, {tarea: segundos}).
+    """
+    results = {}
+    status = {name: 'pendiente' for name in selected}
+    timings = {}
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=workers or len(selected) or 1) as executor:
+        while True:
+            for name in selected:
+                if status[name] != 'pendiente':
+                    continue
+                deps = [dep for dep in TASKS[name][1] if dep in selected]
+                if all(status[dep] == 'ok' for dep in deps):
+                    print(f"▶️  {name}...")
+                    status[name] = 'en curso'
+                    running[executor.submit(run_task, name, options, results)] = name
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name], timings[name] = future.result()
+                    status[name] = 'ok'
+                    print(f"⏱️  {name}: {timings[name]:.2f} s")
+                except Exception as e:
+                    status[name] = 'falló'
+                    print(f"❌ {name}: {e}")
+                    for task in dependents(name) & set(selected):
+                        status[task] = 'cancelada'
+    return results, status, timings
+
+
+def link_tree(src, dst):
+    """Copiar src a dst con hardlinks, conservando las fechas de las carpetas
+
+    Las fechas importan: los manifiestos de copy_hardware_docs.py usan la fecha
+    de cada carpeta para decidir si hay que volver a escanearla.
+    """
+    if dst.exists():
+        shutil.rmtree(dst)
+    dst.mkdir(parents=True)
+    if not src.is_dir():
+        return
+    directories = []
+    for root, dirs, files in os.walk(src):
+        target_root = dst / Path(root).relative_to(src)
+        for name in dirs:
+            (target_root / name).mkdir()
+        for name in files:
+            try:
+                os.link(Path(root) / name, target_root / name)
+            except OSError:
+                shutil.copy2(Path(root) / name, target_root / name)
+        directories.append((Path(root), target_root))
+    for source, target in reversed(directories):
+        shutil.copystat(source, target)
+
+
+def swap_into_docs(stage_dir, docs_dir):
+    """Reemplazar docs/ por el staging; si el segundo renombre falla se restaura"""
+    backup = docs_dir.with_name(f".{docs_dir.name}.old")
+    if backup.exists():
+        shutil.rmtree(backup)
+    if docs_dir.exists():
+        os.rename(docs_dir, backup)
+    try:
+        os.rename(stage_dir, docs_dir)
+    except OSError:
+        if backup.exists():
+            os.rename(backup, docs_dir)
+        raise
+    if backup.exists():
+        shutil.rmtree(backup)
+
+
+def parse_args(argv=None):
+    """Leer las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Construye docs/ (hardware, Sphinx HTML/PDF y product briefs) como un grafo de tareas"
+    )
+    parser.add_argument(
+        '--only', nargs='+', choices=list(TASKS),
+        help="ejecutar solo estas tareas (las dependencias omitidas no se ejecutan)"
+    )
+    parser.add_argument(
+        '--skip', nargs='+', choices=list(TASKS), default=[],
+        help="omitir estas tareas"
+    )
+    parser.add_argument(
+        '--no-pdf', action='store_true',
+        help="no compilar el PDF de Sphinx (equivale a --skip sphinx_pdf)"
+    )
+    parser.add_argument(
+        '--briefs-from', nargs='+', default=[str(path) for path in BRIEF_SOURCES],
+        help=f"carpetas donde buscar README de placas (default: {' '.join(map(str, BRIEF_SOURCES))})"
+    )
+    parser.add_argument(
+        '--hardware-arg', action='append', default=[], dest='hardware_args', metavar='ARG',
+        help="opción adicional para copy_hardware_docs.py (p. ej. --hardware-arg=--dedup)"
+    )
+    parser.add_argument(
+        '--reproducible', action='store_true',
+        help="compilación reproducible en todas las etapas (activo si SOURCE_DATE_EPOCH está definido)"
+    )
+    parser.add_argument(
+        '--jobs', '-j', default='auto',
+        help="procesos de Sphinx para leer y escribir ('auto' = todos los núcleos)"
+    )
+    parser.add_argument(
+        '--workers', type=int,
+        help="tareas en paralelo (default: todas las que estén listas)"
+    )
+    parser.add_argument(
+        '--docs-dir', default=str(DOCS_DIR),
+        help=f"directorio publicado (default: {DOCS_DIR})"
+    )
+    parser.add_argument(
+        '--quiet', '-q', action='store_true',
+        help="ocultar la salida de Sphinx y LaTeX"
+    )
+    build_trace.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal"""
+    args = parse_args(argv)
+    from build_docs import resolve_jobs
+
+    skipped = set(args.skip) | ({'sphinx_pdf'} if args.no_pdf else set())
+    selected = [name for name in TASKS if name in (args.only or TASKS) and name not in skipped]
+    docs_dir = Path(args.docs_dir)
+    options = {
+        'stage': str(STAGE_DIR),
+        'reproducible': args.reproducible or bool(os.environ.get('SOURCE_DATE_EPOCH')),
+        'pdf': 'sphinx_pdf' in selected,
+        'jobs': resolve_jobs(args.jobs),
+        'quiet': args.quiet,
+        'briefs_from': args.briefs_from,
+        'hardware_args': args.hardware_args,
+    }
+
+    print(f"🏗️  Construyendo el sitio: {', '.join(selected)}")
+    start = time.perf_counter()
+    # La traza se activa antes de crear el pool: los procesos heredan DOCS_TRACE
+    with build_trace.session('build_site', args.trace, args.profiler):
+        with build_trace.stage('stage.link'):
+            link_tree(docs_dir, STAGE_DIR)
+        results, status, timings = run_graph(selected, options, args.workers)
+
+    print("\n⏱️  Tareas:")
+    for name in selected:
+        elapsed = f"{timings[name]:>8.2f} s" if name in timings else ' ' * 10
+        print(f"   {name:<12} {elapsed}  {status[name]}")
+    print(f"   {'total':<12} {time.perf_counter() - start:>8.2f} s")
+    if args.trace:
+        print(f"\n🧭 Traza por etapa ({args.trace}):")
+        build_trace.print_summary(build_trace.load_trace(args.trace))
+
+    if any(state != 'ok' for state in status.values()):
+        print(f"❌ Hubo errores, {docs_dir} no se modificó (staging en {STAGE_DIR})")
+        return 1
+    swap_into_docs(STAGE_DIR, docs_dir)
+    print(f"✅ Sitio publicado en: {docs_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
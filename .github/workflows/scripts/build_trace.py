@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Trazas por etapa de los scripts de documentación.
+
+Cada etapa (copia, escaneo, render, parseo, pasadas de LaTeX, tareas de
+build_site.py...) se envuelve en stage(), que registra tiempo de pared, CPU
+propia y de subprocesos (pdflatex, make), bytes leídos/escritos según
+/proc/self/io y los contadores que agregue el llamador (archivos, pasadas...).
+
+La traza es un archivo JSON Lines: una línea por etapa terminada, agregada con
+una sola escritura en modo append. Así los procesos de los pools y los
+subprocesos escriben en el mismo archivo; la ruta se hereda por la variable
+de entorno DOCS_TRACE. Sin DOCS_TRACE, stage() no mide nada.
+
+session() es el punto de entrada de cada script: activa la traza (--trace) y,
+opcionalmente, un perfilador (--profiler cprofile|pyinstrument) para el
+proceso principal. Ejecutado como script, resume una traza por etapa.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TRACE_ENV = "DOCS_TRACE"
+PROFILER_ENV = "DOCS_PROFILER"
+PROFILERS = ('cprofile', 'pyinstrument')
+TRACE_VERSION = 1
+PROC_IO = Path("/proc/self/io")
+
+# Etapas abiertas en cada hilo, para registrar la etapa padre
+_local = threading.local()
+
+
+def io_counters():
+    """(bytes leídos, bytes escritos) del proceso; (None, None) fuera de Linux
+
+    rchar/wchar cuentan toda la E/S por read()/write(), también la que
+    resuelve la caché de páginas, que es la que paga el tiempo de CI.
+    """
+    try:
+        fields = dict(line.split(': ') for line in PROC_IO.read_text().splitlines())
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+
+def children_cpu():
+    """Segundos de CPU de los subprocesos ya terminados (pdflatex, make...)"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def delta(end, start):
+    return end - start if end is not None and start is not None else None
+
+
+def write_event(path, event):
+    """Agregar un evento a la traza con una sola escritura (segura entre procesos)"""
+    line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line)
+
+
+@contextmanager
+def stage(name, **counters):
+    """Medir una etapa; el dict que se entrega admite contadores extra
+
+        with stage('scan') as record:
+            ...
+            record['files'] = total
+    """
+    record = dict(counters)
+    path = os.environ.get(TRACE_ENV)
+    if not path:
+        yield record
+        return
+
+    stack = _local.__dict__.setdefault('stack', [])
+    parent = stack[-1] if stack else None
+    stack.append(name)
+    start_time = time.time()
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    start_children = children_cpu()
+    start_read, start_written = io_counters()
+    status = 'ok'
+    try:
+        yield record
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        stack.pop()
+        end_read, end_written = io_counters()
+        event = {
+            'name': name,
+            'parent': parent,
+            'pid': os.getpid(),
+            'start': round(start_time, 6),
+            'wall': round(time.perf_counter() - start_wall, 6),
+            'cpu': round(time.process_time() - start_cpu, 6),
+            'children_cpu': round(children_cpu() - start_children, 6),
+            'read_bytes': delta(end_read, start_read),
+            'write_bytes': delta(end_written, start_written),
+            'status': status,
+        }
+        event.update(record)
+        write_event(path, event)
+
+
+@contextmanager
+def profiler(name, kind, output_dir):
+    """Perfilar el proceso actual con cProfile o pyinstrument
+
+    cProfile deja <name>-<pid>.prof (snakeviz, pstats); pyinstrument deja
+    <name>-<pid>.html. Si pyinstrument no está instalado se usa cProfile.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    base = output_dir / f"{name}-{os.getpid()}"
+
+    if kind == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("   ⚠️  pyinstrument no está instalado, se usa cProfile")
+        else:
+            profile = Profiler()
+            profile.start()
+            try:
+                yield
+            finally:
+                profile.stop()
+                base.with_suffix('.html').write_text(profile.output_html(), encoding='utf-8')
+                print(f"🔬 Perfil: {base.with_suffix('.html')}")
+            return
+
+    import cProfile
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(str(base.with_suffix('.prof')))
+        print(f"🔬 Perfil: {base.with_suffix('.prof')}")
+
+
+@contextmanager
+def session(name, trace=None, profile=None):
+    """Envolver la ejecución completa de un script
+
+    trace activa la traza en ese archivo (se vacía solo si ningún proceso
+    padre la activó antes); profile elige el perfilador. Ambos pueden venir
+    también de DOCS_TRACE y DOCS_PROFILER.
+    """
+    if trace and os.environ.get(TRACE_ENV) != str(Path(trace).resolve()):
+        path = Path(trace).resolve()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("", encoding='utf-8')
+        os.environ[TRACE_ENV] = str(path)
+    profile = profile or os.environ.get(PROFILER_ENV)
+    if profile:
+        os.environ[PROFILER_ENV] = profile
+
+    with stage(name, argv=sys.argv[1:]):
+        if not profile:
+            yield
+            return
+        trace_path = os.environ.get(TRACE_ENV)
+        with profiler(name, profile, Path(trace_path).parent if trace_path else Path.cwd()):
+            yield
+
+
+def add_arguments(parser):
+    """Opciones --trace y --profiler comunes a todos los scripts"""
+    parser.add_argument(
+        '--trace', metavar='FILE',
+        help=f"guardar una traza JSON Lines por etapa (también con {TRACE_ENV})"
+    )
+    parser.add_argument(
+        '--profiler', choices=PROFILERS,
+        help=f"perfilar el proceso principal (también con {PROFILER_ENV})"
+    )
+
+
+def load_trace(path):
+    """Eventos de una traza; las líneas truncadas (proceso interrumpido) se ignoran"""
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def summarize(events):
+    """Totales por nombre de etapa: veces, pared, CPU, E/S y archivos"""
+    totals = defaultdict(lambda: {'count': 0, 'wall': 0.0, 'cpu': 0.0, 'children_cpu': 0.0,
+                                  'read_bytes': 0, 'write_bytes': 0, 'files': 0, 'errors': 0})
+    for event in events:
+        total = totals[event['name']]
+        total['count'] += 1
+        total['errors'] += event.get('status') == 'error'
+        for key in ('wall', 'cpu', 'children_cpu', 'read_bytes', 'write_bytes', 'files'):
+            total[key] += event.get(key) or 0
+    return dict(totals)
+
+
+def print_summary(events):
+    totals = summarize(events)
+    print(f"{'etapa':<28} {'veces':>5} {'pared (s)':>10} {'CPU (s)':>9} {'hijos (s)':>10} "
+          f"{'leído (MB)':>11} {'escrito (MB)':>13} {'archivos':>9}")
+    for name, total in sorted(totals.items(), key=lambda item: -item[1]['wall']):
+        errors = f"  ❌ {total['errors']}" if total['errors'] else ""
+        print(f"{name:<28} {total['count']:>5} {total['wall']:>10.2f} {total['cpu']:>9.2f} "
+              f"{total['children_cpu']:>10.2f} {total['read_bytes'] / 2**20:>11.1f} "
+              f"{total['write_bytes'] / 2**20:>13.1f} {total['files']:>9}{errors}")
+
+
+def parse_args(argv=None):
+    """Leer las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Resume una traza de build_trace por etapa"
+    )
+    parser.add_argument('trace', help="archivo JSON Lines generado con --trace")
+    parser.add_argument(
+        '--json', action='store_true',
+        help="imprimir los totales como JSON en lugar de una tabla"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal"""
+    args = parse_args(argv)
+    events = load_trace(args.trace)
+    if args.json:
+        print(json.dumps({'version': TRACE_VERSION, 'stages': summarize(events)}, indent=2))
+    else:
+        print_summary(events)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Script para verificar que dos compilaciones seguidas producen los mismos bytes.
+
+Ejecuta cada generador dos veces en modo reproducible y compara el SHA-256
+de todo lo que escribe:
+
+- hardware: copy_hardware_docs.py, con las fechas de hardware/ y
+  docs/hardware cambiadas entre ambas ejecuciones (como un checkout nuevo);
+- sphinx: build_docs.py --clean (solo HTML, o también PDF con --with-pdf);
+- briefs: generate_pdf.py sin caché, en dos directorios de build distintos.
+
+Se ejecuta sobre el árbol de trabajo: docs/ y software/sphinx/docs/ quedan
+como después de un build normal. Termina con código 1 si algún archivo difiere.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from copy_hardware_docs import (
+    BASE_DIR, DOCS_DIR, DOCS_HARDWARE_DIR, HARDWARE_DIR, HARDWARE_INDEX_DIR, MANIFEST_FILE,
+    file_hash,
+)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+SPHINX_DIR = BASE_DIR / "software" / "sphinx"
+DOCUMENTATION_DIR = BASE_DIR / "software" / "documentation"
+CHECKS = ('hardware', 'sphinx', 'briefs')
+
+
+def snapshot(paths, base_dir):
+    """{ruta relativa: sha256} de los archivos bajo paths"""
+    hashes = {}
+    for path in paths:
+        path = Path(path)
+        files = [path] if path.is_file() else sorted(p for p in path.rglob('*') if p.is_file())
+        for file_path in files:
+            hashes[file_path.relative_to(base_dir).as_posix()] = file_hash(file_path)
+    return hashes
+
+
+def compare(name, first, second):
+    """Mostrar las diferencias entre dos snapshots; True si son idénticos"""
+    differing = sorted(
+        relative for relative in set(first) | set(second)
+        if first.get(relative) != second.get(relative)
+    )
+    if not differing:
+        print(f"✅ {name}: {len(first)} archivos idénticos")
+        return True
+    print(f"❌ {name}: {len(differing)} de {len(set(first) | set(second))} archivos difieren")
+    for relative in differing[:20]:
+        print(f"     {relative}")
+    return False
+
+
+def run(command, cwd):
+    subprocess.run(command, cwd=cwd, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+
+def touch_tree(*roots):
+    """Simular un checkout nuevo: fecha actual en todos los archivos y carpetas"""
+    now = time.time()
+    for root in roots:
+        for path in [Path(root), *Path(root).rglob('*')]:
+            if path.exists():
+                os.utime(path, (now, now))
+
+
+def check_hardware():
+    command = [sys.executable, str(SCRIPTS_DIR / "copy_hardware_docs.py"), '--reproducible']
+    outputs = [DOCS_DIR / "hardware.html", MANIFEST_FILE, HARDWARE_INDEX_DIR, DOCS_HARDWARE_DIR]
+
+    run(command, BASE_DIR)
+    first = snapshot([p for p in outputs if p.exists()], DOCS_DIR)
+    # Las fechas del sistema de archivos no deben llegar a la salida
+    time.sleep(1)
+    touch_tree(HARDWARE_DIR, DOCS_HARDWARE_DIR)
+    run(command, BASE_DIR)
+    second = snapshot([p for p in outputs if p.exists()], DOCS_DIR)
+    return compare("hardware", first, second)
+
+
+def check_sphinx(with_pdf=False):
+    command = [sys.executable, "build_docs.py", '--reproducible', '--clean', '-q']
+    if not with_pdf:
+        command.append('--no-pdf')
+    outputs = [SPHINX_DIR / "docs"] + ([SPHINX_DIR / "pdf"] if with_pdf else [])
+
+    run(command, SPHINX_DIR)
+    first = snapshot(outputs, SPHINX_DIR)
+    time.sleep(1)
+    run(command, SPHINX_DIR)
+    second = snapshot(outputs, SPHINX_DIR)
+    return compare("sphinx", first, second)
+
+
+def check_briefs(readme):
+    if not shutil.which('pdflatex'):
+        print("⚠️  briefs: pdflatex no está instalado, se omite")
+        return True
+
+    readme = Path(readme).resolve()
+    snapshots = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for attempt in ('a', 'b'):
+            build_dir = Path(tmp) / attempt
+            run([sys.executable, str(DOCUMENTATION_DIR / "generate_pdf.py"), str(readme),
+                 '--reproducible', '--no-cache', '--build-dir', str(build_dir),
+                 '--template', str(DOCUMENTATION_DIR / "product_brief_template.tex")],
+                readme.parent)
+            snapshots.append(snapshot([p for p in build_dir.iterdir() if p.suffix in ('.pdf', '.tex')],
+                                      build_dir))
+            time.sleep(1)
+    return compare("briefs", *snapshots)
+
+
+def parse_args(argv=None):
+    """Leer las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Compila dos veces cada generador y verifica que la salida sea idéntica"
+    )
+    parser.add_argument(
+        '--only', nargs='+', choices=CHECKS, default=list(CHECKS),
+        help="generadores a verificar (default: todos)"
+    )
+    parser.add_argument(
+        '--with-pdf', action='store_true',
+        help="incluir el PDF de Sphinx (requiere LaTeX)"
+    )
+    parser.add_argument(
+        '--readme', default=str(DOCUMENTATION_DIR / "README.md"),
+        help="README para el product brief (default: software/documentation/README.md)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal"""
+    args = parse_args(argv)
+    print("🔁 Verificando compilaciones reproducibles...")
+    results = []
+    if 'hardware' in args.only:
+        results.append(check_hardware())
+    if 'sphinx' in args.only:
+        results.append(check_sphinx(args.with_pdf))
+    if 'briefs' in args.only:
+        results.append(check_briefs(args.readme))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
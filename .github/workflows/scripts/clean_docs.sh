@@ -5,7 +5,7 @@
 # Uso: .github/workflows/scripts/clean_docs.sh
 # 
 # IMPORTANTE: Este script solo limpia la documentación de hardware
-# (docs/hardware/ y hardware.html) preservando la documentación de Sphinx
+# (docs/hardware/, hardware.html y hardware_manifest.json) preservando la documentación de Sphinx
 
 set -e  # Salir si hay algún error
 
@@ -54,6 +54,30 @@ if [ -f "docs/hardware.html" ]; then
     echo "  ✓ Eliminado: docs/hardware.html"
 fi
 
+# Eliminar el manifiesto de metadatos si existe
+if [ -f "docs/hardware_manifest.json" ]; then
+    rm -f docs/hardware_manifest.json
+    echo "  ✓ Eliminado: docs/hardware_manifest.json"
+fi
+
+# Eliminar los índices del modo lazy si existen
+if [ -d "docs/hardware_index" ]; then
+    rm -rf docs/hardware_index
+    echo "  ✓ Eliminado: docs/hardware_index/"
+fi
+
+# Eliminar miniaturas y vistas previas si existen
+if [ -d "docs/hardware_thumbs" ]; then
+    rm -rf docs/hardware_thumbs
+    echo "  ✓ Eliminado: docs/hardware_thumbs/"
+fi
+
+# Eliminar el almacén de blobs del modo --dedup si existe
+if [ -d "docs/hardware_blobs" ]; then
+    rm -rf docs/hardware_blobs
+    echo "  ✓ Eliminado: docs/hardware_blobs/"
+fi
+
 # Contar archivos después de limpiar
 hardware_files_after=0
 
@@ -7,37 +7,113 @@ para visualizar el contenido.
 import os
 import shutil
 import json
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 from pathlib import Path
 from jinja2 import Template
 
+import build_trace
+
 # Configuración de rutas
 # El script está en .github/workflows/scripts/, necesitamos ir 3 niveles arriba para llegar al root
 BASE_DIR = Path(__file__).parent.parent.parent.parent
 HARDWARE_DIR = BASE_DIR / "hardware"
 DOCS_DIR = BASE_DIR / "docs"
 DOCS_HARDWARE_DIR = DOCS_DIR / "hardware"
+# Manifiesto con los metadatos de cada archivo, publicado junto a hardware.html
+MANIFEST_FILE = DOCS_DIR / "hardware_manifest.json"
+MANIFEST_VERSION = 1
+# Índices JSON por carpeta para el modo de carga diferida (--output-mode lazy)
+HARDWARE_INDEX_DIR = DOCS_DIR / "hardware_index"
+OUTPUT_MODES = ('full', 'lazy')
+# Miniaturas de imágenes y vistas previas de PDFs, nombradas por hash de contenido
+THUMBNAILS_DIR = DOCS_DIR / "hardware_thumbs"
+THUMBNAIL_MAX_SIZE = 1024
+# Almacén de contenido único para el modo --dedup (un archivo por hash)
+BLOBS_DIR = DOCS_DIR / "hardware_blobs"
 
 # Extensiones de archivos por categoría
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.webp'}
 DOCUMENT_EXTENSIONS = {'.pdf', '.docx', '.doc', '.txt', '.md'}
 DATA_EXTENSIONS = {'.json', '.xml', '.csv', '.yaml', '.yml'}
+# Imágenes que Pillow puede reducir (SVG ya es liviano y escalable)
+RASTER_EXTENSIONS = IMAGE_EXTENSIONS - {'.svg'}
+
+# Tamaño de bloque para leer archivos al calcular hashes
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Estrategias para materializar un archivo en docs/hardware
+LINK_MODES = ('auto', 'reflink', 'hardlink', 'copy')
+
+# Hilos por defecto para escanear y copiar (E/S, no CPU: igual que ThreadPoolExecutor)
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Archivos por trabajo del escaneo: un Future por archivo pesa más que su entrada
+SCAN_BATCH_SIZE = 64
+
+# ioctl FICLONE de Linux (copy-on-write en btrfs/xfs)
+FICLONE = 0x40049409
+
+def set_docs_dir(docs_dir):
+    """Publicar en otro directorio (p. ej. el staging de build_site.py)
+
+    Las rutas de salida son constantes del módulo que las funciones leen al
+    ejecutarse, así que basta con reasignarlas.
+    """
+    global DOCS_DIR, DOCS_HARDWARE_DIR, MANIFEST_FILE, HARDWARE_INDEX_DIR, THUMBNAILS_DIR, BLOBS_DIR
+    DOCS_DIR = Path(docs_dir)
+    DOCS_HARDWARE_DIR = DOCS_DIR / "hardware"
+    MANIFEST_FILE = DOCS_DIR / "hardware_manifest.json"
+    HARDWARE_INDEX_DIR = DOCS_DIR / "hardware_index"
+    THUMBNAILS_DIR = DOCS_DIR / "hardware_thumbs"
+    BLOBS_DIR = DOCS_DIR / "hardware_blobs"
 
 def ensure_directory(path):
     """Crear directorio si no existe"""
     path.mkdir(parents=True, exist_ok=True)
 
-def get_file_info(file_path):
-    """Obtener información del archivo"""
-    stat = file_path.stat()
-    return {
-        'name': file_path.name,
-        'size': stat.st_size,
-        'size_human': format_size(stat.st_size),
-        'modified': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
-        'extension': file_path.suffix.lower(),
-        'type': get_file_type(file_path.suffix.lower())
-    }
+class FileRecord:
+    """Archivo escaneado, con el mínimo de memoria por entrada
+
+    Solo guarda lo que viene del manifiesto; nombre, extensión, ruta, tamaño
+    legible y fecha se calculan al leerlos. relative es la misma cadena que
+    la clave del manifiesto y sha256 la misma que su valor, así no se
+    duplican. preview y blob los agregan generate_previews() y store_blobs().
+    """
+    __slots__ = ('relative', 'size', 'mtime_ns', 'type', 'sha256', 'preview', 'blob')
+
+    def __init__(self, relative, size, mtime_ns, sha256=None):
+        self.relative = relative
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.sha256 = sha256
+        # get_file_type() devuelve literales: una sola cadena por tipo
+        self.type = get_file_type(self.extension)
+        self.preview = None
+        self.blob = None
+
+    @property
+    def name(self):
+        return self.relative.rpartition('/')[2]
+
+    @property
+    def extension(self):
+        return os.path.splitext(self.name)[1].lower()
+
+    @property
+    def path(self):
+        return f"{DOCS_HARDWARE_DIR.name}/{self.relative}"
+
+    @property
+    def size_human(self):
+        return format_size(self.size)
+
+    @property
+    def modified(self):
+        return datetime.fromtimestamp(self.mtime_ns / 1e9).strftime('%Y-%m-%d %H:%M:%S')
 
 def format_size(size_bytes):
     """Convertir bytes a formato legible"""
@@ -63,8 +139,177 @@ def get_file_type(extension):
     else:
         return 'other'
 
-def copy_hardware_files():
-    """Copiar todos los archivos de hardware a docs/hardware"""
+def file_hash(file_path):
+    """Calcular el hash SHA-256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def files_differ(src, dst):
+    """Comparar dos archivos por tamaño, fecha y, si hace falta, por contenido"""
+    src_stat = src.stat()
+    dst_stat = dst.stat()
+
+    # Mismo inodo (hardlink de una ejecución anterior)
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return False
+    if src_stat.st_size != dst_stat.st_size:
+        return True
+    if src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+        return False
+
+    # Mismo tamaño pero distinta fecha (p. ej. tras un checkout): comparar contenido
+    return file_hash(src) != file_hash(dst)
+
+def _reflink(src, dst):
+    """Clonar un archivo con copy-on-write; falla si el sistema no lo soporta"""
+    import fcntl
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    shutil.copystat(src, dst)
+
+def place_file(src, dst, link_mode='auto'):
+    """Materializar src en dst usando reflink, hardlink o copia según link_mode
+
+    El archivo se escribe primero en un temporal y luego se reemplaza de forma
+    atómica, así nunca se escribe a través de un hardlink existente. 'auto' no
+    usa hardlinks: una edición en sitio de hardware/ cambiaría docs/hardware
+    sin tocar la fecha del directorio y el manifiesto quedaría desactualizado.
+    Devuelve el método que se usó realmente.
+    """
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    if tmp.exists():
+        tmp.unlink()
+
+    attempts = {
+        'auto': ('reflink', 'copy'),
+        'reflink': ('reflink', 'copy'),
+        'hardlink': ('hardlink', 'copy'),
+        'copy': ('copy',),
+    }[link_mode]
+
+    for method in attempts:
+        try:
+            if method == 'reflink':
+                _reflink(src, tmp)
+            elif method == 'hardlink':
+                os.link(src, tmp)
+            else:
+                shutil.copy2(src, tmp)
+        except (OSError, ImportError):
+            if tmp.exists():
+                tmp.unlink()
+            continue
+        os.replace(tmp, dst)
+        return method
+
+    raise OSError(f"No se pudo copiar {src} a {dst}")
+
+def sync_hardware_files(src_dir=None, dst_dir=None, link_mode='auto', workers=None):
+    """Sincronizar src_dir con dst_dir copiando solo archivos nuevos o modificados
+
+    Los archivos que ya no existen en el origen se eliminan del destino.
+    La comparación y copia de archivos se reparte en un pool de hilos.
+    Devuelve un reporte con las rutas relativas agregadas, actualizadas y
+    eliminadas, además del número de archivos sin cambios.
+    """
+    src_dir = Path(src_dir or HARDWARE_DIR)
+    dst_dir = Path(dst_dir or DOCS_HARDWARE_DIR)
+
+    report = {'added': [], 'updated': [], 'removed': [], 'unchanged': 0, 'methods': {}}
+    ensure_directory(dst_dir)
+
+    expected_files = set()
+    expected_dirs = set()
+    jobs = []
+
+    for root, dirs, files in os.walk(src_dir):
+        dirs.sort()
+        root_path = Path(root)
+        relative_root = root_path.relative_to(src_dir)
+        expected_dirs.add(relative_root)
+
+        dst_root = dst_dir / relative_root
+        if dst_root.is_file() or dst_root.is_symlink():
+            dst_root.unlink()
+        ensure_directory(dst_root)
+
+        for file in sorted(files):
+            relative = relative_root / file
+            expected_files.add(relative)
+            jobs.append((root_path / file, dst_dir / relative, relative))
+
+    def sync_one(job):
+        src, dst, relative = job
+        if dst.is_dir():
+            shutil.rmtree(dst)
+        if not dst.exists():
+            bucket = 'added'
+        elif files_differ(src, dst):
+            bucket = 'updated'
+        else:
+            return None, None, relative
+        return bucket, place_file(src, dst, link_mode), relative
+
+    # map() conserva el orden de los trabajos, así el reporte es determinista
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as executor:
+        for bucket, method, relative in executor.map(sync_one, jobs):
+            if bucket is None:
+                report['unchanged'] += 1
+                continue
+            report['methods'][method] = report['methods'].get(method, 0) + 1
+            report[bucket].append(str(relative))
+
+    # Eliminar lo que ya no existe en el origen (de abajo hacia arriba)
+    for root, dirs, files in os.walk(dst_dir, topdown=False):
+        root_path = Path(root)
+        relative_root = root_path.relative_to(dst_dir)
+
+        for file in sorted(files):
+            relative = relative_root / file
+            if relative not in expected_files:
+                (root_path / file).unlink()
+                report['removed'].append(str(relative))
+
+        if relative_root not in expected_dirs:
+            if root_path.is_symlink():
+                root_path.unlink()
+            else:
+                root_path.rmdir()
+
+    report['removed'].sort()
+    return report
+
+def print_sync_report(report):
+    """Mostrar un resumen de los cambios aplicados por la sincronización"""
+    print(f"   ➕ Agregados: {len(report['added'])}")
+    print(f"   ✏️  Actualizados: {len(report['updated'])}")
+    print(f"   🗑️  Eliminados: {len(report['removed'])}")
+    print(f"   ✓ Sin cambios: {report['unchanged']}")
+    if report['methods']:
+        methods = ", ".join(f"{name}={count}" for name, count in sorted(report['methods'].items()))
+        print(f"   🔗 Métodos usados: {methods}")
+
+    for label, key in (('+', 'added'), ('~', 'updated'), ('-', 'removed')):
+        for path in report[key]:
+            print(f"     {label} {path}")
+
+def copy_hardware_files(full_copy=False, link_mode='auto', workers=None):
+    """Copiar todos los archivos de hardware a docs/hardware
+
+    Por defecto solo se copian los archivos nuevos o modificados; con
+    full_copy=True se borra el destino y se vuelve a copiar todo.
+    """
+    if not full_copy:
+        print(" Sincronizando archivos de hardware...")
+        report = sync_hardware_files(HARDWARE_DIR, DOCS_HARDWARE_DIR, link_mode, workers)
+        print_sync_report(report)
+        print(f" Archivos sincronizados en {DOCS_HARDWARE_DIR}")
+        return report
+
     print(" Copiando archivos de hardware...")
     
     # Crear directorio de destino
@@ -79,47 +324,290 @@ def copy_hardware_files():
     
     print(f" Archivos copiados a {DOCS_HARDWARE_DIR}")
 
-def scan_copied_files():
-    """Escanear archivos copiados y generar estructura de datos"""
+def source_date_epoch():
+    """Fecha de compilación reproducible: SOURCE_DATE_EPOCH o el último commit"""
+    value = os.environ.get('SOURCE_DATE_EPOCH')
+    if value:
+        return int(value)
+    try:
+        result = subprocess.run(['git', 'log', '-1', '--format=%ct'], cwd=BASE_DIR,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return int(result.stdout.strip()) if result.stdout.strip() else None
+
+def git_file_times(root_dir, epoch):
+    """Fecha del último commit de cada archivo limpio bajo root_dir, sin pasar de epoch
+
+    Un solo `git log` para todo el árbol. Requiere el historial completo
+    (fetch-depth: 0 en el checkout). Los archivos modificados respecto a HEAD
+    y los que no están en git se omiten: su contenido no es el de ningún
+    commit y conservan su fecha real.
+    """
+    try:
+        result = subprocess.run(
+            ['git', '-c', 'core.quotepath=off', 'log', '--format=@%ct', '--name-only',
+             '--no-renames', '--relative', '--', '.'],
+            cwd=root_dir, capture_output=True, text=True, check=True
+        )
+        dirty = subprocess.run(
+            ['git', 'diff', '--name-only', '-z', '--no-renames', '--relative', 'HEAD', '--', '.'],
+            cwd=root_dir, capture_output=True, text=True, check=True
+        ).stdout.split('\0')
+        dirty += subprocess.run(
+            ['git', 'ls-files', '--others', '--exclude-standard', '-z', '--', '.'],
+            cwd=root_dir, capture_output=True, text=True, check=True
+        ).stdout.split('\0')
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    times = {}
+    commit_time = epoch
+    for line in result.stdout.splitlines():
+        if line.startswith('@'):
+            commit_time = min(int(line[1:]), epoch)
+        elif line:
+            # git log lista primero el commit más reciente
+            times.setdefault(line, commit_time)
+    for relative in dirty:
+        times.pop(relative, None)
+    return times
+
+def directory_times(times):
+    """Fecha de cada carpeta: la del commit más reciente que tocó algo dentro
+
+    git log también lista los archivos borrados, así la fecha de la carpeta
+    cambia con las bajas.
+    """
+    dir_times = {}
+    for relative, mtime in times.items():
+        parent = os.path.dirname(relative)
+        while True:
+            dir_times[parent] = max(dir_times.get(parent, mtime), mtime)
+            if not parent:
+                break
+            parent = os.path.dirname(parent)
+    return dir_times
+
+def reproducible_file_times(epoch):
+    """Fechas de git de hardware/ para los metadatos publicados
+
+    Las fechas del sistema de archivos no se tocan: scan_copied_files() usa
+    estas en el manifiesto y en hardware.html ('modified') en lugar de las
+    del checkout.
+    """
+    print(f"🕰️  Modo reproducible: fechas de git hasta {datetime.fromtimestamp(epoch):%Y-%m-%d %H:%M:%S}")
+    times = git_file_times(HARDWARE_DIR, epoch)
+    print(f"   🗓️  Archivos con fecha de commit: {len(times)}")
+    return times
+
+def scan_copied_files(use_cache=True, manifest_path=None, workers=None, with_hash=True,
+                      root_dir=None, trust_dir_mtime=True, file_times=None):
+    """Escanear archivos copiados y generar estructura de datos
+
+    Los metadatos se guardan en un manifiesto JSON (hardware_manifest.json).
+    En la siguiente ejecución, los directorios cuya fecha de modificación no
+    cambió se reconstruyen desde el manifiesto sin volver a listar ni hacer
+    stat() de sus archivos. El listado, stat() y hash de lo que sí cambió se
+    reparte en un pool de hilos. root_dir permite escanear hardware/ en lugar
+    de docs/hardware (modo --dedup).
+
+    La fecha del directorio solo cambia al agregar, borrar o reemplazar
+    archivos, como hace copy_hardware_files(). En un árbol editado a mano
+    (hardware/) un archivo modificado en su lugar no la cambia: con
+    trust_dir_mtime=False se reutiliza el listado pero se hace stat() de cada
+    archivo y el hash solo se conserva si coinciden tamaño y fecha.
+
+    file_times ({ruta relativa: fecha de commit}, ver reproducible_file_times())
+    reemplaza la fecha del sistema de archivos de esos archivos y la de las
+    carpetas en el manifiesto, para que no dependa del checkout. Un archivo
+    limpio con el mismo tamaño y la misma fecha de commit tiene el mismo
+    contenido, así que su hash se sigue reutilizando.
+    """
     print("📁 Escaneando archivos copiados...")
-    
-    file_structure = {'files': [], 'folders': {}}
-    
-    for root, dirs, files in os.walk(DOCS_HARDWARE_DIR):
-        root_path = Path(root)
-        relative_path = root_path.relative_to(DOCS_HARDWARE_DIR)
-        
-        # Determinar el diccionario objetivo
-        if str(relative_path) == '.':
-            # Directorio raíz
-            target_dict = file_structure
-        else:
-            # Navegar/crear la estructura de directorios
-            target_dict = file_structure
-            for part in relative_path.parts:
-                if 'folders' not in target_dict:
-                    target_dict['folders'] = {}
-                if part not in target_dict['folders']:
-                    target_dict['folders'][part] = {'files': [], 'folders': {}}
-                target_dict = target_dict['folders'][part]
-        
-        # Agregar archivos al directorio actual
-        if 'files' not in target_dict:
-            target_dict['files'] = []
-            
-        for file in files:
-            file_path = root_path / file
-            file_info = get_file_info(file_path)
-            file_info['path'] = str(file_path.relative_to(DOCS_DIR))
-            target_dict['files'].append(file_info)
-    
+
+    manifest_path = Path(manifest_path or MANIFEST_FILE)
+    previous = load_manifest(manifest_path) if use_cache else new_manifest()
+    manifest = new_manifest()
+    counters = {'reused_dirs': 0, 'scanned_dirs': 0, 'hashed_files': 0}
+
+    root_dir = Path(root_dir or DOCS_HARDWARE_DIR)
+    walk_hardware_tree(root_dir, previous, manifest, counters, workers, with_hash, trust_dir_mtime,
+                       file_times)
+    if file_times is not None:
+        dir_times = directory_times(file_times)
+        for relative, record in manifest['directories'].items():
+            record['mtime_ns'] = dir_times.get(relative, 0) * 10**9
+    # Las estadísticas se cuentan al construir la estructura, sin otra pasada
+    stats = new_stats()
+    file_structure = build_structure(manifest, stats=stats)
+    file_structure['stats'] = finish_stats(stats)
+    save_manifest(manifest, manifest_path)
+
+    print(f"   ♻️  Directorios reutilizados del manifiesto: {counters['reused_dirs']}")
+    print(f"   🔍 Directorios escaneados: {counters['scanned_dirs']}")
+    print(f"   #️⃣  Archivos con hash nuevo: {counters['hashed_files']}")
     return file_structure
 
-def generate_html_page(file_structure):
-    """Generar página HTML para visualizar los archivos"""
-    print(" Generando página HTML...")
-    
-    html_template = '''
+def new_manifest():
+    """Crear un manifiesto vacío"""
+    return {'version': MANIFEST_VERSION, 'directories': {}, 'files': {}}
+
+def load_manifest(manifest_path):
+    """Leer el manifiesto de una ejecución anterior; vacío si no es válido"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return new_manifest()
+
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return new_manifest()
+    return manifest
+
+def save_manifest(manifest, manifest_path):
+    """Guardar el manifiesto de forma atómica"""
+    ensure_directory(manifest_path.parent)
+    tmp = manifest_path.with_name(f".{manifest_path.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, manifest_path)
+
+def join_relative(relative_dir, name):
+    """Unir rutas relativas del manifiesto (siempre con '/')"""
+    return f"{relative_dir}/{name}" if relative_dir else name
+
+def walk_hardware_tree(root_dir, previous, manifest, counters, workers=None, with_hash=True,
+                       trust_dir_mtime=True, file_times=None):
+    """Recorrer root_dir con un pool de hilos y llenar el manifiesto
+
+    Cada directorio y cada lote de hasta SCAN_BATCH_SIZE archivos que
+    necesitan stat()/hash es un trabajo independiente; los resultados se
+    guardan por ruta relativa, así que el orden en que terminan los hilos no
+    afecta al resultado.
+    """
+    if file_times is not None:
+        # Las carpetas del manifiesto guardan fechas de git, no las del disco
+        trust_dir_mtime = False
+        previous = dict(previous, directories={})
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as executor:
+        pending = {executor.submit(list_directory, root_dir, '', previous): ('dir', '')}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, relative = pending.pop(future)
+
+                if kind == 'files':
+                    for child, (entry, hashed) in future.result():
+                        manifest['files'][child] = entry
+                        counters['hashed_files'] += hashed
+                    continue
+
+                record, reused = future.result()
+                manifest['directories'][relative] = record
+                counters['reused_dirs' if reused else 'scanned_dirs'] += 1
+
+                for name in record['folders']:
+                    child = join_relative(relative, name)
+                    future_dir = executor.submit(list_directory, root_dir / child, child, previous)
+                    pending[future_dir] = ('dir', child)
+
+                batch = []
+                for name in record['files']:
+                    child = join_relative(relative, name)
+                    cached = previous['files'].get(child)
+                    if reused and trust_dir_mtime and (cached.get('sha256') or not with_hash):
+                        # Nada se agregó, eliminó o reemplazó en este directorio
+                        manifest['files'][child] = cached
+                        continue
+                    batch.append((child, cached))
+                for start in range(0, len(batch), SCAN_BATCH_SIZE):
+                    future_files = executor.submit(
+                        scan_file_batch, root_dir, batch[start:start + SCAN_BATCH_SIZE], with_hash,
+                        file_times
+                    )
+                    pending[future_files] = ('files', relative)
+
+def list_directory(dir_path, relative_dir, previous):
+    """Listar un directorio, o reutilizar su registro si su fecha no cambió"""
+    dir_mtime = dir_path.stat().st_mtime_ns
+    cached_dir = previous['directories'].get(relative_dir)
+
+    if (cached_dir and cached_dir['mtime_ns'] == dir_mtime
+            and all(join_relative(relative_dir, name) in previous['files']
+                    for name in cached_dir['files'])):
+        return cached_dir, True
+
+    file_names = []
+    folder_names = []
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                folder_names.append(entry.name)
+            elif entry.is_file():
+                file_names.append(entry.name)
+
+    record = {
+        'mtime_ns': dir_mtime,
+        'files': sorted(file_names),
+        'folders': sorted(folder_names),
+    }
+    return record, False
+
+def scan_file_batch(root_dir, batch, with_hash=True, file_times=None):
+    """Escanear un lote de archivos [(ruta relativa, entrada anterior)]"""
+    file_times = file_times or {}
+    return [(child, scan_file_entry(root_dir / child, cached, with_hash, file_times.get(child)))
+            for child, cached in batch]
+
+def scan_file_entry(file_path, cached, with_hash=True, commit_time=None):
+    """Crear la entrada de manifiesto de un archivo, reutilizando el hash si no cambió
+
+    commit_time (segundos) reemplaza la fecha del sistema de archivos.
+    Devuelve la entrada y si fue necesario calcular un hash nuevo.
+    """
+    stat = file_path.stat()
+    mtime_ns = stat.st_mtime_ns if commit_time is None else commit_time * 10**9
+    if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == mtime_ns:
+        if cached.get('sha256') or not with_hash:
+            return cached, False
+        return dict(cached, sha256=file_hash(file_path)), True
+
+    entry = {
+        'size': stat.st_size,
+        'mtime_ns': mtime_ns,
+        'type': get_file_type(file_path.suffix.lower()),
+        'sha256': file_hash(file_path) if with_hash else None,
+    }
+    return entry, with_hash
+
+def build_structure(manifest, relative_dir='', stats=None):
+    """Construir la estructura anidada {'files', 'folders'} desde el manifiesto
+
+    Cada archivo es un FileRecord; si se pasa stats, se cuenta en el mismo
+    recorrido.
+    """
+    record = manifest['directories'][relative_dir]
+    node = {'files': [], 'folders': {}}
+    files = manifest['files']
+
+    for name in record['files']:
+        relative = join_relative(relative_dir, name)
+        entry = files[relative]
+        file_info = FileRecord(relative, entry['size'], entry['mtime_ns'], entry.get('sha256'))
+        node['files'].append(file_info)
+        if stats is not None:
+            count_file(stats, file_info)
+
+    for name in record['folders']:
+        node['folders'][name] = build_structure(manifest, join_relative(relative_dir, name), stats)
+
+    return node
+
+# Plantilla de hardware.html; se compila una sola vez con get_page_template()
+HTML_TEMPLATE = '''
 <!DOCTYPE html>
 <html lang="es">
 <head>
@@ -191,6 +679,16 @@ def generate_html_page(file_structure):
                                 <strong>Tamaño Total:</strong> {{ stats.total_size }}
                             </div>
                         </div>
+                        {% if stats.deduplicated %}
+                        <div class="row mt-2">
+                            <div class="col-md-3">
+                                <strong>Archivos Únicos:</strong> {{ stats.unique_files }}
+                            </div>
+                            <div class="col-md-3">
+                                <strong>Ahorro por Duplicados:</strong> {{ stats.saved_size }}
+                            </div>
+                        </div>
+                        {% endif %}
                     </div>
                 </div>
             </div>
@@ -205,7 +703,11 @@ def generate_html_page(file_structure):
                         </h5>
                     </div>
                     <div class="card-body">
-                        {{ render_tree(file_structure, "") }}
+                        {% if lazy %}
+                        <div id="hardwareTree" data-index="{{ root_index }}"></div>
+                        {% else %}
+                        {% for chunk in tree_chunks %}{{ chunk }}{% endfor %}
+                        {% endif %}
                     </div>
                 </div>
             </div>
@@ -242,6 +744,9 @@ def generate_html_page(file_structure):
                 </div>
                 <div class="modal-body p-0">
                     <iframe id="pdfViewer" class="pdf-viewer" src=""></iframe>
+                    <div id="pdfPreview" class="text-center p-3" style="display: none;">
+                        <img id="pdfPreviewImage" src="" alt="Primera página" class="img-fluid">
+                    </div>
                 </div>
                 <div class="modal-footer">
                     <a id="pdfDirectLink" href="" target="_blank" class="btn btn-primary">
@@ -258,16 +763,29 @@ def generate_html_page(file_structure):
     <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
     <script>
         // Función para mostrar vista previa de imágenes
-        function previewImage(src, title) {
-            document.getElementById('modalImage').src = src;
+        // preview (opcional) es la miniatura generada; el enlace directo sigue siendo el original
+        function previewImage(src, title, preview) {
+            document.getElementById('modalImage').src = preview || src;
             document.getElementById('imageModalLabel').textContent = title;
             document.getElementById('imageDirectLink').href = src;
             new bootstrap.Modal(document.getElementById('imageModal')).show();
         }
 
         // Función para mostrar vista previa de PDFs
-        function previewPDF(src, title) {
-            document.getElementById('pdfViewer').src = src;
+        // Con preview se muestra la primera página renderizada en lugar de cargar el PDF completo
+        function previewPDF(src, title, preview) {
+            const viewer = document.getElementById('pdfViewer');
+            const previewBox = document.getElementById('pdfPreview');
+            if (preview) {
+                viewer.src = '';
+                viewer.style.display = 'none';
+                document.getElementById('pdfPreviewImage').src = preview;
+                previewBox.style.display = 'block';
+            } else {
+                viewer.src = src;
+                viewer.style.display = 'block';
+                previewBox.style.display = 'none';
+            }
             document.getElementById('pdfModalLabel').textContent = title;
             document.getElementById('pdfDirectLink').href = src;
             document.getElementById('pdfDownloadLink').href = src;
@@ -278,6 +796,11 @@ def generate_html_page(file_structure):
         function toggleFolder(element) {
             const content = element.nextElementSibling;
             const icon = element.querySelector('.folder-toggle');
+
+            // En modo lazy la carpeta se descarga la primera vez que se expande
+            if (content.dataset.index && !content.dataset.loaded) {
+                loadFolder(content);
+            }
             
             if (content.style.display === 'none') {
                 content.style.display = 'block';
@@ -306,171 +829,625 @@ def generate_html_page(file_structure):
                 }
             }
         });
-    </script>
-</body>
-</html>
-    '''
-    
-    def get_file_icon(file_type, extension):
-        """Obtener icono según el tipo de archivo"""
-        if file_type == 'image':
-            return 'bi-file-earmark-image'
-        elif file_type == 'document':
-            if extension == '.pdf':
-                return 'bi-file-earmark-pdf'
-            else:
-                return 'bi-file-earmark-text'
-        else:
-            return 'bi-file-earmark'
+        {% if lazy %}
 
-    def render_tree(structure, path_prefix):
-        """Renderizar árbol de archivos"""
-        html = ""
-        
-        # Renderizar archivos del nivel actual primero
-        if 'files' in structure and structure['files']:
-            for file_info in structure['files']:
-                icon_class = get_file_icon(file_info['type'], file_info['extension'])
-                type_color = {
-                    'image': 'success',
-                    'document': 'primary',
-                    'data': 'info',
-                    'other': 'secondary'
-                }.get(file_info['type'], 'secondary')
-                
-                file_link = f"hardware/{file_info['path'].replace('hardware/', '')}"
-                
-                # Configurar enlaces según el tipo de archivo
-                if file_info['type'] == 'image':
-                    # Imágenes: preview modal + enlace directo
-                    click_action = f"previewImage('{file_link}', '{file_info['name']}')"
-                    link_attrs = f'style="cursor: pointer;" onclick="{click_action}" title="Click para vista previa - Ctrl+Click para abrir en nueva pestaña" oncontextmenu="window.open(\'{file_link}\', \'_blank\'); return false;"'
-                elif file_info['extension'].lower() == '.pdf':
-                    # PDFs: abrir en nueva pestaña con viewer integrado
-                    link_attrs = f'href="{file_link}" target="_blank" title="Abrir PDF en nueva pestaña"'
-                else:
-                    # Otros archivos: abrir en nueva pestaña
-                    link_attrs = f'href="{file_link}" target="_blank" title="Abrir archivo en nueva pestaña"'
-                
-                # Agregar enlaces simples según tipo de archivo
-                extra_links = ""
-                if file_info['extension'].lower() == '.pdf':
-                    extra_links = f'''
-                    <small class="ms-2">
-                        <a href="#" onclick="previewPDF('{file_link}', '{file_info['name']}')" title="Vista previa">ver</a> |
-                        <a href="{file_link}" target="_blank" title="Abrir en nueva pestaña">abrir</a> |
-                        <a href="{file_link}" download title="Descargar">descargar</a>
-                    </small>
-                    '''
-                elif file_info['type'] == 'image':
-                    extra_links = f'''
-                    <small class="ms-2">
-                        <a href="#" onclick="previewImage('{file_link}', '{file_info['name']}')" title="Vista previa">ver</a> |
-                        <a href="{file_link}" target="_blank" title="Abrir en nueva pestaña">abrir</a>
-                    </small>
-                    '''
-                
-                html += f'''
-                <div class="d-flex align-items-center justify-content-between file-item">
+        // Modo lazy: el árbol se construye desde un índice JSON por carpeta
+        const TYPE_COLORS = {image: 'success', document: 'primary', data: 'info', other: 'secondary'};
+
+        function escapeHtml(text) {
+            const entities = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'};
+            return String(text).replace(/[&<>"']/g, c => entities[c]);
+        }
+
+        // Argumento de JavaScript entre comillas simples dentro de un atributo
+        function jsArg(text) {
+            return escapeHtml(String(text).replace(/\\\\/g, '\\\\\\\\').replace(/'/g, "\\\\'"));
+        }
+
+        function fileIcon(type, extension) {
+            if (type === 'image') return 'bi-file-earmark-image';
+            if (type === 'document') return extension === '.pdf' ? 'bi-file-earmark-pdf' : 'bi-file-earmark-text';
+            return 'bi-file-earmark';
+        }
+
+        function renderFile(f) {
+            const href = escapeHtml(f.p);
+            const arg = jsArg(f.p);
+            const nameArg = jsArg(f.n);
+            const previewArg = f.v ? `, '${jsArg(f.v)}'` : '';
+            let attrs = `href="${href}" target="_blank" title="Abrir archivo en nueva pestaña"`;
+            let extra = '';
+
+            if (f.t === 'image') {
+                attrs = `style="cursor: pointer;" onclick="previewImage('${arg}', '${nameArg}'${previewArg})" title="Click para vista previa - Ctrl+Click para abrir en nueva pestaña" oncontextmenu="window.open('${arg}', '_blank'); return false;"`;
+                extra = `<small class="ms-2">
+                        <a href="#" onclick="previewImage('${arg}', '${nameArg}'${previewArg})" title="Vista previa">ver</a> |
+                        <a href="${href}" target="_blank" title="Abrir en nueva pestaña">abrir</a>
+                    </small>`;
+            } else if (f.e === '.pdf') {
+                attrs = `href="${href}" target="_blank" title="Abrir PDF en nueva pestaña"`;
+                extra = `<small class="ms-2">
+                        <a href="#" onclick="previewPDF('${arg}', '${nameArg}'${previewArg})" title="Vista previa">ver</a> |
+                        <a href="${href}" target="_blank" title="Abrir en nueva pestaña">abrir</a> |
+                        <a href="${href}" download="${escapeHtml(f.n)}" title="Descargar">descargar</a>
+                    </small>`;
+            }
+
+            return `<div class="d-flex align-items-center justify-content-between file-item">
                     <div class="d-flex align-items-center flex-grow-1">
-                        <i class="bi {icon_class} file-icon"></i>
-                        <a {link_attrs} class="file-link me-2">{file_info['name']}</a>
-                        <span class="badge bg-{type_color} type-badge me-2">{file_info['type']}</span>
-                        {extra_links}
+                        <i class="bi ${fileIcon(f.t, f.e)} file-icon"></i>
+                        <a ${attrs} class="file-link me-2">${escapeHtml(f.n)}</a>
+                        <span class="badge bg-${TYPE_COLORS[f.t] || 'secondary'} type-badge me-2">${escapeHtml(f.t)}</span>
+                        ${extra}
                     </div>
                     <div class="text-end ms-3">
-                        <small class="file-size d-block">{file_info['size_human']}</small>
-                        <small class="file-date">{file_info['modified']}</small>
+                        <small class="file-size d-block">${escapeHtml(f.s)}</small>
+                        <small class="file-date">${escapeHtml(f.m)}</small>
                     </div>
-                </div>
-                '''
-        
-        # Renderizar carpetas
-        if 'folders' in structure:
-            for folder_name, folder_data in structure['folders'].items():
-                folder_path = f"{path_prefix}/{folder_name}" if path_prefix else folder_name
-                folder_id = folder_path.replace('/', '_').replace(' ', '_')
-                
-                html += f'''
-                <div class="tree-item">
+                </div>`;
+        }
+
+        function renderFolder(d) {
+            return `<div class="tree-item">
                     <div class="d-flex align-items-center file-item" style="cursor: pointer;" onclick="toggleFolder(this)">
-                        <i class="bi bi-chevron-down folder-toggle"></i>
+                        <i class="bi bi-chevron-right folder-toggle"></i>
                         <i class="bi bi-folder-fill folder-icon file-icon"></i>
-                        <strong>{folder_name}</strong>
+                        <strong>${escapeHtml(d.n)}</strong>
                     </div>
-                    <div id="{folder_id}" class="ms-3">
+                    <div class="ms-3" style="display: none;" data-index="${escapeHtml(d.i)}"></div>
+                </div>`;
+        }
+
+        function loadFolder(container) {
+            container.dataset.loaded = 'loading';
+            return fetch(container.dataset.index)
+                .then(response => {
+                    if (!response.ok) throw new Error(response.status);
+                    return response.json();
+                })
+                .then(index => {
+                    container.innerHTML = index.files.map(renderFile).join('') + index.folders.map(renderFolder).join('');
+                    container.dataset.loaded = 'true';
+                })
+                .catch(() => {
+                    delete container.dataset.loaded;
+                    container.innerHTML = `<div class="text-danger small">No se pudo cargar ${escapeHtml(container.dataset.index)}</div>`;
+                });
+        }
+
+        loadFolder(document.getElementById('hardwareTree'));
+        {% endif %}
+    </script>
+</body>
+</html>
+'''
+
+_page_template = None
+
+def get_file_icon(file_type, extension):
+    """Obtener icono según el tipo de archivo"""
+    if file_type == 'image':
+        return 'bi-file-earmark-image'
+    elif file_type == 'document':
+        if extension == '.pdf':
+            return 'bi-file-earmark-pdf'
+        else:
+            return 'bi-file-earmark-text'
+    else:
+        return 'bi-file-earmark'
+
+def iter_files(structure):
+    """Recorrer todos los file_info de la estructura anidada"""
+    yield from structure.get('files', [])
+    for folder_data in structure.get('folders', {}).values():
+        yield from iter_files(folder_data)
+
+def make_image_thumbnail(src, dst):
+    """Reducir una imagen a THUMBNAIL_MAX_SIZE y guardarla como WebP"""
+    from PIL import Image
+
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    with Image.open(src) as image:
+        image.thumbnail((THUMBNAIL_MAX_SIZE, THUMBNAIL_MAX_SIZE))
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+        image.save(tmp, format='WEBP', quality=80, method=4)
+    os.replace(tmp, dst)
+
+def make_pdf_preview(src, dst, pdftoppm):
+    """Renderizar la primera página de un PDF como PNG con pdftoppm"""
+    tmp_base = dst.with_name(f".{dst.stem}.tmp")
+    subprocess.run(
+        [pdftoppm, '-png', '-f', '1', '-l', '1', '-singlefile',
+         '-scale-to', str(THUMBNAIL_MAX_SIZE), str(src), str(tmp_base)],
+        check=True, capture_output=True
+    )
+    os.replace(tmp_base.with_suffix('.png'), dst)
+
+def generate_previews(file_structure, thumbs_dir=None, workers=None):
+    """Generar miniaturas WebP de imágenes y vistas previas PNG de PDFs
+
+    Cada derivado se nombra con el hash del contenido original, así solo se
+    regenera cuando el archivo cambia. Se agrega la clave 'preview' a cada
+    file_info que tenga derivado y se eliminan los que ya no se usan.
+    Requiere Pillow; las vistas previas de PDF requieren pdftoppm (poppler).
+    """
+    print("🖼️  Generando miniaturas y vistas previas...")
+    try:
+        from PIL import Image
+    except ImportError:
+        print("   ⚠️  Pillow no está instalado, se omiten las miniaturas")
+        return
+    pdftoppm = shutil.which('pdftoppm')
+    if not pdftoppm:
+        print("   ⚠️  pdftoppm no está disponible, se omiten las vistas previas de PDF")
+
+    thumbs_dir = Path(thumbs_dir or THUMBNAILS_DIR)
+    ensure_directory(thumbs_dir)
+
+    # Un trabajo por derivado: los archivos duplicados comparten la misma vista previa
+    jobs = {}
+    for file_info in iter_files(file_structure):
+        extension = file_info.extension
+        if extension in RASTER_EXTENSIONS:
+            suffix = 'webp'
+        elif extension == '.pdf':
+            suffix = 'png'
+        else:
+            continue
+        src = DOCS_DIR / get_file_link(file_info)
+        digest = file_info.sha256 or file_hash(src)
+        dst = thumbs_dir / f"{digest}-{THUMBNAIL_MAX_SIZE}.{suffix}"
+        # Sin pdftoppm solo se reutilizan vistas previas ya generadas
+        if suffix == 'png' and not pdftoppm and not dst.exists():
+            continue
+        jobs.setdefault(dst, (src, []))[1].append(file_info)
+
+    def build_one(item):
+        dst, (src, file_infos) = item
+        if dst.exists():
+            return 'reused'
+        try:
+            if dst.suffix == '.png':
+                make_pdf_preview(src, dst, pdftoppm)
+            else:
+                make_image_thumbnail(src, dst)
+        except (OSError, ValueError, subprocess.CalledProcessError, Image.DecompressionBombError) as e:
+            print(f"   ⚠️  No se pudo generar la vista previa de {file_infos[0].path}: {e}")
+            return 'failed'
+        return 'generated'
+
+    counts = {'generated': 0, 'reused': 0, 'failed': 0}
+    used = set()
+    items = sorted(jobs.items())
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as executor:
+        for (dst, (_, file_infos)), result in zip(items, executor.map(build_one, items)):
+            counts[result] += 1
+            if result != 'failed':
+                for file_info in file_infos:
+                    file_info.preview = f"{thumbs_dir.name}/{dst.name}"
+                used.add(dst.name)
+
+    for stale in thumbs_dir.iterdir():
+        if stale.is_file() and stale.name not in used:
+            stale.unlink()
+
+    print(f"   ✨ Generadas: {counts['generated']}, reutilizadas: {counts['reused']}, "
+          f"fallidas: {counts['failed']}")
+
+def blob_name(digest, extension):
+    """Ruta del blob de un contenido, relativa al almacén"""
+    return f"{digest[:2]}/{digest}{extension}"
+
+def store_blobs(file_structure, src_dir=None, blobs_dir=None, link_mode='auto', workers=None):
+    """Guardar cada contenido único una sola vez en el almacén de blobs
+
+    Los archivos idénticos (mismo hash y extensión) comparten un único blob
+    nombrado por su SHA-256; se agrega la clave 'blob' a cada file_info y se
+    eliminan los blobs que ya no se usan. La extensión se conserva para que
+    GitHub Pages sirva el tipo de contenido correcto.
+    """
+    print("🧬 Deduplicando archivos de hardware...")
+    src_dir = Path(src_dir or HARDWARE_DIR)
+    blobs_dir = Path(blobs_dir or BLOBS_DIR)
+    ensure_directory(blobs_dir)
+
+    jobs = {}
+    blob_sizes = {}
+    for file_info in iter_files(file_structure):
+        src = src_dir / file_info.relative
+        digest = file_info.sha256 or file_hash(src)
+        name = blob_name(digest, file_info.extension)
+        file_info.blob = f"{blobs_dir.name}/{name}"
+        jobs.setdefault(name, src)
+        blob_sizes[name] = file_info.size
+
+    def store_one(item):
+        name, src = item
+        dst = blobs_dir / name
+        if dst.exists():
+            return False
+        ensure_directory(dst.parent)
+        place_file(src, dst, link_mode)
+        return True
+
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as executor:
+        stored = sum(executor.map(store_one, sorted(jobs.items())))
+
+    removed = 0
+    for stale in sorted(blobs_dir.glob("*/*")):
+        if f"{stale.parent.name}/{stale.name}" not in jobs:
+            stale.unlink()
+            removed += 1
+    for folder in blobs_dir.iterdir():
+        if folder.is_dir() and not any(folder.iterdir()):
+            folder.rmdir()
+
+    print(f"   📦 Blobs únicos: {len(jobs)} (nuevos: {stored}, eliminados: {removed})")
+    if 'stats' in file_structure:
+        finish_stats(file_structure['stats'], blob_sizes)
+
+def get_file_link(file_info):
+    """Enlace relativo a hardware.html para un archivo escaneado"""
+    if file_info.blob:
+        return file_info.blob
+    return f"hardware/{file_info.path.replace('hardware/', '')}"
+
+def render_tree(structure, path_prefix):
+    """Renderizar árbol de archivos como un generador de fragmentos HTML
+
+    Cada archivo y cada apertura/cierre de carpeta se emite por separado, así
+    la memoria usada depende de la profundidad del árbol y no de su tamaño.
+    """
+    # Renderizar archivos del nivel actual primero
+    if 'files' in structure and structure['files']:
+        for file_info in structure['files']:
+            icon_class = get_file_icon(file_info.type, file_info.extension)
+            type_color = {
+                'image': 'success',
+                'document': 'primary',
+                'data': 'info',
+                'other': 'secondary'
+            }.get(file_info.type, 'secondary')
+
+            file_link = get_file_link(file_info)
+            preview_arg = f", '{file_info.preview}'" if file_info.preview else ""
+
+            # Configurar enlaces según el tipo de archivo
+            if file_info.type == 'image':
+                # Imágenes: preview modal + enlace directo
+                click_action = f"previewImage('{file_link}', '{file_info.name}'{preview_arg})"
+                link_attrs = f'style="cursor: pointer;" onclick="{click_action}" title="Click para vista previa - Ctrl+Click para abrir en nueva pestaña" oncontextmenu="window.open(\'{file_link}\', \'_blank\'); return false;"'
+            elif file_info.extension.lower() == '.pdf':
+                # PDFs: abrir en nueva pestaña con viewer integrado
+                link_attrs = f'href="{file_link}" target="_blank" title="Abrir PDF en nueva pestaña"'
+            else:
+                # Otros archivos: abrir en nueva pestaña
+                link_attrs = f'href="{file_link}" target="_blank" title="Abrir archivo en nueva pestaña"'
+
+            # Agregar enlaces simples según tipo de archivo
+            extra_links = ""
+            if file_info.extension.lower() == '.pdf':
+                extra_links = f'''
+                <small class="ms-2">
+                    <a href="#" onclick="previewPDF('{file_link}', '{file_info.name}'{preview_arg})" title="Vista previa">ver</a> |
+                    <a href="{file_link}" target="_blank" title="Abrir en nueva pestaña">abrir</a> |
+                    <a href="{file_link}" download="{file_info.name}" title="Descargar">descargar</a>
+                </small>
                 '''
-                
-                # Renderizar subcarpetas recursivamente
-                html += render_tree(folder_data, folder_path)
-                
-                html += '''
-                    </div>
-                </div>
+            elif file_info.type == 'image':
+                extra_links = f'''
+                <small class="ms-2">
+                    <a href="#" onclick="previewImage('{file_link}', '{file_info.name}'{preview_arg})" title="Vista previa">ver</a> |
+                    <a href="{file_link}" target="_blank" title="Abrir en nueva pestaña">abrir</a>
+                </small>
                 '''
-        
-        return html
 
-    # Calcular estadísticas
-    def calculate_stats(structure):
-        stats = {'total_files': 0, 'images': 0, 'documents': 0, 'total_size_bytes': 0}
-        
-        def count_recursive(struct):
-            # Contar archivos del nivel actual
-            if 'files' in struct:
-                for file_info in struct['files']:
-                    stats['total_files'] += 1
-                    stats['total_size_bytes'] += file_info['size']
-                    if file_info['type'] == 'image':
-                        stats['images'] += 1
-                    elif file_info['type'] == 'document':
-                        stats['documents'] += 1
-            
-            # Recursar en subcarpetas
-            if 'folders' in struct:
-                for folder_name, folder_data in struct['folders'].items():
-                    count_recursive(folder_data)
-        
-        count_recursive(structure)
-        stats['total_size'] = format_size(stats['total_size_bytes'])
-        return stats
+            yield f'''
+            <div class="d-flex align-items-center justify-content-between file-item">
+                <div class="d-flex align-items-center flex-grow-1">
+                    <i class="bi {icon_class} file-icon"></i>
+                    <a {link_attrs} class="file-link me-2">{file_info.name}</a>
+                    <span class="badge bg-{type_color} type-badge me-2">{file_info.type}</span>
+                    {extra_links}
+                </div>
+                <div class="text-end ms-3">
+                    <small class="file-size d-block">{file_info.size_human}</small>
+                    <small class="file-date">{file_info.modified}</small>
+                </div>
+            </div>
+            '''
+
+    # Renderizar carpetas
+    if 'folders' in structure:
+        for folder_name, folder_data in structure['folders'].items():
+            folder_path = f"{path_prefix}/{folder_name}" if path_prefix else folder_name
+            folder_id = folder_path.replace('/', '_').replace(' ', '_')
+
+            yield f'''
+            <div class="tree-item">
+                <div class="d-flex align-items-center file-item" style="cursor: pointer;" onclick="toggleFolder(this)">
+                    <i class="bi bi-chevron-down folder-toggle"></i>
+                    <i class="bi bi-folder-fill folder-icon file-icon"></i>
+                    <strong>{folder_name}</strong>
+                </div>
+                <div id="{folder_id}" class="ms-3">
+            '''
+
+            # Renderizar subcarpetas recursivamente
+            yield from render_tree(folder_data, folder_path)
+
+            yield '''
+                </div>
+            </div>
+            '''
+
+def new_stats():
+    """Contadores vacíos para las estadísticas de hardware.html"""
+    return {'total_files': 0, 'images': 0, 'documents': 0, 'total_size_bytes': 0}
+
+def count_file(stats, file_info):
+    """Sumar un archivo a las estadísticas"""
+    stats['total_files'] += 1
+    stats['total_size_bytes'] += file_info.size
+    if file_info.type == 'image':
+        stats['images'] += 1
+    elif file_info.type == 'document':
+        stats['documents'] += 1
+
+def finish_stats(stats, blob_sizes=None):
+    """Completar los totales legibles y el ahorro del modo --dedup
+
+    blob_sizes: {blob: tamaño} de cada contenido único; las repeticiones
+    son bytes ahorrados.
+    """
+    stats['total_size'] = format_size(stats['total_size_bytes'])
+    stats['deduplicated'] = bool(blob_sizes)
+    stats['unique_files'] = len(blob_sizes or ())
+    stats['saved_bytes'] = stats['total_size_bytes'] - sum(blob_sizes.values()) if blob_sizes else 0
+    stats['saved_size'] = format_size(stats['saved_bytes'])
+    return stats
+
+def calculate_stats(structure):
+    """Calcular estadísticas de una estructura que no las trae del escaneo"""
+    stats = new_stats()
+    blob_sizes = {}
+    for file_info in iter_files(structure):
+        count_file(stats, file_info)
+        if file_info.blob:
+            blob_sizes[file_info.blob] = file_info.size
+    return finish_stats(stats, blob_sizes)
+
+def folder_index_name(folder_path):
+    """Nombre estable del índice JSON de una carpeta"""
+    if not folder_path:
+        return "root.json"
+    return hashlib.sha1(folder_path.encode('utf-8')).hexdigest()[:16] + ".json"
+
+def write_if_changed(path, content):
+    """Escribir content en path solo si cambió; devuelve True si se escribió"""
+    data = content.encode('utf-8')
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+def write_folder_indexes(file_structure, index_dir=None):
+    """Escribir un índice JSON compacto por carpeta para el modo lazy
+
+    Cada índice lista solo los hijos directos de la carpeta; las subcarpetas
+    apuntan a su propio índice, que el navegador descarga al expandirlas.
+    Los índices de carpetas que ya no existen se eliminan.
+    Devuelve la ruta (relativa a docs/) del índice raíz.
+    """
+    index_dir = Path(index_dir or HARDWARE_INDEX_DIR)
+    ensure_directory(index_dir)
+
+    written = set()
+    pending = [("", file_structure)]
+    while pending:
+        folder_path, node = pending.pop()
+
+        # Claves cortas para que los índices pesen lo mínimo
+        index = {'files': [], 'folders': []}
+        for file_info in node.get('files', []):
+            index['files'].append({
+                'n': file_info.name,
+                'p': get_file_link(file_info),
+                't': file_info.type,
+                'e': file_info.extension,
+                's': file_info.size_human,
+                'm': file_info.modified,
+            })
+            if file_info.preview:
+                index['files'][-1]['v'] = file_info.preview
+        for folder_name, folder_data in node.get('folders', {}).items():
+            child_path = f"{folder_path}/{folder_name}" if folder_path else folder_name
+            index['folders'].append({
+                'n': folder_name,
+                'i': f"{index_dir.name}/{folder_index_name(child_path)}",
+            })
+            pending.append((child_path, folder_data))
+
+        name = folder_index_name(folder_path)
+        written.add(name)
+        write_if_changed(index_dir / name, json.dumps(index, ensure_ascii=False, separators=(',', ':')))
+
+    for stale in index_dir.glob("*.json"):
+        if stale.name not in written:
+            stale.unlink()
+
+    print(f"   🗂️  Índices de carpetas: {len(written)} en {index_dir}")
+    return f"{index_dir.name}/{folder_index_name('')}"
+
+def get_page_template():
+    """Compilar la plantilla de la página una sola vez"""
+    global _page_template
+    if _page_template is None:
+        _page_template = Template(HTML_TEMPLATE)
+    return _page_template
+
+def generate_html_page(file_structure, output_mode='full', build_time=None):
+    """Generar página HTML para visualizar los archivos
+
+    La página se escribe en streaming: el árbol se produce fragmento a
+    fragmento y la plantilla precompilada los vuelca directo al archivo.
+    Con output_mode='lazy' la página solo trae el esqueleto y el árbol se
+    carga por carpeta desde docs/hardware_index/. build_time fija la fecha
+    de "Generado" para compilaciones reproducibles.
+    """
+    print(" Generando página HTML...")
 
     # Preparar datos para el template
     template_data = {
-        'file_structure': file_structure,
-        'generated_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'stats': calculate_stats(file_structure),
-        'render_tree': render_tree
+        'generated_time': (datetime.fromtimestamp(build_time) if build_time is not None
+                           else datetime.now()).strftime('%Y-%m-%d %H:%M:%S'),
+        'stats': file_structure.get('stats') or calculate_stats(file_structure),
+        'lazy': output_mode == 'lazy',
     }
-    
-    # Renderizar template
-    template = Template(html_template)
-    html_content = template.render(**template_data)
-    
+
+    if output_mode == 'lazy':
+        template_data['root_index'] = write_folder_indexes(file_structure)
+        template_data['tree_chunks'] = ()
+    else:
+        # Los índices de una ejecución lazy anterior ya no se usan
+        if HARDWARE_INDEX_DIR.exists():
+            shutil.rmtree(HARDWARE_INDEX_DIR)
+        template_data['tree_chunks'] = render_tree(file_structure, "")
+
     # Guardar archivo HTML como hardware.html para no conflictuar con la documentación de Sphinx
     html_file = DOCS_DIR / "hardware.html"
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
+    tmp_file = html_file.with_name(f".{html_file.name}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        get_page_template().stream(**template_data).dump(f)
+    os.replace(tmp_file, html_file)
+
     print(f"📄 Página HTML generada: {html_file}")
 
-def main():
+def parse_args(argv=None):
+    """Leer las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Copia hardware/ a docs/hardware y genera docs/hardware.html"
+    )
+    parser.add_argument(
+        '--full-copy', action='store_true',
+        help="borrar docs/hardware y copiar todo de nuevo en lugar de sincronizar"
+    )
+    parser.add_argument(
+        '--link-mode', choices=LINK_MODES, default='auto',
+        help="cómo materializar los archivos sincronizados; 'hardlink' comparte el "
+             "inodo con hardware/ (default: auto = reflink o copia)"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=DEFAULT_WORKERS,
+        help=f"hilos para copiar, escanear y calcular hashes (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        '--no-hash', action='store_true',
+        help="no calcular el SHA-256 de archivos nuevos durante el escaneo"
+    )
+    parser.add_argument(
+        '--output-mode', choices=OUTPUT_MODES, default='full',
+        help="'full' incrusta todo el árbol en hardware.html; 'lazy' genera un "
+             "índice JSON por carpeta que se carga al expandirla (default: full)"
+    )
+    parser.add_argument(
+        '--no-thumbnails', action='store_true',
+        help="no generar miniaturas de imágenes ni vistas previas de PDFs"
+    )
+    parser.add_argument(
+        '--dedup', action='store_true',
+        help="publicar cada contenido único una sola vez en docs/hardware_blobs "
+             "en lugar de copiar el árbol a docs/hardware"
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help="ignorar hardware_manifest.json y volver a escanear todo el árbol"
+    )
+    parser.add_argument(
+        '--reproducible', action='store_true',
+        help="salida idéntica entre compilaciones: fecha de SOURCE_DATE_EPOCH o del último "
+             "commit y fechas de archivo de git (activo si SOURCE_DATE_EPOCH está definido)"
+    )
+    parser.add_argument(
+        '--docs-dir',
+        help=f"directorio donde publicar en lugar de {DOCS_DIR}"
+    )
+    build_trace.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Función principal"""
+    args = parse_args(argv)
+    if args.docs_dir:
+        set_docs_dir(args.docs_dir)
+    with build_trace.session('copy_hardware_docs', args.trace, args.profiler):
+        run(args)
+
+def run(args):
+    """Copiar, escanear y generar hardware.html según las opciones de main()"""
     print("🚀 Iniciando proceso de copia y generación de documentación de hardware...")
+
+    build_time = None
+    file_times = None
+    if args.reproducible or os.environ.get('SOURCE_DATE_EPOCH'):
+        build_time = source_date_epoch()
+        if build_time is None:
+            print("   ⚠️  Sin SOURCE_DATE_EPOCH ni historial de git, se usa la fecha actual")
+        else:
+            with build_trace.stage('hardware.reproducible') as record:
+                file_times = reproducible_file_times(build_time)
+                record['files'] = len(file_times)
     
     try:
-        # Copiar archivos
-        copy_hardware_files()
-        
-        # Escanear archivos copiados
-        file_structure = scan_copied_files()
+        if args.dedup:
+            # Escanear hardware/ directamente y publicar solo blobs únicos
+            with build_trace.stage('hardware.scan') as record:
+                file_structure = scan_copied_files(use_cache=not args.no_cache, workers=args.workers,
+                                                   root_dir=HARDWARE_DIR, trust_dir_mtime=False,
+                                                   file_times=file_times)
+                record['files'] = file_structure['stats']['total_files']
+            with build_trace.stage('hardware.blobs'):
+                store_blobs(file_structure, HARDWARE_DIR, BLOBS_DIR, args.link_mode, args.workers)
+            if DOCS_HARDWARE_DIR.exists():
+                shutil.rmtree(DOCS_HARDWARE_DIR)
+        else:
+            # Copiar archivos
+            with build_trace.stage('hardware.copy') as record:
+                report = copy_hardware_files(full_copy=args.full_copy, link_mode=args.link_mode,
+                                             workers=args.workers)
+                if report:
+                    record['files'] = len(report['added']) + len(report['updated'])
+                    record['removed'] = len(report['removed'])
+                    record['unchanged'] = report['unchanged']
+
+            # Escanear archivos copiados
+            with build_trace.stage('hardware.scan') as record:
+                file_structure = scan_copied_files(use_cache=not args.no_cache, workers=args.workers,
+                                                   with_hash=not args.no_hash, file_times=file_times)
+                record['files'] = file_structure['stats']['total_files']
+            if BLOBS_DIR.exists():
+                shutil.rmtree(BLOBS_DIR)
         
+        # Generar miniaturas y vistas previas
+        if not args.no_thumbnails:
+            with build_trace.stage('hardware.previews'):
+                generate_previews(file_structure, workers=args.workers)
+
         # Generar página HTML
-        generate_html_page(file_structure)
+        with build_trace.stage('hardware.render', output_mode=args.output_mode) as record:
+            generate_html_page(file_structure, output_mode=args.output_mode, build_time=build_time)
+            record['files'] = file_structure['stats']['total_files']
         
         print("\n✅ Proceso completado exitosamente!")
-        print(f"📁 Archivos copiados en: {DOCS_HARDWARE_DIR}")
+        print(f"📁 Archivos copiados en: {BLOBS_DIR if args.dedup else DOCS_HARDWARE_DIR}")
         print(f"📄 Página HTML disponible en: {DOCS_DIR}/hardware.html")
+        print(f"🗂️  Manifiesto de archivos: {MANIFEST_FILE}")
         print(f"💡 La documentación de Sphinx permanece en: {DOCS_DIR}/index.html")
         
     except Exception as e:
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Script para preparar docs/ para caché de larga duración.
+
+- Copia cada archivo de _static/ e _images/ a un nombre con el hash de su
+  contenido (tema.3f9a1c0b2d.css) y reescribe las referencias en HTML y CSS.
+  Los nombres originales se conservan para scripts que construyen rutas en
+  tiempo de ejecución; en git ambos comparten el mismo blob.
+- Escribe hermanos .gz y .br de los archivos de texto para servidores o
+  CDNs que sirven contenido precomprimido.
+- Guarda docs/asset_manifest.json con el nombre con hash, el SHA-256 y los
+  tamaños comprimidos de cada archivo.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+
+from copy_hardware_docs import DEFAULT_WORKERS, DOCS_DIR, MANIFEST_FILE, write_if_changed
+from publish_docs import PUBLISH_MANIFEST_FILE
+
+ASSET_MANIFEST_FILE = DOCS_DIR / "asset_manifest.json"
+# Manifiestos del pipeline: cambian después de precomprimir (publish_docs.py
+# --record reescribe el suyo) y no se sirven a los navegadores
+PIPELINE_MANIFESTS = {ASSET_MANIFEST_FILE.name, PUBLISH_MANIFEST_FILE.name, MANIFEST_FILE.name}
+ASSET_MANIFEST_VERSION = 1
+# Carpetas cuyos archivos reciben nombre con hash (relativas a docs/)
+FINGERPRINT_DIRS = ('_static', '_images')
+# Archivos publicados por el usuario: se enlazan por nombre desde fuera
+EXCLUDED_DIRS = {'hardware', 'hardware_blobs', 'hardware_thumbs', 'hardware_index', '.git'}
+TEXT_EXTENSIONS = {'.html', '.css', '.js', '.json', '.svg', '.txt', '.xml', '.map'}
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+# Solo se guarda la versión comprimida si ahorra al menos un 10 %
+MIN_COMPRESSION_RATIO = 0.9
+HASH_LENGTH = 10
+
+HASHED_NAME_RE = re.compile(rf'\.[0-9a-f]{{{HASH_LENGTH}}}(?=\.[^./]+$)')
+HTML_REF_RE = re.compile(r'\b(src|href)="([^"#?:]+)(?:\?[^"#]*)?(#[^"]*)?"')
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")?#:]+)(?:\?[^\'")#]*)?(#[^\'")]*)?\1\s*\)')
+# @import "otro.css" sin url(); la forma con url() ya la cubre CSS_URL_RE
+CSS_IMPORT_RE = re.compile(r'@import\s+([\'"])([^\'"?#:]+)(?:\?[^\'"#]*)?(#[^\'"]*)?\1')
+CSS_PATTERNS = (CSS_URL_RE, CSS_IMPORT_RE)
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hashed_name(relative, digest):
+    """_static/tema.css -> _static/tema.<hash>.css"""
+    path = PurePosixPath(relative)
+    return str(path.with_name(f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}"))
+
+
+def load_asset_manifest(manifest_path=None):
+    """Leer el manifiesto anterior; si no existe o es de otra versión, vacío"""
+    try:
+        manifest = json.loads(Path(manifest_path or ASSET_MANIFEST_FILE).read_text(encoding='utf-8'))
+        if manifest.get('version') == ASSET_MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': ASSET_MANIFEST_VERSION, 'assets': {}, 'compressed': {}}
+
+
+def iter_site_files(docs_dir):
+    """Archivos del sitio (sin hardware ni hermanos comprimidos), rutas relativas"""
+    for root, dirs, files in os.walk(docs_dir):
+        if Path(root) == docs_dir:
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        for name in files:
+            if name.endswith(COMPRESSED_SUFFIXES):
+                continue
+            yield (Path(root) / name).relative_to(docs_dir).as_posix()
+
+
+def resolve_reference(url, base_dir):
+    """Ruta relativa a docs/ de una referencia hecha desde base_dir"""
+    if url.startswith(('/', 'data:', 'mailto:')):
+        return None
+    return os.path.normpath(os.path.join(base_dir, url)).replace(os.sep, '/')
+
+
+def relative_reference(target, base_dir):
+    return os.path.relpath(target, base_dir or '.').replace(os.sep, '/')
+
+
+def rewrite_references(text, relative, mapping, pattern):
+    """Apuntar las referencias de un HTML/CSS a los nombres con hash"""
+    base_dir = os.path.dirname(relative)
+
+    def replace(match):
+        if pattern is HTML_REF_RE:
+            attr, url, fragment = match.groups()
+        else:
+            quote, url, fragment = match.groups()
+        target = mapping.get(resolve_reference(url, base_dir))
+        if target is None:
+            return match.group(0)
+        new_url = relative_reference(target, base_dir) + (fragment or '')
+        if pattern is HTML_REF_RE:
+            return f'{attr}="{new_url}"'
+        if pattern is CSS_IMPORT_RE:
+            return f'@import {quote}{new_url}{quote}'
+        return f'url({quote}{new_url}{quote})'
+
+    return pattern.sub(replace, text)
+
+
+def rewrite_css(text, relative, mapping):
+    """Apuntar url() e @import de un CSS a los nombres con hash"""
+    for pattern in CSS_PATTERNS:
+        text = rewrite_references(text, relative, mapping, pattern)
+    return text
+
+
+def css_dependency_order(css_texts):
+    """CSS ordenados de modo que cada uno va después de los CSS que referencia
+
+    Así, al reescribir un CSS ya existe el nombre con hash de los que importa y
+    su propio hash cambia cuando cambia alguno de ellos. Un ciclo de @import se
+    corta en el primer archivo repetido.
+    """
+    dependencies = {}
+    for relative, text in css_texts.items():
+        base_dir = os.path.dirname(relative)
+        targets = {resolve_reference(match.group(2), base_dir)
+                   for pattern in CSS_PATTERNS for match in pattern.finditer(text)}
+        dependencies[relative] = sorted(targets.intersection(css_texts) - {relative})
+
+    order = []
+    visiting = set()
+    done = set()
+
+    def visit(relative):
+        if relative in done or relative in visiting:
+            return
+        visiting.add(relative)
+        for dependency in dependencies[relative]:
+            visit(dependency)
+        visiting.discard(relative)
+        done.add(relative)
+        order.append(relative)
+
+    for relative in sorted(css_texts):
+        visit(relative)
+    return order
+
+
+def fingerprint_assets(docs_dir, previous):
+    """Copiar cada asset a su nombre con hash y devolver el mapeo original -> hash
+
+    Los CSS se procesan al final y en orden de dependencias: sus url() e
+    @import se reescriben antes de calcular su hash, así el nombre cambia
+    cuando cambia una imagen, fuente u otro CSS que usan.
+    """
+    old_hashed = {info['hashed'] for info in previous['assets'].values()}
+    assets = {}
+    mapping = {}
+
+    candidates = []
+    for relative in sorted(iter_site_files(docs_dir)):
+        if relative.split('/', 1)[0] not in FINGERPRINT_DIRS or relative in old_hashed:
+            continue
+        # Copia con hash de una ejecución anterior aunque falte el manifiesto
+        if HASHED_NAME_RE.search(relative) and (docs_dir / HASHED_NAME_RE.sub('', relative)).exists():
+            continue
+        candidates.append(relative)
+
+    def publish(relative, data):
+        digest = sha256_bytes(data)
+        target = hashed_name(relative, digest)
+        write_if_changed_bytes(docs_dir / target, data)
+        assets[relative] = {'hashed': target, 'sha256': digest, 'size': len(data)}
+        mapping[relative] = target
+
+    css = {c: (docs_dir / c).read_text(encoding='utf-8') for c in candidates if c.endswith('.css')}
+    for relative in candidates:
+        if relative not in css:
+            publish(relative, (docs_dir / relative).read_bytes())
+    for relative in css_dependency_order(css):
+        publish(relative, rewrite_css(css[relative], relative, mapping).encode('utf-8'))
+
+    # Páginas que no se regeneraron todavía apuntan a nombres con hash viejos
+    for original, info in previous['assets'].items():
+        if original in mapping and info['hashed'] != mapping[original]:
+            mapping[info['hashed']] = mapping[original]
+
+    # Eliminar nombres con hash que ya no corresponden a ningún original
+    current = {info['hashed'] for info in assets.values()}
+    removed = 0
+    for stale in old_hashed - current:
+        path = docs_dir / stale
+        if path.exists():
+            path.unlink()
+            removed += 1
+    return assets, mapping, removed
+
+
+def write_if_changed_bytes(path, data):
+    """Versión binaria de write_if_changed"""
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def rewrite_html_pages(docs_dir, mapping):
+    """Reescribir src/href de las páginas HTML; devuelve cuántas cambiaron"""
+    changed = 0
+    for relative in iter_site_files(docs_dir):
+        if not relative.endswith('.html'):
+            continue
+        path = docs_dir / relative
+        text = path.read_text(encoding='utf-8')
+        changed += write_if_changed(path, rewrite_references(text, relative, mapping, HTML_REF_RE))
+    return changed
+
+
+def get_brotli():
+    """Módulo brotli si está instalado; los .br se omiten si no"""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        print("   ⚠️  brotli no está instalado, solo se generan archivos .gz")
+        return None
+
+
+def compress_file(docs_dir, relative, previous, brotli):
+    """Escribir .gz/.br de un archivo si su contenido cambió desde la última vez"""
+    path = docs_dir / relative
+    data = path.read_bytes()
+    digest = sha256_bytes(data)
+    cached = previous.get(relative)
+    record = {'sha256': digest, 'size': len(data)}
+
+    encoders = {'.gz': lambda d: gzip.compress(d, compresslevel=9, mtime=0)}
+    if brotli:
+        encoders['.br'] = lambda d: brotli.compress(d, quality=11)
+
+    written = 0
+    for suffix, encode in encoders.items():
+        sibling = path.with_name(path.name + suffix)
+        key = suffix.lstrip('.')
+        if cached and cached['sha256'] == digest and key in cached and sibling.exists():
+            record[key] = cached[key]
+            continue
+        compressed = encode(data)
+        if len(compressed) > len(data) * MIN_COMPRESSION_RATIO:
+            if sibling.exists():
+                sibling.unlink()
+            continue
+        write_if_changed_bytes(sibling, compressed)
+        record[key] = len(compressed)
+        written += 1
+    return relative, record, written
+
+
+def precompress(docs_dir, previous, workers=None):
+    """Generar hermanos comprimidos de todos los archivos de texto del sitio"""
+    brotli = get_brotli()
+    texts = [r for r in iter_site_files(docs_dir)
+             if PurePosixPath(r).suffix.lower() in TEXT_EXTENSIONS and r not in PIPELINE_MANIFESTS]
+
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as executor:
+        results = list(executor.map(lambda r: compress_file(docs_dir, r, previous, brotli), texts))
+
+    compressed = {relative: record for relative, record, _ in results}
+    written = sum(count for _, _, count in results)
+
+    # Hermanos cuyo original ya no existe o es un manifiesto del pipeline
+    removed = 0
+    for root, dirs, files in os.walk(docs_dir):
+        top_level = Path(root) == docs_dir
+        if top_level:
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        for name in files:
+            if not name.endswith(COMPRESSED_SUFFIXES):
+                continue
+            if (top_level and name[:-3] in PIPELINE_MANIFESTS) or not (Path(root) / name[:-3]).exists():
+                (Path(root) / name).unlink()
+                removed += 1
+    return compressed, written, removed
+
+
+def build_asset_manifest(docs_dir=None, workers=None):
+    """Asignar nombres con hash, reescribir referencias y precomprimir docs/"""
+    docs_dir = Path(docs_dir or DOCS_DIR)
+    manifest_path = docs_dir / ASSET_MANIFEST_FILE.name
+    print("🔏 Generando nombres con hash y archivos precomprimidos...")
+    previous = load_asset_manifest(manifest_path)
+
+    assets, mapping, removed_assets = fingerprint_assets(docs_dir, previous)
+    pages = rewrite_html_pages(docs_dir, mapping)
+    print(f"   🏷️  Assets con hash: {len(assets)} (obsoletos eliminados: {removed_assets})")
+    print(f"   📝 Páginas HTML reescritas: {pages}")
+
+    compressed, written, removed = precompress(docs_dir, previous.get('compressed', {}), workers)
+    original = sum(r['size'] for r in compressed.values())
+    gz = sum(r.get('gz', r['size']) for r in compressed.values())
+    print(f"   🗜️  Archivos de texto: {len(compressed)} (comprimidos de nuevo: {written}, "
+          f"eliminados: {removed})")
+    if original:
+        print(f"   📉 gzip: {original / 1024:.0f} KB -> {gz / 1024:.0f} KB")
+
+    manifest = {'version': ASSET_MANIFEST_VERSION, 'assets': assets, 'compressed': compressed}
+    write_if_changed(manifest_path, json.dumps(manifest, indent=1, sort_keys=True))
+    return manifest
+
+
+def parse_args(argv=None):
+    """Leer las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Asigna nombres con hash a los assets de docs/ y genera .gz/.br"
+    )
+    parser.add_argument(
+        '--docs-dir', default=str(DOCS_DIR),
+        help=f"directorio publicado (default: {DOCS_DIR})"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=DEFAULT_WORKERS,
+        help=f"hilos para comprimir (default: {DEFAULT_WORKERS})"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal"""
+    args = parse_args(argv)
+    build_asset_manifest(args.docs_dir, args.workers)
+    print(f"✅ Manifiesto de assets: {Path(args.docs_dir) / ASSET_MANIFEST_FILE.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Script para publicar la salida de Sphinx en docs/ aplicando solo los cambios.
+
+Arma el árbol de staging (HTML de Sphinx, PDF y .nojekyll), lo compara por
+hash de contenido con docs/ y aplica únicamente altas, actualizaciones y
+bajas. Lo que generan otros scripts (docs/hardware, hardware.html y demás
+salidas de copy_hardware_docs.py, el índice de búsqueda y los assets con
+hash) se deja en su lugar.
+
+Los pasos posteriores reescriben algunas páginas (search.html, referencias a
+assets con hash). docs/publish_manifest.json guarda el hash de staging de cada
+archivo publicado y el hash que quedó en docs/, para no volver a copiar una
+página solo porque otro script la modificó después.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from copy_hardware_docs import BASE_DIR, DEFAULT_WORKERS, DOCS_DIR, file_hash, write_if_changed
+
+SPHINX_HTML_DIR = BASE_DIR / "software" / "sphinx" / "docs"
+SPHINX_PDF_DIR = BASE_DIR / "software" / "sphinx" / "pdf"
+PUBLISH_MANIFEST_FILE = DOCS_DIR / "publish_manifest.json"
+PUBLISH_MANIFEST_VERSION = 1
+
+# Entradas de docs/ que pertenecen a otros scripts y nunca se borran
+PRESERVED_ENTRIES = {
+    # copy_hardware_docs.py
+    'hardware', 'hardware.html', 'hardware_manifest.json', 'hardware_index',
+    'hardware_thumbs', 'hardware_blobs',
+    # build_search_index.py
+    'search_index',
+    # fingerprint_assets.py
+    'asset_manifest.json',
+    # build_site.py
+    'product_briefs',
+    # este script
+    PUBLISH_MANIFEST_FILE.name,
+}
+# Hermanos precomprimidos de fingerprint_assets.py (él mismo borra los huérfanos)
+PRESERVED_SUFFIXES = ('.gz', '.br')
+
+
+def build_staging(html_dir, pdf_dir, pdf_name):
+    """Árbol de staging: {ruta relativa en docs/: archivo de origen o bytes}"""
+    staging = {}
+    html_dir = Path(html_dir)
+    if html_dir.is_dir():
+        for root, dirs, files in os.walk(html_dir):
+            # Igual que `cp -r docs/*`: sin .buildinfo ni otros archivos ocultos de Sphinx
+            if Path(root) == html_dir:
+                dirs[:] = [d for d in dirs if not d.startswith('.')]
+                files = [f for f in files if not f.startswith('.')]
+            for name in files:
+                source = Path(root) / name
+                staging[source.relative_to(html_dir).as_posix()] = source
+    else:
+        print(f"   ⚠️  {html_dir} no existe, no se publica HTML de Sphinx")
+
+    pdfs = sorted(Path(pdf_dir).glob("*.pdf")) if pdf_dir else []
+    if pdfs:
+        staging[pdf_name] = pdfs[0]
+    else:
+        print(f"   ⚠️  No se encontró PDF en {pdf_dir}")
+
+    # Permitir archivos especiales en GitHub Pages
+    staging['.nojekyll'] = b''
+    return staging
+
+
+def load_hashed_assets(docs_dir):
+    """Nombres con hash que registró fingerprint_assets.py en la ejecución anterior"""
+    from fingerprint_assets import ASSET_MANIFEST_FILE, load_asset_manifest
+
+    manifest = load_asset_manifest(docs_dir / ASSET_MANIFEST_FILE.name)
+    return {info['hashed'] for info in manifest['assets'].values()}
+
+
+def is_preserved(relative, hashed_assets):
+    return (relative.split('/', 1)[0] in PRESERVED_ENTRIES
+            or relative.endswith(PRESERVED_SUFFIXES)
+            or relative in hashed_assets)
+
+
+def iter_published_files(docs_dir):
+    """Archivos actuales de docs/ que administra este script"""
+    hashed_assets = load_hashed_assets(docs_dir)
+    for root, dirs, files in os.walk(docs_dir):
+        if Path(root) == docs_dir:
+            dirs[:] = [d for d in dirs if d not in PRESERVED_ENTRIES and d != '.git']
+        for name in files:
+            relative = (Path(root) / name).relative_to(docs_dir).as_posix()
+            if not is_preserved(relative, hashed_assets):
+                yield relative
+
+
+def load_publish_manifest(manifest_path):
+    """Hashes de la publicación anterior; vacío si no existe o es de otra versión"""
+    try:
+        manifest = json.loads(Path(manifest_path).read_text(encoding='utf-8'))
+        if manifest.get('version') == PUBLISH_MANIFEST_VERSION:
+            return manifest['files']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def source_hash(source):
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    return file_hash(source)
+
+
+def classify_entry(relative, source, target, previous):
+    """Acción para un archivo del staging y su registro para el manifiesto
+
+    Un archivo está al día si docs/ tiene el mismo contenido que el staging,
+    o si el staging no cambió desde la última publicación y docs/ conserva el
+    resultado de los pasos posteriores (published).
+    """
+    staged = source_hash(source)
+    if not target.is_file():
+        return 'add', {'source': staged, 'published': staged}
+    current = file_hash(target)
+    cached = previous.get(relative, {})
+    if current == staged or (cached.get('source') == staged and cached.get('published') == current):
+        return None, {'source': staged, 'published': current}
+    return 'update', {'source': staged, 'published': staged}
+
+
+def plan_changes(staging, docs_dir, previous, workers=None):
+    """Altas, actualizaciones y bajas necesarias para que docs/ refleje el staging"""
+    def classify(item):
+        relative, source = item
+        return relative, classify_entry(relative, source, docs_dir / relative, previous)
+
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as executor:
+        results = list(executor.map(classify, staging.items()))
+
+    plan = {'add': [], 'update': [], 'delete': [], 'files': {}}
+    for relative, (action, record) in results:
+        plan['files'][relative] = record
+        if action:
+            plan[action].append(relative)
+    plan['delete'] = sorted(set(iter_published_files(docs_dir)) - set(staging))
+    plan['add'].sort()
+    plan['update'].sort()
+    return plan
+
+
+def write_entry(source, target):
+    """Escritura atómica de un archivo del staging en docs/"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.tmp")
+    if isinstance(source, bytes):
+        tmp.write_bytes(source)
+    else:
+        shutil.copy2(source, tmp)
+    os.replace(tmp, target)
+
+
+def remove_empty_dirs(docs_dir, relatives):
+    """Borrar las carpetas que quedaron vacías después de las bajas"""
+    parents = {(docs_dir / relative).parent for relative in relatives}
+    for folder in sorted(parents, key=lambda p: len(p.parts), reverse=True):
+        while folder != docs_dir and folder.is_dir() and not any(folder.iterdir()):
+            folder.rmdir()
+            folder = folder.parent
+
+
+def apply_changes(plan, staging, docs_dir):
+    for relative in plan['add'] + plan['update']:
+        write_entry(staging[relative], docs_dir / relative)
+    for relative in plan['delete']:
+        (docs_dir / relative).unlink()
+    remove_empty_dirs(docs_dir, plan['delete'])
+
+
+def save_publish_manifest(files, manifest_path):
+    """Guardar {ruta: {'source', 'published'}} de los archivos publicados"""
+    manifest = {'version': PUBLISH_MANIFEST_VERSION, 'files': dict(sorted(files.items()))}
+    write_if_changed(manifest_path, json.dumps(manifest, indent=1))
+
+
+def record_published(docs_dir=None, workers=None):
+    """Registrar en 'published' lo que quedó en docs/ tras los pasos posteriores
+
+    Se ejecuta con --record al final del pipeline (después del índice de
+    búsqueda y de fingerprint_assets.py).
+    """
+    docs_dir = Path(docs_dir or DOCS_DIR)
+    manifest_path = docs_dir / PUBLISH_MANIFEST_FILE.name
+    files = load_publish_manifest(manifest_path)
+    if not files:
+        print("   ⚠️  No hay publicación previa que registrar")
+        return
+    present = [relative for relative in files if (docs_dir / relative).is_file()]
+
+    with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as executor:
+        hashes = dict(zip(present, executor.map(lambda r: file_hash(docs_dir / r), present)))
+
+    updated = {relative: {'source': files[relative]['source'], 'published': digest}
+               for relative, digest in hashes.items()}
+    save_publish_manifest(updated, manifest_path)
+    print(f"🧾 Hashes publicados registrados: {len(updated)}")
+
+
+def publish_docs(html_dir=None, pdf_dir=None, pdf_name=None, docs_dir=None, dry_run=False, workers=None):
+    """Publicar en docs/ solo lo que cambió respecto al staging"""
+    docs_dir = Path(docs_dir or DOCS_DIR)
+    pdf_name = pdf_name or f"{os.environ.get('REPO_NAME') or BASE_DIR.resolve().name}_sphinx.pdf"
+    print("🚚 Publicando documentación en docs/...")
+
+    staging = build_staging(html_dir or SPHINX_HTML_DIR, pdf_dir or SPHINX_PDF_DIR, pdf_name)
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = docs_dir / PUBLISH_MANIFEST_FILE.name
+    plan = plan_changes(staging, docs_dir, load_publish_manifest(manifest_path), workers)
+
+    print(f"   📦 Staging: {len(staging)} archivos")
+    print(f"   ➕ Nuevos: {len(plan['add'])}, ✏️  actualizados: {len(plan['update'])}, "
+          f"🗑️  eliminados: {len(plan['delete'])}")
+    if dry_run:
+        for action in ('add', 'update', 'delete'):
+            for relative in plan[action]:
+                print(f"      {action:<6} {relative}")
+        return plan
+
+    apply_changes(plan, staging, docs_dir)
+    save_publish_manifest(plan['files'], manifest_path)
+    return plan
+
+
+def parse_args(argv=None):
+    """Leer las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Publica la salida de Sphinx en docs/ aplicando solo los archivos que cambiaron"
+    )
+    parser.add_argument(
+        '--html-dir', default=str(SPHINX_HTML_DIR),
+        help=f"HTML generado por Sphinx (default: {SPHINX_HTML_DIR})"
+    )
+    parser.add_argument(
+        '--pdf-dir', default=str(SPHINX_PDF_DIR),
+        help=f"carpeta con el PDF de Sphinx (default: {SPHINX_PDF_DIR})"
+    )
+    parser.add_argument(
+        '--pdf-name',
+        help="nombre del PDF en docs/ (default: <REPO_NAME>_sphinx.pdf)"
+    )
+    parser.add_argument(
+        '--docs-dir', default=str(DOCS_DIR),
+        help=f"directorio publicado (default: {DOCS_DIR})"
+    )
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help="mostrar los cambios sin aplicarlos"
+    )
+    parser.add_argument(
+        '--record', action='store_true',
+        help="solo registrar el estado final de docs/ (ejecutar al final del pipeline)"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=DEFAULT_WORKERS,
+        help=f"hilos para comparar archivos (default: {DEFAULT_WORKERS})"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Función principal"""
+    args = parse_args(argv)
+    if args.record:
+        record_published(args.docs_dir, args.workers)
+        return
+    publish_docs(args.html_dir, args.pdf_dir, args.pdf_name, args.docs_dir, args.dry_run, args.workers)
+    print(f"✅ Documentación publicada en: {args.docs_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+import generate_pdf
+from generate_pdf import markdown_table_to_latex, parse_readme_md
+
+
+# Implementación anterior basada en una búsqueda regex por cada sección,
+# se conserva aquí como referencia para comparar resultados y tiempos.
+def legacy_extract_section(heading, content):
+    pattern = rf'##+\s*{re.escape(heading)}\s+(.*?)(?=\n##|\Z)'
+    match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
+    return match.group(1).strip() if match else ""
+
+
+def legacy_extract_table(heading, content):
+    pattern = rf'##+\s*{re.escape(heading)}\s*\n+((?:\|.*\n)+)'
+    match = re.search(pattern, content, re.IGNORECASE)
+    return markdown_table_to_latex(match.group(1)) if match else "No table."
+
+
+def legacy_images(content):
+    pattern = r'##\s*(.*?)\s*\n\s*!\[.*?\]\((.*?)\)'
+    return re.findall(pattern, content)
+
+
+def legacy_format_images(content):
+    code = ""
+    for title, path in legacy_images(content):
+        code += (
+            "\\newpage\n"
+            "\\vspace*{3em}\n"
+            f"\\section*{{{title}}}\n"
+            "\\vspace{1em}\n"
+            "\\begin{center}\n"
+            f"\\includegraphics[width=0.75\\textwidth,keepaspectratio]{{{path}}}\n"
+            "\\end{center}\n"
+        )
+    return code
+
+
+SECTIONS = [
+    "Introduction", "Functional Description", "Electrical Characteristics & Signal Overview",
+    "Applications", "Usage", "Downloads", "Purchase",
+]
+TABLES = [
+    "Pin & Connector Layout", " Current", " Current Limit", "Interface Overview", "Supports",
+    "Firmware Modes: AVR Programmer", "Firmware Modes: CMSIS-DAP Debugger",
+    "Firmware Modes: CPLD Programmer",
+]
+
+
+def make_table(rng, rows):
+    lines = ["| Pin | Signal | Description |", "|-----|--------|-------------|"]
+    for i in range(rows):
+        lines.append(f"| P{i} | SIG{rng.randint(0, 99)} | Signal number {i} |")
+    return "\n".join(lines)
+
+
+def make_readme(sections, seed=0):
+    # README sintético: relleno con cientos de secciones, tablas e imágenes,
+    # con las secciones que busca parse_readme_md repartidas al final.
+    rng = random.Random(seed)
+    parts = [
+        "---\ntitle: \"Benchmark Board\"\nversion: \"1.0\"\nmodified: \"2025-01-01\"\n"
+        "output: \"benchmark_board\"\n---\n",
+        "<!-- comentario -->\n# Benchmark Board\n\n![product](images/logo_unit.png)\n",
+    ]
+    for i in range(sections):
+        kind = rng.choice(("text", "table", "image", "list"))
+        parts.append(f"## Filler Section {i}\n")
+        if kind == "text":
+            parts.append("Lorem ipsum dolor sit amet. " * rng.randint(5, 40) + "\n")
+        elif kind == "table":
+            parts.append(make_table(rng, rng.randint(3, 30)) + "\n")
+        elif kind == "image":
+            parts.append(f"![Figure {i}](images/figure_{i}.png)\n")
+        else:
+            parts.append("\n".join(f"- item {j}" for j in range(rng.randint(3, 15))) + "\n")
+    for heading in SECTIONS:
+        parts.append(f"## {heading}\n\n- [Link {heading}](https://example.com/{heading.replace(' ', '_')})\n"
+                     "- plain bullet\n\nSome text.\n")
+    for heading in TABLES:
+        parts.append(f"### {heading.strip()}\n\n{make_table(rng, 10)}\n")
+    return "\n".join(parts)
+
+
+def check_equivalence(content):
+    index = generate_pdf.build_readme_index(content)
+    for heading in SECTIONS:
+        assert generate_pdf.extract_section(heading, index) == legacy_extract_section(heading, content), heading
+    for heading in TABLES:
+        assert generate_pdf.extract_table(heading, index) == legacy_extract_table(heading, content), heading
+    assert generate_pdf.section_images(index) == legacy_images(content)
+    assert generate_pdf.format_images_with_titles(index) == legacy_format_images(content)
+
+
+def time_it(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_lookups(content):
+    for heading in SECTIONS:
+        legacy_extract_section(heading, content)
+    for heading in TABLES:
+        legacy_extract_table(heading, content)
+    legacy_format_images(content)
+
+
+def indexed_lookups(content):
+    index = generate_pdf.build_readme_index(content)
+    for heading in SECTIONS:
+        generate_pdf.extract_section(heading, index)
+    for heading in TABLES:
+        generate_pdf.extract_table(heading, index)
+    generate_pdf.format_images_with_titles(index)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de parse_readme_md con READMEs sintéticos")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000],
+                        help="número de secciones de relleno por README")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'secciones':>10} {'KB':>8} {'regex (ms)':>12} {'índice (ms)':>12} {'speedup':>8} {'parse (ms)':>11}")
+    for size in args.sizes:
+        content = make_readme(size)
+        check_equivalence(content)
+
+        legacy = time_it(lambda: legacy_lookups(content), args.repeat)
+        indexed = time_it(lambda: indexed_lookups(content), args.repeat)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.md', delete=False, encoding='utf-8') as f:
+            f.write(content)
+        try:
+            parse = time_it(lambda: parse_readme_md(f.name), args.repeat)
+        finally:
+            os.remove(f.name)
+
+        print(f"{size:>10} {len(content) // 1024:>8} {legacy * 1000:>12.1f} {indexed * 1000:>12.1f} "
+              f"{legacy / indexed:>7.1f}x {parse * 1000:>11.1f}")
@@ -1,12 +1,65 @@
 
+import argparse
+import hashlib
+import importlib.util
 import os
 import re
+import shutil
 import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from types import SimpleNamespace
 import markdown2
 import yaml
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from print_images import PRINT_DPI, make_resolver
+
+# Trazas por etapa de .github/workflows/scripts/build_trace.py (opcionales)
+BUILD_TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "..", ".github", "workflows", "scripts", "build_trace.py")
+
+
+@contextmanager
+def _no_stage(name, **counters):
+    yield dict(counters)
+
+
+def _no_session(name, trace=None, profile=None):
+    if trace or profile:
+        print("⚠️ build_trace.py no está disponible, se ignoran --trace y --profiler")
+    return nullcontext()
+
+
+def _no_trace_arguments(parser):
+    # Mismas opciones que build_trace.add_arguments(), para no romper la línea de comandos
+    parser.add_argument('--trace', metavar='FILE', help="sin efecto: build_trace.py no está disponible")
+    parser.add_argument('--profiler', help="sin efecto: build_trace.py no está disponible")
+
+
+def load_build_trace():
+    # Se carga por ruta, sin agregar la carpeta de CI a sys.path (no debe
+    # tapar módulos de esta carpeta). Fuera del repo las trazas no hacen nada.
+    if 'build_trace' in sys.modules:
+        return sys.modules['build_trace']
+    if os.path.exists(BUILD_TRACE_FILE):
+        spec = importlib.util.spec_from_file_location('build_trace', BUILD_TRACE_FILE)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return sys.modules.setdefault('build_trace', module)
+    return SimpleNamespace(stage=_no_stage, session=_no_session, add_arguments=_no_trace_arguments)
+
+
+build_trace = load_build_trace()
+
+# Medidas impresas de product_brief_template.tex (A4, margen de 0.65in)
+TEXTWIDTH_IN = 8.27 - 2 * 0.65
+SECTION_IMAGE_WIDTH_IN = 0.75 * TEXTWIDTH_IN
+PRODUCT_IMAGE_HEIGHT_IN = 4.7 / 2.54
+
 
 def markdown_table_to_latex(md_table):
     try:
@@ -62,30 +115,125 @@ def fix_linebreaks_for_lists(text):
     lines = text.splitlines()
     return "\n".join(line + r"\\ " if line.strip().startswith('-') else line for line in lines)
 
+HEADING_RE = re.compile(r'^##[^\n]*', re.MULTILINE)
+# Tabla o imagen justo debajo de un encabezado (solo espacios/líneas vacías entre medio)
+TABLE_AFTER_HEADING_RE = re.compile(r'\s*\n+((?:\|.*\n)+)')
+IMAGE_AFTER_HEADING_RE = re.compile(r'\s*\n\s*!\[.*?\]\((.*?)\)')
+
+
+def build_readme_index(content):
+    # Una sola pasada: cada encabezado "##..." abre una sección que llega hasta
+    # el siguiente encabezado. Las secciones se guardan como posiciones dentro
+    # del contenido junto con un índice título -> secciones; las búsquedas
+    # posteriores ya no recorren el README completo.
+    matches = list(HEADING_RE.finditer(content))
+    headings = [match.group() for match in matches]
+    starts = [match.start() for match in matches]
+    stops = starts[1:] + [len(content)]
+
+    titles = [line.lstrip('#').strip() for line in headings]
+    by_title = {}
+    for number, title in enumerate(titles):
+        by_title.setdefault(title.lower(), []).append(number)
+
+    return {
+        'content': content,
+        'headings': headings,
+        'titles': titles,
+        'starts': starts,
+        'stops': stops,
+        'by_title': by_title,
+        'tables': {},
+        'images': {},
+        'lookups': {},
+    }
+
+
+def as_readme_index(content):
+    return content if isinstance(content, dict) else build_readme_index(content)
+
+
+def section_body(index, number):
+    start = index['starts'][number] + len(index['headings'][number])
+    return index['content'][start:index['stops'][number]]
+
+
+def section_table(index, number):
+    if number not in index['tables']:
+        start = index['starts'][number] + len(index['headings'][number])
+        match = TABLE_AFTER_HEADING_RE.match(index['content'], start, index['stops'][number])
+        index['tables'][number] = match.group(1) if match else None
+    return index['tables'][number]
+
+
+def section_images(index):
+    # Secciones cuyo primer contenido es una imagen: (título, ruta)
+    images = []
+    for number, line in enumerate(index['headings']):
+        start = index['starts'][number] + len(line)
+        match = IMAGE_AFTER_HEADING_RE.match(index['content'], start, index['stops'][number])
+        if match:
+            images.append((line[2:].strip(), match.group(1)))
+    return images
+
+
+def find_section(index, heading):
+    # Se prefiere el título exacto; si no existe, el primer título que empiece
+    # con el texto buscado seguido de un espacio ("## Usage notes").
+    key = heading.strip().lower()
+    if key in index['lookups']:
+        return index['lookups'][key]
+
+    found = None
+    if key in index['by_title']:
+        found = index['by_title'][key][0]
+    else:
+        for number, title in enumerate(index['titles']):
+            title = title.lower()
+            if title.startswith(key) and len(title) > len(key) and title[len(key)].isspace():
+                found = number
+                break
+    index['lookups'][key] = found
+    return found
+
+
 def extract_section(heading, content):
-    pattern = rf'##+\s*{re.escape(heading)}\s+(.*?)(?=\n##|\Z)'
-    match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-    return match.group(1).strip() if match else ""
+    index = as_readme_index(content)
+    number = find_section(index, heading)
+    if number is None:
+        return ""
+    rest = index['titles'][number][len(heading.strip()):]
+    return (rest + section_body(index, number)).strip()
 
 def extract_links_section(heading, content):
     section = extract_section(heading, content)
     return markdown_links_to_latex_list(section)
 
 
-def extract_table(heading, content):
-    pattern = rf'##+\s*{re.escape(heading)}\s*\n+((?:\|.*\n)+)'
-    match = re.search(pattern, content, re.IGNORECASE)
-    return markdown_table_to_latex(match.group(1)) if match else "No table."
-
-
+NO_TABLE = "No table."
 
 
-def format_images_with_titles(content):
-    pattern = r'##\s*(.*?)\s*\n\s*!\[.*?\]\((.*?)\)'
-    matches = re.findall(pattern, content)
-    code = ""
-    for i, (title, path) in enumerate(matches):
-        code += (
+def extract_table(heading, content):
+    index = as_readme_index(content)
+    # Primera aparición del encabezado que tenga una tabla justo debajo
+    for number in index['by_title'].get(heading.strip().lower(), []):
+        table = section_table(index, number)
+        if table:
+            return markdown_table_to_latex(table)
+    return NO_TABLE
+
+
+
+
+def format_images_with_titles(content, resolve_image=None):
+    # resolve_image(ref, width_in) permite sustituir cada imagen por una
+    # copia reducida a la resolución que necesita su ancho impreso
+    index = as_readme_index(content)
+    parts = []
+    for title, path in section_images(index):
+        if resolve_image:
+            path = resolve_image(path, width_in=SECTION_IMAGE_WIDTH_IN)
+        parts.append(
             "\\newpage\n"
             "\\vspace*{3em}\n"  # espacio antes del título
             f"\\section*{{{title}}}\n"
@@ -94,12 +242,32 @@ def format_images_with_titles(content):
             f"\\includegraphics[width=0.75\\textwidth,keepaspectratio]{{{path}}}\n"
             "\\end{center}\n"
         )
-    return code
-
-def parse_readme_md(path):
-
-        # Obtener fecha local en Ciudad de México
-    cdmx_now = datetime.now(ZoneInfo("America/Mexico_City"))
+    return "".join(parts)
+
+def source_date_epoch(path, use_git=True):
+    # Fecha reproducible del README: su último commit, sin pasar de
+    # SOURCE_DATE_EPOCH; None si no hay ninguna de las dos
+    env_epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    env_epoch = int(env_epoch) if env_epoch else None
+    if not use_git:
+        return env_epoch
+    try:
+        result = subprocess.run(['git', 'log', '-1', '--format=%ct', '--', os.path.basename(path)],
+                                cwd=os.path.dirname(os.path.abspath(path)),
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return env_epoch
+    if not result.stdout.strip():
+        return env_epoch
+    commit_time = int(result.stdout.strip())
+    return min(commit_time, env_epoch) if env_epoch is not None else commit_time
+
+
+def parse_readme_md(path, resolve_image=None, epoch=None):
+
+    # Fecha local en Ciudad de México; epoch la fija para compilaciones reproducibles
+    cdmx_tz = ZoneInfo("America/Mexico_City")
+    cdmx_now = datetime.fromtimestamp(epoch, cdmx_tz) if epoch is not None else datetime.now(cdmx_tz)
     formatted_date = cdmx_now.strftime("%Y-%m-%d %H:%M")
 
 
@@ -113,44 +281,42 @@ def parse_readme_md(path):
     content = re.sub(r'^---.*?---\s*', '', content, flags=re.DOTALL)
 
 
+    index = build_readme_index(content)
+
     image_matches = re.findall(r'!\[(.*?)\]\((.*?)\)', content)
     image_product = next((path for alt, path in image_matches if "product" in alt.lower()), "")
     image_paths = [path for _, path in image_matches]
     if not image_product and image_paths:
         image_product = image_paths[0]
-        if not os.path.exists(image_product):
+        # Las rutas del README son relativas a su propio directorio
+        if not os.path.exists(os.path.join(os.path.dirname(path), image_product)):
             print(f"⚠️ Advertencia: La imagen principal no fue encontrada en la ruta: {image_product}")
+    if image_product and resolve_image:
+        image_product = resolve_image(image_product, height_in=PRODUCT_IMAGE_HEIGHT_IN)
 
 
-    pin_table_match = re.search(r'## Pin.*?Layout\n((?:\|.*\n)+)', content)
-    pin_table = markdown_table_to_latex(pin_table_match.group(1)) if pin_table_match else "No table."
-
-    downloads = re.findall(r'- \[(.*?)\]\((.*?)\)', content)
-    downloads_latex = "\\n".join([f"\\item \\href{{{link}}}{{{text}}}" for text, link in downloads])
-
-    date_used = frontmatter.get("modified", formatted_date)
-
     data = {
         "LOGO": frontmatter.get("logo", "images/logo_unit.png"),
         "TITLE": frontmatter.get("title", "Untitled"),
         "VERSION": frontmatter.get("version", "v1.0"),
-        "DATE": formatted_date,
+        # La fecha del frontmatter mantiene el .tex estable entre compilaciones
+        "DATE": str(frontmatter.get("modified", formatted_date)),
 
         "SUBTITLE": frontmatter.get("subtitle", "Product Brief"),
-        "INTRODUCTION": fix_paragraphs(extract_section("Introduction", content)),
+        "INTRODUCTION": fix_paragraphs(extract_section("Introduction", index)),
 
-        "FUNCTIONAL": fix_linebreaks_for_lists(extract_section("Functional Description", content)),
-        "ELECTRICAL": fix_linebreaks_for_lists(extract_section("Electrical Characteristics & Signal Overview", content)),
-        "APPLICATIONS": fix_linebreaks_for_lists(extract_section("Applications", content)),
+        "FUNCTIONAL": fix_linebreaks_for_lists(extract_section("Functional Description", index)),
+        "ELECTRICAL": fix_linebreaks_for_lists(extract_section("Electrical Characteristics & Signal Overview", index)),
+        "APPLICATIONS": fix_linebreaks_for_lists(extract_section("Applications", index)),
 
-        "PIN_TABLE": extract_table("Pin & Connector Layout", content),
-        "R11_TABLE": extract_table(" Current", content),
-        "R10_TABLE": extract_table(" Current Limit", content),
+        "PIN_TABLE": extract_table("Pin & Connector Layout", index),
+        "R11_TABLE": extract_table(" Current", index),
+        "R10_TABLE": extract_table(" Current Limit", index),
 
-        "USAGE": markdown_bullets_to_latex(extract_section("Usage", content)),
-        "DOWNLOADS": extract_links_section("Downloads", content),
-        "PURCHASE": extract_links_section("Purchase", content),
-        "IMAGES": format_images_with_titles(content),
+        "USAGE": markdown_bullets_to_latex(extract_section("Usage", index)),
+        "DOWNLOADS": extract_links_section("Downloads", index),
+        "PURCHASE": extract_links_section("Purchase", index),
+        "IMAGES": format_images_with_titles(index, resolve_image),
 
         "IMAGE_PRODUCT": image_product,
         "OUTPUT_NAME": frontmatter.get("output", "generated_product_brief"),
@@ -167,39 +333,287 @@ def parse_readme_md(path):
     }
 
     for key, title in custom_tables.items():
-        data[key] = extract_table(title, content)
+        data[key] = extract_table(title, index)
 
     return data
 
 
-def render_latex(template_path, output_path, replacements):
+PLACEHOLDER_RE = re.compile(r'<<([A-Za-z0-9_]+)>>')
+# Claves de parse_readme_md que no son para la plantilla
+NON_TEMPLATE_KEYS = {"OUTPUT_NAME"}
+# Plantillas ya analizadas, por hash de su contenido (una vez por proceso)
+_compiled_templates = {}
+
+
+def compile_template(text):
+    # (literal, clave, literal, clave, ..., literal): las claves quedan en las posiciones impares
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    parts = _compiled_templates.get(digest)
+    if parts is None:
+        parts = _compiled_templates[digest] = tuple(PLACEHOLDER_RE.split(text))
+    return parts
+
+
+def fill_template(parts, replacements):
+    # Una sola pasada: un valor que contiene <<CLAVE>> no se vuelve a sustituir.
+    # Los placeholders sin valor quedan tal cual y se devuelven en missing.
+    pieces = list(parts)
+    missing = []
+    for i in range(1, len(pieces), 2):
+        key = pieces[i]
+        if key in replacements:
+            pieces[i] = str(replacements[key])
+        else:
+            missing.append(key)
+            pieces[i] = f'<<{key}>>'
+    return ''.join(pieces), missing
+
+
+def render_latex(template_path, output_path, replacements, strict=False):
+    # Devuelve {'missing': placeholders sin valor, 'unused': contenido del README que la
+    # plantilla no usa}. Ambos se avisan; --strict solo falla por missing, porque una
+    # plantilla puede omitir a propósito secciones que otros README sí tienen.
     with open(template_path, 'r', encoding='utf-8') as f:
-        tex = f.read()
-    for key, value in replacements.items():
-        tex = tex.replace(f'<<{key}>>', value)
+        parts = compile_template(f.read())
+    tex, missing = fill_template(parts, replacements)
+    report = {
+        'missing': sorted(set(missing)),
+        'unused': sorted(key for key, value in replacements.items()
+                         if value not in ("", NO_TABLE) and key not in NON_TEMPLATE_KEYS
+                         and key not in parts[1::2]),
+    }
+    if report['unused']:
+        print(f"⚠️ Valores que {os.path.basename(template_path)} no usa: {', '.join(report['unused'])}")
+    if report['missing']:
+        print(f"⚠️ Placeholders sin valor en {os.path.basename(template_path)}: {', '.join(report['missing'])}")
+        if strict:
+            raise ValueError(f"faltan valores para {', '.join(report['missing'])}")
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(tex)
+    return report
 
         
-def compile_pdf(tex_file):
+INCLUDEGRAPHICS_RE = re.compile(r'\\includegraphics(?:\[[^\]]*\])?\{([^}]*)\}')
+GRAPHICS_EXTENSIONS = ("", ".pdf", ".png", ".jpg", ".jpeg", ".eps")
+# Cambiar si cambia la forma de compilar, para invalidar la caché
+BUILD_CACHE_VERSION = "pdflatex-rerun-fmt-1"
+# Archivos que pdflatex lee en la pasada siguiente: si no cambian, no hace falta otra
+RERUN_EXTENSIONS = (".aux", ".toc", ".out")
+MAX_LATEX_PASSES = 4
+# Fin del preámbulo fijo de la plantilla (lo que se precompila en el formato)
+PREAMBLE_END = r"\csname endofdump\endcsname"
+
+
+def resolve_graphic(ref, search_dirs):
+    # Igual que graphicx: probar cada directorio y las extensiones por defecto
+    for directory in search_dirs:
+        for ext in GRAPHICS_EXTENSIONS:
+            candidate = os.path.join(directory, ref + ext)
+            if os.path.isfile(candidate):
+                return candidate
+    return None
+
+
+def build_cache_key(tex_path, search_dirs, epoch=None):
+    # Hash del .tex renderizado y de cada imagen que incluye. Con epoch (modo
+    # reproducible) también la fecha, que pdfTeX escribe en CreationDate y /ID
+    digest = hashlib.sha256(BUILD_CACHE_VERSION.encode())
+    if epoch is not None:
+        digest.update(f"\0epoch={epoch}\0".encode())
+    with open(tex_path, 'rb') as f:
+        tex = f.read()
+    digest.update(tex)
+
+    for ref in sorted(set(INCLUDEGRAPHICS_RE.findall(tex.decode('utf-8', 'replace')))):
+        digest.update(b"\0" + ref.encode('utf-8') + b"\0")
+        asset = resolve_graphic(ref, search_dirs)
+        if asset is None:
+            digest.update(b"missing")
+            continue
+        with open(asset, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pdflatex_version():
+    # Primera línea de `pdflatex --version`: un formato solo sirve para el mismo binario
     try:
-        for _ in range(2):
+        result = subprocess.run(['pdflatex', '--version'], capture_output=True, text=True,
+                                encoding='utf-8', errors='replace')
+    except OSError:
+        return None
+    lines = result.stdout.splitlines()
+    return lines[0] if result.returncode == 0 and lines else None
+
+
+def preamble_format(tex_path, format_dir, env):
+    # Precompilar con mylatexformat el preámbulo fijo del .tex (hasta PREAMBLE_END).
+    # El nombre sale del hash del preámbulo y de la versión de pdflatex, así un
+    # cambio en la plantilla genera otro formato. None si no se puede usar.
+    with open(tex_path, 'r', encoding='utf-8') as f:
+        tex = f.read()
+    end = tex.find(PREAMBLE_END)
+    version = pdflatex_version()
+    if end < 0 or version is None:
+        return None
+    preamble = tex[:end + len(PREAMBLE_END)] + "\n"
+    name = "preamble-" + hashlib.sha256(f"{version}\0{preamble}".encode('utf-8')).hexdigest()[:16]
+    if os.path.exists(os.path.join(format_dir, f"{name}.fmt")):
+        return name
+
+    os.makedirs(format_dir, exist_ok=True)
+    # Cada trabajo del batch genera en su propio temporal; el reemplazo es atómico
+    with tempfile.TemporaryDirectory(dir=format_dir) as tmp:
+        with open(os.path.join(tmp, f"{name}.tex"), 'w', encoding='utf-8') as f:
+            f.write(preamble)
+        with build_trace.stage('latex.format') as record:
             result = subprocess.run(
-                ['pdflatex', '-interaction=nonstopmode', '-output-directory=build', tex_file],
+                ['pdflatex', '-ini', '-interaction=nonstopmode', f'-jobname={name}',
+                 '&pdflatex', 'mylatexformat.ltx', f"{name}.tex"],
+                capture_output=True, text=True, encoding='utf-8', errors='replace', cwd=tmp, env=env
+            )
+            record['returncode'] = result.returncode
+        fmt = os.path.join(tmp, f"{name}.fmt")
+        if result.returncode != 0 or not os.path.exists(fmt):
+            print("⚠️ No se pudo precompilar el preámbulo, se compila sin formato")
+            return None
+        os.replace(fmt, os.path.join(format_dir, f"{name}.fmt"))
+    print(f"🧱 Preámbulo precompilado: {name}.fmt")
+    return name
+
+
+def hash_rerun_files(base):
+    # {extensión: sha256 o None} de los archivos que decide si hace falta otra pasada
+    state = {}
+    for ext in RERUN_EXTENSIONS:
+        try:
+            with open(base + ext, 'rb') as f:
+                state[ext] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            state[ext] = None
+    return state
+
+
+def latex_errors(output, limit=10):
+    # Líneas de error de TeX ("! Undefined control sequence." y similares)
+    return [line for line in output.splitlines() if line.startswith('!')][:limit]
+
+
+def run_latex_passes(command, pdf_file, base, cwd, env):
+    # Repetir pdflatex hasta que .aux/.toc/.out no cambien entre pasadas
+    previous = hash_rerun_files(base)
+    for passes in range(1, MAX_LATEX_PASSES + 1):
+        with build_trace.stage(f'latex.pass{passes}', tex=os.path.basename(base)) as record:
+            result = subprocess.run(
+                command,
                 capture_output=True,
                 text=True,
                 encoding='utf-8',
-                errors='replace'  # <- esta línea soluciona el problema
+                errors='replace',  # <- esta línea soluciona el problema
+                cwd=cwd,
+                env=env
             )
+            record['returncode'] = result.returncode
             if result.returncode != 0:
+                record['errors'] = latex_errors(result.stdout)
                 print("⚠️ LaTeX compiló con errores:")
                 print(result.stdout)
                 print(result.stderr)
-                if not os.path.exists("build/" + os.path.splitext(os.path.basename(tex_file))[0] + ".pdf"):
+                if not os.path.exists(pdf_file):
+                    raise subprocess.CalledProcessError(result.returncode, result.args)
+            current = hash_rerun_files(base)
+            record['rerun'] = current != previous
+        if current == previous:
+            break
+        previous = current
+    return result, passes
+
+
+def seed_aux_files(aux_cache, stem, base):
+    # Copiar el último .aux/.toc/.out guardado de este brief si no hay uno en el build dir
+    for ext in RERUN_EXTENSIONS:
+        saved = os.path.join(aux_cache, stem + ext)
+        if os.path.exists(saved) and not os.path.exists(base + ext):
+            shutil.copyfile(saved, base + ext)
+
+
+def compile_pdf(tex_file, output_dir="build", cwd=None, texinputs=None, cache_dir=None, use_cache=True,
+                epoch=None):
+    # cwd: directorio desde el que se resuelven las rutas de las imágenes del README
+    # texinputs: directorios extra donde pdflatex busca archivos (p. ej. el logo)
+    # cache_dir: PDFs anteriores nombrados por el hash de sus entradas, formatos del
+    #   preámbulo y el último .aux/.toc/.out de cada brief (default: <output_dir>/.cache)
+    # epoch: fecha de CreationDate/ModDate, /ID y \today del PDF (SOURCE_DATE_EPOCH de pdfTeX)
+    base_dir = cwd or os.getcwd()
+    stem = os.path.splitext(os.path.basename(tex_file))[0]
+    pdf_name = stem + ".pdf"
+    pdf_file = os.path.join(base_dir, output_dir, pdf_name)
+    base = os.path.join(base_dir, output_dir, stem)
+    cache_dir = os.path.join(base_dir, cache_dir or os.path.join(output_dir, ".cache"))
+
+    cached_pdf = None
+    if use_cache:
+        key = build_cache_key(os.path.join(base_dir, tex_file), [base_dir] + list(texinputs or []), epoch)
+        cached_pdf = os.path.join(cache_dir, f"{key}.pdf")
+        if os.path.exists(cached_pdf):
+            shutil.copyfile(cached_pdf, pdf_file)
+            print(f"♻️ Sin cambios en las entradas, se reutiliza {pdf_name}")
+            return False
+
+    env = dict(os.environ)
+    if texinputs:
+        # El separador final conserva las rutas por defecto de TeX
+        env["TEXINPUTS"] = os.pathsep.join(texinputs) + os.pathsep + env.get("TEXINPUTS", "")
+    if epoch is not None:
+        env["SOURCE_DATE_EPOCH"] = str(epoch)
+        env["FORCE_SOURCE_DATE"] = "1"
+
+    # Con el .aux de la compilación anterior, si el documento no cambió de
+    # estructura basta una sola pasada
+    aux_cache = os.path.join(cache_dir, "aux")
+    seed_aux_files(aux_cache, stem, base)
+
+    command = ['pdflatex', '-interaction=nonstopmode', f'-output-directory={output_dir}', tex_file]
+    format_dir = os.path.join(cache_dir, "formats")
+    fmt = preamble_format(os.path.join(base_dir, tex_file), format_dir, env)
+    # El build dir se reutiliza entre ejecuciones: un PDF anterior no debe
+    # pasar por el resultado de una compilación que falló
+    if os.path.exists(pdf_file):
+        os.remove(pdf_file)
+    try:
+        if fmt:
+            fmt_env = dict(env, TEXFORMATS=format_dir + os.pathsep + env.get("TEXFORMATS", ""))
+            try:
+                result, passes = run_latex_passes(command[:1] + [f'-fmt={fmt}'] + command[1:],
+                                                  pdf_file, base, cwd, fmt_env)
+                if result.returncode != 0:
                     raise subprocess.CalledProcessError(result.returncode, result.args)
+            except subprocess.CalledProcessError:
+                print("⚠️ Falló la compilación con el preámbulo precompilado, se reintenta sin formato")
+                fmt = None
+                if os.path.exists(pdf_file):
+                    os.remove(pdf_file)
+                # El .aux/.toc/.out de la pasada fallida no sirve para decidir
+                # cuántas pasadas hacen falta: se parte de nuevo de la caché
+                clean_aux_files(pdf_file)
+                seed_aux_files(aux_cache, stem, base)
+        if not fmt:
+            result, passes = run_latex_passes(command, pdf_file, base, cwd, env)
     except subprocess.CalledProcessError as e:
         print(f"❌ LaTeX falló con código {e.returncode}")
         raise
+    print(f"🔁 {pdf_name}: {passes} pasada(s) de pdflatex")
+
+    if result.returncode == 0:
+        os.makedirs(aux_cache, exist_ok=True)
+        for ext in RERUN_EXTENSIONS:
+            if os.path.exists(base + ext):
+                shutil.copyfile(base + ext, os.path.join(aux_cache, stem + ext))
+        if cached_pdf:
+            os.makedirs(os.path.dirname(cached_pdf), exist_ok=True)
+            shutil.copyfile(pdf_file, cached_pdf)
+    return True
 
 
 def clean_aux_files(output_name):
@@ -210,13 +624,162 @@ def clean_aux_files(output_name):
         if os.path.exists(path):
             os.remove(path)
 
-if __name__ == "__main__":
-    data = parse_readme_md("README.md")  # asegúrate de definir 'data' aquí
-    output_name = data["OUTPUT_NAME"]    # luego la usas aquí
 
-    output_tex = f"build/{output_name}.tex"
-    os.makedirs("build", exist_ok=True)
+def image_resolver(readme_path, build_dir, cache_dir=None, dpi=PRINT_DPI):
+    # Imágenes reducidas en <cache>/images, compartidas entre trabajos del batch
+    if not dpi:
+        return None
+    cache_dir = cache_dir or os.path.join(build_dir, ".cache")
+    return make_resolver(os.path.dirname(os.path.abspath(readme_path)),
+                         os.path.join(cache_dir, "images"), dpi)
+
+
+def build_brief(readme_path, template_path, build_dir, cache_dir=None, use_cache=True, dpi=PRINT_DPI,
+                reproducible=False, strict=False):
+    # README -> LaTeX -> PDF dentro de build_dir; cada trabajo usa su propio
+    # directorio para que varios pdflatex en paralelo no se pisen.
+    readme_path = os.path.abspath(readme_path)
+    epoch = source_date_epoch(readme_path, use_git=reproducible)
+    template_path = os.path.abspath(template_path)
+    build_dir = os.path.abspath(build_dir)
+    cache_dir = cache_dir and os.path.abspath(cache_dir)
+
+    with build_trace.stage('brief', readme=readme_path) as brief:
+        with build_trace.stage('brief.parse', files=1):
+            data = parse_readme_md(readme_path, image_resolver(readme_path, build_dir, cache_dir, dpi), epoch)
+        output_name = data["OUTPUT_NAME"]
+        output_tex = os.path.join(build_dir, f"{output_name}.tex")
+        os.makedirs(build_dir, exist_ok=True)
+
+        with build_trace.stage('brief.render') as record:
+            record.update(render_latex(template_path, output_tex, data, strict))
+        brief['compiled'] = compile_pdf(output_tex, output_dir=build_dir, cwd=os.path.dirname(readme_path),
+                                        texinputs=[os.path.dirname(template_path)],
+                                        cache_dir=cache_dir, use_cache=use_cache, epoch=epoch)
+        clean_aux_files(os.path.join(build_dir, output_name))
+    return os.path.join(build_dir, f"{output_name}.pdf")
+
+
+def is_board_readme(path):
+    # Solo los README con frontmatter (title/output) son fuentes de un product brief
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            head = f.read(4096)
+    except OSError:
+        return False
+    match = re.match(r'^---(.*?)---', head, re.DOTALL)
+    if not match:
+        return False
+    try:
+        frontmatter = yaml.safe_load(match.group(1)) or {}
+    except yaml.YAMLError:
+        return False
+    return isinstance(frontmatter, dict) and "title" in frontmatter
+
+
+def discover_readmes(roots, name="README.md", exclude=("build", ".git", "node_modules")):
+    found = {}
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in exclude)
+            if name in filenames:
+                path = os.path.join(dirpath, name)
+                # Directorios que se solapan no deben generar el mismo trabajo dos veces
+                if os.path.realpath(path) not in found and is_board_readme(path):
+                    found[os.path.realpath(path)] = path
+    return list(found.values())
+
+
+def job_build_dir(build_root, readme_path, base_dir):
+    # Directorio de trabajo único derivado de la ruta del README; el slug es
+    # legible pero ambiguo ("a b", "a_b" y "a/b" dan "a_b"), el hash no
+    relative = os.path.relpath(os.path.dirname(os.path.abspath(readme_path)), base_dir)
+    relative = relative.replace(os.sep, '/')
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', relative.replace('/', '_')).strip('_.') or "root"
+    digest = hashlib.sha256(relative.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(build_root, f"{slug}-{digest}")
+
+
+def build_batch(readmes, template_path, build_root, jobs=None, use_cache=True, dpi=PRINT_DPI,
+                reproducible=False, strict=False):
+    base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in readmes])
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            # La caché se comparte entre trabajos: los nombres son hashes de contenido
+            executor.submit(build_brief, readme, template_path,
+                            job_build_dir(build_root, readme, base_dir),
+                            os.path.join(build_root, ".cache"), use_cache, dpi, reproducible, strict): readme
+            for readme in readmes
+        }
+        for future in as_completed(futures):
+            readme = futures[future]
+            try:
+                results[readme] = future.result()
+                print(f"✅ {readme} -> {results[readme]}")
+            except Exception as e:
+                results[readme] = None
+                print(f"❌ {readme}: {e}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera product briefs en PDF a partir de README.md")
+    parser.add_argument('readme', nargs='?', default="README.md",
+                        help="README a convertir (default: README.md)")
+    parser.add_argument('--batch', nargs='+', metavar='DIR',
+                        help="buscar recursivamente READMEs de placas en estos directorios")
+    parser.add_argument('--template', default="product_brief_template.tex")
+    parser.add_argument('--build-dir', default="build")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="procesos en paralelo para --batch (default: núcleos disponibles)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="compilar siempre con pdflatex aunque las entradas no hayan cambiado")
+    parser.add_argument('--dpi', type=int, default=PRINT_DPI,
+                        help="resolución a la que se reducen las imágenes según su ancho impreso "
+                             "(0 = usar las originales)")
+    parser.add_argument('--reproducible', action='store_true',
+                        help="PDF idéntico entre compilaciones: fecha del último commit del README "
+                             "(SOURCE_DATE_EPOCH, si está definido, se usa siempre como límite)")
+    parser.add_argument('--strict', action='store_true',
+                        help="fallar si la plantilla tiene placeholders sin valor en el README")
+    build_trace.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with build_trace.session('generate_pdf', args.trace, args.profiler):
+        return run(args)
+
+
+def run(args):
+    if not args.batch:
+        resolver = image_resolver(args.readme, args.build_dir, dpi=args.dpi)
+        epoch = source_date_epoch(args.readme, use_git=args.reproducible)
+        with build_trace.stage('brief.parse', files=1):
+            data = parse_readme_md(args.readme, resolver, epoch)  # asegúrate de definir 'data' aquí
+        output_name = data["OUTPUT_NAME"]    # luego la usas aquí
+
+        output_tex = os.path.join(args.build_dir, f"{output_name}.tex")
+        os.makedirs(args.build_dir, exist_ok=True)
+
+        with build_trace.stage('brief.render') as record:
+            record.update(render_latex(args.template, output_tex, data, args.strict))
+        compile_pdf(output_tex, output_dir=args.build_dir, use_cache=not args.no_cache, epoch=epoch)
+        clean_aux_files(os.path.join(args.build_dir, output_name))
+        return 0
+
+    readmes = discover_readmes(args.batch)
+    if not readmes:
+        print("⚠️ No se encontraron README.md con frontmatter en", ", ".join(args.batch))
+        return 1
+
+    print(f"📚 {len(readmes)} README(s) encontrados, compilando en paralelo...")
+    results = build_batch(readmes, args.template, args.build_dir, args.jobs,
+                          use_cache=not args.no_cache, dpi=args.dpi, reproducible=args.reproducible,
+                          strict=args.strict)
+    failed = [readme for readme, pdf in results.items() if pdf is None]
+    print(f"📄 Generados: {len(results) - len(failed)}, fallidos: {len(failed)}")
+    return 1 if failed else 0
+
 
-    render_latex("product_brief_template.tex", output_tex, data)
-    compile_pdf(output_tex)
-    clean_aux_files(f"build/{output_name}")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import hashlib
+import os
+
+# Resolución suficiente para impresión de capturas y fotos de placas
+PRINT_DPI = 200
+RASTER_EXTENSIONS = (".png", ".jpg", ".jpeg")
+# Cambiar si cambia la forma de reducir, para invalidar la caché
+CACHE_VERSION = "print-1"
+
+
+def hash_file(path):
+    digest = hashlib.sha256(CACHE_VERSION.encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def target_size(size, width_in=None, height_in=None, dpi=PRINT_DPI):
+    # Píxeles que necesita el ancho/alto impreso; None si la imagen ya cabe
+    width, height = size
+    scale = 1.0
+    if width_in:
+        scale = min(scale, width_in * dpi / width)
+    if height_in:
+        scale = min(scale, height_in * dpi / height)
+    if scale >= 1.0:
+        return None
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def prepare_image(path, cache_dir, width_in=None, height_in=None, dpi=PRINT_DPI):
+    # Devuelve una copia reducida a los DPI de impresión guardada en cache_dir,
+    # o la ruta original si no es raster, no existe o ya tiene la resolución justa
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in RASTER_EXTENSIONS or not os.path.isfile(path):
+        return path
+
+    from PIL import Image
+
+    digest = hash_file(path)
+    with Image.open(path) as image:
+        size = target_size(image.size, width_in, height_in, dpi)
+        if size is None:
+            return path
+
+        cached = os.path.join(cache_dir, f"{digest[:24]}-{size[0]}x{size[1]}{ext}")
+        if os.path.exists(cached):
+            return cached
+
+        image.load()
+        resized = image.resize(size, Image.LANCZOS)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Escritura atómica: varios procesos del batch comparten la caché
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        if ext == ".png":
+            resized.save(tmp, "PNG", optimize=True)
+        else:
+            if resized.mode not in ("RGB", "L"):
+                resized = resized.convert("RGB")
+            resized.save(tmp, "JPEG", quality=90, optimize=True)
+        os.replace(tmp, cached)
+    return cached
+
+
+def make_resolver(base_dir, cache_dir, dpi=PRINT_DPI):
+    # Función ref -> ruta para \includegraphics; las rutas del README y las
+    # de las copias reducidas son relativas a base_dir (cwd de pdflatex)
+    def resolve(ref, width_in=None, height_in=None):
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            return ref
+        source = os.path.join(base_dir, ref)
+        prepared = prepare_image(source, cache_dir, width_in, height_in, dpi)
+        if prepared == source:
+            return ref
+        return os.path.relpath(prepared, base_dir).replace(os.sep, '/')
+    return resolve
+
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Build incremental de la documentación Sphinx (HTML + LaTeX/PDF).
+
+A diferencia de `make pdfx`, que limpia y vuelve a leer todos los .rst dos
+veces, este script mantiene un caché persistente en .sphinx_cache/:
+
+- doctrees/ y el environment pickle se comparten entre el builder HTML y el
+  LaTeX, así los fuentes se leen una sola vez por ejecución;
+- html/ y latex/ conservan la salida anterior, así Sphinx solo vuelve a
+  escribir las páginas cuyos .rst o imágenes cambiaron;
+- las fechas de los fuentes cuyo contenido no cambió se restauran antes de
+  compilar, para que un checkout nuevo (CI) no invalide todo el caché;
+- la lectura y escritura usan -j (todos los núcleos por defecto) y el build
+  falla si alguna extensión cargada obliga a Sphinx a trabajar en serie;
+- con --reproducible (o SOURCE_DATE_EPOCH definido) las fechas del HTML y del
+  PDF salen del último commit de los fuentes, no de la hora del build.
+
+El resultado se publica igual que `make pdfx`: HTML en docs/ y el PDF en pdf/.
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+SPHINX_DIR = Path(__file__).resolve().parent
+SOURCE_DIR = SPHINX_DIR / "src" / "source"
+CACHE_DIR = SPHINX_DIR / ".sphinx_cache"
+DOCS_DIR = SPHINX_DIR / "docs"
+PDF_DIR = SPHINX_DIR / "pdf"
+
+# Manifiesto de hashes y fechas de los fuentes de la ejecución anterior
+SOURCES_MANIFEST = "sources.json"
+
+
+@contextmanager
+def stage(name, timings):
+    """Medir la duración de una etapa y reportarla"""
+    print(f"▶️  {name}...")
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings.append({'stage': name, 'seconds': round(elapsed, 3)})
+        print(f"⏱️  {name}: {elapsed:.2f} s")
+
+
+def hash_file(path):
+    """SHA-256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_source_files(source_dir):
+    """Archivos del proyecto Sphinx en orden estable (sin cachés de Python)"""
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            yield Path(root) / name
+
+
+def stabilize_mtimes(source_dir, cache_dir):
+    """Restaurar la fecha de los fuentes cuyo contenido no cambió
+
+    Sphinx decide qué releer comparando fechas de modificación. Tras un
+    checkout todas las fechas son nuevas, así que se guardan hash y fecha de
+    cada archivo y, si el hash coincide, se vuelve a poner la fecha anterior.
+    Devuelve (manifiesto nuevo, número de archivos cambiados).
+    """
+    manifest_path = cache_dir / SOURCES_MANIFEST
+    try:
+        previous = json.loads(manifest_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        previous = {}
+
+    manifest = {}
+    changed = 0
+    for path in iter_source_files(source_dir):
+        relative = path.relative_to(source_dir).as_posix()
+        stat = path.stat()
+        cached = previous.get(relative)
+
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            manifest[relative] = cached
+            continue
+
+        digest = hash_file(path)
+        if cached and cached['sha256'] == digest:
+            os.utime(path, ns=(stat.st_atime_ns, cached['mtime_ns']))
+            manifest[relative] = cached
+            continue
+
+        changed += 1
+        manifest[relative] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+
+    removed = len(set(previous) - set(manifest))
+    return manifest, changed + removed
+
+
+def save_sources_manifest(manifest, cache_dir):
+    """Guardar el manifiesto de fuentes después de un build exitoso"""
+    (cache_dir / SOURCES_MANIFEST).write_text(json.dumps(manifest, indent=1, sort_keys=True),
+                                              encoding='utf-8')
+
+
+def source_date_epoch(source_dir):
+    """SOURCE_DATE_EPOCH, o la fecha del último commit que tocó los fuentes"""
+    value = os.environ.get('SOURCE_DATE_EPOCH')
+    if value:
+        return int(value)
+    try:
+        result = subprocess.run(['git', 'log', '-1', '--format=%ct', '--', '.'], cwd=source_dir,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return int(result.stdout.strip()) if result.stdout.strip() else None
+
+
+def enable_reproducible(source_dir):
+    """Exportar la fecha fija para Sphinx (today, copyright) y pdfTeX (/CreationDate, \\today)"""
+    epoch = source_date_epoch(source_dir)
+    if epoch is None:
+        print("⚠️  Sin SOURCE_DATE_EPOCH ni historial de git, se usa la fecha actual")
+        return None
+    os.environ['SOURCE_DATE_EPOCH'] = str(epoch)
+    os.environ['FORCE_SOURCE_DATE'] = '1'
+    print(f"🕰️  Modo reproducible: SOURCE_DATE_EPOCH={epoch}")
+    return epoch
+
+
+def resolve_jobs(value):
+    """Convertir --jobs ('auto' o un número) en procesos para Sphinx"""
+    from sphinx.util.parallel import parallel_available
+
+    jobs = (os.cpu_count() or 1) if value == 'auto' else int(value)
+    if jobs > 1 and not parallel_available:
+        print("⚠️  Esta plataforma no soporta builds paralelos de Sphinx, se usa -j 1")
+        return 1
+    return max(jobs, 1)
+
+
+def serial_extensions(app):
+    """Extensiones que obligan a Sphinx a leer o escribir en serie
+
+    Mismo criterio que Sphinx.is_parallel_allowed(): una extensión sin
+    declarar parallel_*_safe cuenta como insegura.
+    """
+    unsafe = []
+    for name, ext in sorted(app.extensions.items()):
+        for kind in ('read', 'write'):
+            if not getattr(ext, f'parallel_{kind}_safe'):
+                unsafe.append(f"{name} ({kind})")
+    return unsafe
+
+
+def check_parallel(app, builder):
+    """Fallar si alguna extensión convierte el build -j en un build serial"""
+    unsafe = serial_extensions(app)
+    if unsafe:
+        raise RuntimeError(
+            f"❌ El builder '{builder}' no puede compilar en paralelo por estas extensiones: "
+            + ", ".join(unsafe)
+            + ". Cárgalas solo para el builder que las necesita en conf.py."
+        )
+
+
+def make_app(builder, outdir, doctreedir, quiet, jobs=1):
+    """Crear la aplicación Sphinx para un builder
+
+    SPHINX_BUILDER le dice a conf.py qué builder se va a usar, para que solo
+    cargue las extensiones que ese builder necesita.
+    """
+    from sphinx.application import Sphinx
+
+    os.environ['SPHINX_BUILDER'] = builder
+    return Sphinx(
+        srcdir=str(SOURCE_DIR),
+        confdir=str(SOURCE_DIR),
+        outdir=str(outdir),
+        doctreedir=str(doctreedir),
+        buildername=builder,
+        status=None if quiet else sys.stdout,
+        warning=sys.stderr,
+        freshenv=False,
+        parallel=jobs,
+    )
+
+
+def run_sphinx(builder, outdir, doctreedir, quiet, jobs=1):
+    """Ejecutar un builder de Sphinx en este mismo proceso
+
+    Todos los builders usan el mismo doctreedir, así el segundo reutiliza el
+    entorno que dejó el primero en lugar de volver a leer los .rst.
+    Devuelve el número de documentos que se leyeron.
+    """
+    from sphinx.util.docutils import docutils_namespace, patch_docutils
+
+    read_docs = []
+    # Igual que sphinx-build: cada app registra sus nodos y directivas en un
+    # espacio de docutils propio, así varios builders conviven en el proceso
+    with patch_docutils(SOURCE_DIR), docutils_namespace():
+        app = make_app(builder, outdir, doctreedir, quiet, jobs)
+        if jobs > 1:
+            check_parallel(app, builder)
+        app.connect('env-before-read-docs', lambda app, env, docnames: read_docs.extend(docnames))
+        app.build()
+    if app.statuscode:
+        raise RuntimeError(f"sphinx-build -b {builder} terminó con código {app.statuscode}")
+    return len(read_docs)
+
+
+def profile_builder_startup(builder):
+    """Medir el arranque de un builder: importación de cada extensión y app
+
+    Corre en un intérprete nuevo (spawn) para que ningún módulo venga ya
+    importado; cada tiempo es lo que esa extensión agrega al arranque.
+    """
+    from sphinx.util.docutils import docutils_namespace
+
+    os.environ['SPHINX_BUILDER'] = builder
+    start = time.perf_counter()
+    importlib.import_module('sphinx.application')
+    sphinx_import = time.perf_counter() - start
+
+    conf = runpy.run_path(str(SOURCE_DIR / "conf.py"))
+    extensions = []
+    for name in conf['extensions_for'](builder):
+        start = time.perf_counter()
+        importlib.import_module(name)
+        extensions.append({'extension': name, 'seconds': round(time.perf_counter() - start, 4)})
+
+    with tempfile.TemporaryDirectory() as tmp, docutils_namespace():
+        start = time.perf_counter()
+        make_app(builder, Path(tmp) / "out", Path(tmp) / "doctrees", quiet=True)
+        app_startup = time.perf_counter() - start
+
+    return {
+        'builder': builder,
+        'sphinx_import': round(sphinx_import, 4),
+        'extensions': extensions,
+        'app_startup': round(app_startup, 4),
+    }
+
+
+def profile_startup(builders):
+    """Reporte del costo de arranque de cada builder"""
+    spawn = multiprocessing.get_context('spawn')
+    profiles = []
+    for builder in builders:
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+            profile = executor.submit(profile_builder_startup, builder).result()
+        profiles.append(profile)
+
+        total = sum(item['seconds'] for item in profile['extensions'])
+        print(f"\n🚀 Arranque de '{builder}'")
+        print(f"   {'import sphinx':<32} {profile['sphinx_import'] * 1000:>8.1f} ms")
+        for item in sorted(profile['extensions'], key=lambda item: -item['seconds']):
+            print(f"   {item['extension']:<32} {item['seconds'] * 1000:>8.1f} ms")
+        print(f"   {'extensiones (total)':<32} {total * 1000:>8.1f} ms")
+        print(f"   {'Sphinx() listo':<32} {profile['app_startup'] * 1000:>8.1f} ms")
+    return profiles
+
+
+def mirror_tree(src, dst):
+    """Copiar src a dst escribiendo solo lo que cambió y borrando lo que sobra"""
+    copied = removed = 0
+    expected = set()
+    for root, dirs, files in os.walk(src):
+        relative_root = Path(root).relative_to(src)
+        (dst / relative_root).mkdir(parents=True, exist_ok=True)
+        expected.add(relative_root)
+        for name in files:
+            relative = relative_root / name
+            expected.add(relative)
+            target = dst / relative
+            source = Path(root) / name
+            if target.is_file() and target.stat().st_size == source.stat().st_size \
+                    and hash_file(target) == hash_file(source):
+                continue
+            shutil.copy2(source, target)
+            copied += 1
+
+    for root, dirs, files in os.walk(dst, topdown=False):
+        relative_root = Path(root).relative_to(dst)
+        for name in files:
+            if relative_root / name not in expected:
+                (Path(root) / name).unlink()
+                removed += 1
+        if relative_root not in expected:
+            Path(root).rmdir()
+    return copied, removed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build incremental de la documentación Sphinx")
+    parser.add_argument('--no-pdf', action='store_true', help="solo generar HTML")
+    parser.add_argument('--clean', action='store_true', help="borrar el caché antes de compilar")
+    parser.add_argument('--quiet', '-q', action='store_true', help="ocultar la salida de Sphinx")
+    parser.add_argument('--jobs', '-j', default='auto',
+                        help="procesos para leer y escribir ('auto' = todos los núcleos)")
+    parser.add_argument('--check-parallel', action='store_true',
+                        help="solo verificar que html y latex pueden compilar en paralelo")
+    parser.add_argument('--profile-startup', nargs='*', metavar='BUILDER',
+                        help="medir el tiempo de importación de cada extensión por builder "
+                             "(por defecto html, latex y pdf)")
+    parser.add_argument('--reproducible', action='store_true',
+                        help="fechas del último commit de los fuentes en lugar de la hora del build "
+                             "(activo si SOURCE_DATE_EPOCH está definido)")
+    parser.add_argument('--timings', metavar='FILE',
+                        help="guardar la duración de cada etapa en un archivo JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timings = []
+    jobs = resolve_jobs(args.jobs)
+
+    if args.clean and CACHE_DIR.exists():
+        shutil.rmtree(CACHE_DIR)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    doctrees = CACHE_DIR / "doctrees"
+    html_dir = CACHE_DIR / "html"
+    latex_dir = CACHE_DIR / "latex"
+
+    if args.profile_startup is not None:
+        profiles = profile_startup(args.profile_startup or ['html', 'latex', 'pdf'])
+        if args.timings:
+            Path(args.timings).write_text(json.dumps({'startup': profiles}, indent=2), encoding='utf-8')
+        return 0
+
+    if args.check_parallel:
+        from sphinx.util.docutils import docutils_namespace
+
+        for builder, outdir in (('html', html_dir), ('latex', latex_dir)):
+            with docutils_namespace():
+                check_parallel(make_app(builder, outdir, doctrees, quiet=True, jobs=2), builder)
+            print(f"✅ {builder}: todas las extensiones son seguras para -j")
+        return 0
+
+    if args.reproducible or os.environ.get('SOURCE_DATE_EPOCH'):
+        enable_reproducible(SOURCE_DIR)
+
+    with stage("fuentes", timings):
+        manifest, changed = stabilize_mtimes(SOURCE_DIR, CACHE_DIR)
+        print(f"   📝 Archivos fuente nuevos o modificados: {changed}")
+
+    with stage("html", timings):
+        read = run_sphinx('html', html_dir, doctrees, args.quiet, jobs)
+        print(f"   📖 Documentos leídos: {read}")
+
+    pdfs = sorted(latex_dir.glob("*.pdf"))
+    if not args.no_pdf:
+        if changed == 0 and pdfs:
+            print("♻️  Fuentes sin cambios, se reutiliza el PDF anterior")
+        else:
+            with stage("latex", timings):
+                run_sphinx('latex', latex_dir, doctrees, args.quiet, jobs)
+            with stage("pdf", timings):
+                subprocess.run(['make', '-C', str(latex_dir), 'all-pdf'], check=True,
+                               stdout=subprocess.DEVNULL if args.quiet else None)
+            pdfs = sorted(latex_dir.glob("*.pdf"))
+
+    with stage("publicar", timings):
+        copied, removed = mirror_tree(html_dir, DOCS_DIR)
+        (DOCS_DIR / ".nojekyll").touch()
+        print(f"   📁 docs/: {copied} copiados, {removed} eliminados")
+        if not args.no_pdf:
+            PDF_DIR.mkdir(exist_ok=True)
+            for pdf in pdfs:
+                shutil.copy2(pdf, PDF_DIR / pdf.name)
+                print(f"   📄 {PDF_DIR / pdf.name}")
+
+    save_sources_manifest(manifest, CACHE_DIR)
+
+    total = sum(item['seconds'] for item in timings)
+    print("\n⏱️  Tiempos por etapa:")
+    for item in timings:
+        print(f"   {item['stage']:<10} {item['seconds']:>8.2f} s")
+    print(f"   {'total':<10} {total:>8.2f} s")
+
+    if args.timings:
+        Path(args.timings).write_text(json.dumps({'stages': timings, 'total': round(total, 3)}, indent=2),
+                                      encoding='utf-8')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
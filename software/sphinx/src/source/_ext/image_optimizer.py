@@ -0,0 +1,302 @@
+"""
+Optimización de imágenes de la salida HTML de Sphinx.
+
+Al terminar un build HTML recorre _images/ y _static/ y:
+
+- agrupa las imágenes idénticas por SHA-256 y procesa cada contenido una vez;
+- recomprime los PNG sin pérdida (solo si el resultado es más chico);
+- genera WebP a tamaño completo y variantes más angostas para `srcset`;
+- reescribe los <img> del HTML con `srcset`/`sizes` y hace que las copias
+  duplicadas de _images/ apunten a una sola imagen.
+
+Los resultados se guardan en un caché por hash de contenido, así una imagen
+que no cambió no se vuelve a procesar en el siguiente build.
+"""
+
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sphinx.util import logging
+
+logger = logging.getLogger(__name__)
+
+RASTER_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
+# Subcarpeta de _images/ con las variantes WebP generadas
+VARIANTS_DIR = "opt"
+# Cambiar al modificar el procesamiento invalida el caché
+CACHE_VERSION = 2
+
+IMG_TAG_RE = re.compile(r'<img\b[^>]*>')
+SRC_ATTR_RE = re.compile(r'\bsrc="([^"]+)"')
+LINK_ATTR_RE = re.compile(r'\b(src|href)="([^"#?]+)"')
+# Ancho con que se muestra la imagen: atributo width o width del style
+WIDTH_ATTR_RE = re.compile(r'\swidth="([^"]+)"')
+STYLE_WIDTH_RE = re.compile(r'\sstyle="[^"]*?(?<![-\w])width:\s*([^;"]+)')
+LENGTH_RE = re.compile(r'([\d.]+)\s*(px|%)?$')
+
+
+def hash_file(path):
+    """SHA-256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_images(outdir):
+    """Imágenes raster publicadas en _images/ y _static/"""
+    images = []
+    for folder in ('_images', '_static'):
+        root = outdir / folder
+        for dirpath, dirnames, filenames in os.walk(root):
+            if Path(dirpath) == root and folder == '_images':
+                dirnames[:] = [d for d in dirnames if d != VARIANTS_DIR]
+            for name in filenames:
+                if Path(name).suffix.lower() in RASTER_EXTENSIONS:
+                    images.append(Path(dirpath) / name)
+    return sorted(images)
+
+
+def encode(image, fmt, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def optimize_image(source, digest, entry_dir, widths):
+    """Procesar un contenido y guardar el resultado en su carpeta del caché
+
+    Devuelve la metadata: hash y ancho original, si hay un original
+    recomprimido y la lista de variantes WebP (ancho, archivo).
+    """
+    from PIL import Image
+
+    entry_dir.mkdir(parents=True, exist_ok=True)
+    original_size = source.stat().st_size
+    lossless = source.suffix.lower() == '.png'
+    meta = {'version': CACHE_VERSION, 'sha256': digest, 'widths': widths, 'optimized': None,
+            'variants': []}
+
+    with Image.open(source) as image:
+        image.load()
+        width = image.width
+        meta['width'] = width
+        if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        if lossless:
+            data = encode(image, 'PNG', optimize=True)
+            if len(data) < original_size:
+                (entry_dir / "optimized.png").write_bytes(data)
+                meta['optimized'] = "optimized.png"
+                meta['optimized_sha256'] = hashlib.sha256(data).hexdigest()
+                original_size = len(data)
+
+        for target in sorted({w for w in widths if w < width} | {width}):
+            # Tamaño completo sin pérdida para PNG; las variantes reducidas
+            # ya son una aproximación, así que van con calidad 85
+            if target == width:
+                resized = image
+                options = {'lossless': True} if lossless else {'quality': 85}
+            else:
+                resized = image.resize((target, max(1, round(image.height * target / width))),
+                                       Image.LANCZOS)
+                options = {'quality': 85}
+            data = encode(resized, 'WEBP', **options)
+            # El WebP a tamaño completo solo vale la pena si pesa menos
+            if target == width and len(data) >= original_size:
+                continue
+            name = f"{target}.webp"
+            (entry_dir / name).write_bytes(data)
+            meta['variants'].append([target, name])
+
+    (entry_dir / "meta.json").write_text(json.dumps(meta), encoding='utf-8')
+    return meta
+
+
+def cached_optimize(source, digest, cache_dir, widths):
+    """Leer el resultado del caché o procesar la imagen si no está"""
+    entry_dir = cache_dir / digest
+    try:
+        meta = json.loads((entry_dir / "meta.json").read_text(encoding='utf-8'))
+        if meta['version'] == CACHE_VERSION and meta['widths'] == widths:
+            return meta, True
+    except (OSError, ValueError, KeyError):
+        pass
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    meta = optimize_image(source, digest, entry_dir, widths)
+
+    # El PNG recomprimido queda en la salida; si Sphinx no lo vuelve a copiar,
+    # el siguiente build lo encuentra por su propio hash
+    if meta['optimized']:
+        alias_dir = cache_dir / meta['optimized_sha256']
+        if not alias_dir.exists():
+            shutil.copytree(entry_dir, alias_dir, ignore=shutil.ignore_patterns(meta['optimized']))
+            alias = dict(meta, optimized=None)
+            (alias_dir / "meta.json").write_text(json.dumps(alias), encoding='utf-8')
+    return meta, False
+
+
+def rendered_sizes(tag, width):
+    """Valor de `sizes` según el ancho con que se muestra la imagen
+
+    Sin ancho explícito la imagen ocupa a lo sumo el viewport y su ancho
+    natural. Con :width: o :scale: se usa ese ancho (px) o esa fracción del
+    viewport (%), que acota la del contenedor. Con otras unidades no se puede
+    saber el ancho en píxeles y se devuelve None (sin `sizes`).
+    """
+    match = STYLE_WIDTH_RE.search(tag) or WIDTH_ATTR_RE.search(tag)
+    if not match:
+        return f"(max-width: {width}px) 100vw, {width}px"
+    length = LENGTH_RE.match(match.group(1).strip())
+    if not length:
+        return None
+    value, unit = float(length.group(1)), length.group(2) or 'px'
+    if value <= 0:
+        return None
+    if unit == 'px':
+        return f"{min(math.ceil(value), width)}px"
+    # p% del viewport llega al ancho natural cuando el viewport mide width * 100 / p
+    percent = min(value, 100)
+    return f"(max-width: {math.ceil(width * 100 / percent)}px) {percent:g}vw, {width}px"
+
+
+def relative_url(target, html_file, outdir):
+    return os.path.relpath(outdir / target, html_file.parent).replace(os.sep, '/')
+
+
+def rewrite_html(html_file, outdir, images, redirects):
+    """Agregar srcset a los <img> y apuntar los duplicados al canónico"""
+    text = html_file.read_text(encoding='utf-8')
+
+    def resolve(url):
+        if '://' in url or url.startswith(('data:', '/')):
+            return None
+        target = os.path.normpath(html_file.parent / url)
+        return Path(os.path.relpath(target, outdir)).as_posix()
+
+    def redirect(match):
+        attr, url = match.groups()
+        target = resolve(url)
+        if target in redirects:
+            return f'{attr}="{relative_url(redirects[target], html_file, outdir)}"'
+        return match.group(0)
+
+    def add_srcset(match):
+        tag = match.group(0)
+        src = SRC_ATTR_RE.search(tag)
+        if ' srcset=' in tag or not src:
+            return tag
+        info = images.get(resolve(src.group(1)))
+        if not info or not info['srcset']:
+            return tag
+        srcset = ", ".join(f"{relative_url(path, html_file, outdir)} {w}w" for w, path in info['srcset'])
+        sizes = rendered_sizes(tag, info['width'])
+        sizes = f' sizes="{sizes}"' if sizes else ''
+        end = -2 if tag.endswith('/>') else -1
+        return f'{tag[:end].rstrip()} srcset="{srcset}"{sizes}{tag[end:]}'
+
+    updated = LINK_ATTR_RE.sub(redirect, text) if redirects else text
+    updated = IMG_TAG_RE.sub(add_srcset, updated)
+    if updated != text:
+        html_file.write_text(updated, encoding='utf-8')
+        return True
+    return False
+
+
+def optimize_output(app, exception):
+    if exception is not None or app.builder.format != 'html':
+        return
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        logger.warning("image_optimizer: Pillow no está instalado, se omite la optimización")
+        return
+
+    outdir = Path(app.outdir)
+    cache_dir = Path(app.config.image_optimizer_cache or Path(app.doctreedir).parent / "image_cache")
+    widths = sorted(app.config.image_optimizer_widths)
+    variants_dir = outdir / "_images" / VARIANTS_DIR
+    variants_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = find_images(outdir)
+    workers = app.parallel or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        digests = list(executor.map(hash_file, paths))
+
+    groups = {}
+    for path, digest in zip(paths, digests):
+        groups.setdefault(digest, []).append(path)
+
+    def process(digest):
+        copies = groups[digest]
+        return digest, cached_optimize(copies[0], digest, cache_dir, widths)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = dict(executor.map(process, groups))
+
+    images = {}
+    redirects = {}
+    saved = reused = removed = 0
+    for digest, copies in groups.items():
+        meta, hit = results[digest]
+        reused += hit
+        entry_dir = cache_dir / digest
+
+        if meta['optimized']:
+            optimized = entry_dir / meta['optimized']
+            for copy in copies:
+                saved += copy.stat().st_size - optimized.stat().st_size
+                shutil.copyfile(optimized, copy)
+
+        srcset = []
+        for w, name in meta['variants']:
+            # Nombre según el contenido original: el alias del PNG recomprimido
+            # comparte variantes con él
+            variant = variants_dir / f"{meta['sha256'][:16]}-{name}"
+            if not variant.exists():
+                shutil.copyfile(entry_dir / name, variant)
+            srcset.append((w, variant.relative_to(outdir).as_posix()))
+
+        # El canónico es la primera copia en _images/ (o la primera en _static/)
+        in_images = [c for c in copies if c.relative_to(outdir).parts[0] == '_images']
+        canonical = (in_images or copies)[0].relative_to(outdir).as_posix()
+        for copy in copies:
+            relative = copy.relative_to(outdir).as_posix()
+            images[relative] = {'width': meta['width'], 'srcset': srcset}
+            # Solo _images/ es de Sphinx; _static/ puede tener enlaces externos
+            if copy in in_images and relative != canonical:
+                redirects[relative] = canonical
+                saved += copy.stat().st_size
+                copy.unlink()
+                removed += 1
+
+    # Variantes de contenidos que ya no existen
+    live = {Path(path).name for info in images.values() for _, path in info['srcset']}
+    for variant in variants_dir.iterdir():
+        if variant.name not in live:
+            variant.unlink()
+
+    rewritten = sum(rewrite_html(html_file, outdir, images, redirects)
+                    for html_file in outdir.rglob("*.html"))
+
+    logger.info(
+        f"image_optimizer: {len(paths)} imágenes, {len(groups)} únicas "
+        f"({reused} desde caché), {removed} duplicados eliminados, "
+        f"{saved / 1024:.0f} KB ahorrados, {rewritten} páginas reescritas"
+    )
+
+
+def setup(app):
+    app.add_config_value('image_optimizer_widths', [480, 960, 1440], 'html')
+    app.add_config_value('image_optimizer_cache', None, 'html')
+    app.connect('build-finished', optimize_output)
+    return {'parallel_read_safe': True, 'parallel_write_safe': True}
@@ -0,0 +1,92 @@
+"""
+Imágenes reducidas a la resolución de impresión para la salida LaTeX.
+
+Sphinx copia las imágenes originales al directorio latex/ y pdflatex las
+incrusta tal cual en el PDF. Al terminar el build LaTeX esta extensión lee
+el ancho impreso de cada `\\sphinxincludegraphics` del .tex y reemplaza la
+copia por una versión remuestreada a `latex_images_dpi`.
+
+El remuestreo y su caché por hash de contenido son los de
+software/documentation/print_images.py, el mismo paso que usa
+generate_pdf.py para los product briefs.
+"""
+
+import re
+import shutil
+from pathlib import Path
+
+from sphinx.util import logging
+
+from print_images import PRINT_DPI, prepare_image
+
+logger = logging.getLogger(__name__)
+
+# \sphinxincludegraphics[width=0.600\linewidth]{{top_r}.png}
+INCLUDE_RE = re.compile(r'\\sphinxincludegraphics(?:\[([^\]]*)\])?\{\{([^}]*)\}(\.[A-Za-z]+)\}')
+RELATIVE_WIDTH_RE = re.compile(r'width=([\d.]+)\\(?:linewidth|textwidth)')
+PX_WIDTH_RE = re.compile(r'width=([\d.]+)\\sphinxpxdimen')
+# \sphinxpxdimen vale 1/96 de pulgada por defecto
+PX_PER_INCH = 96
+
+
+def printed_width(options, linewidth_in):
+    """Ancho impreso en pulgadas; sin ancho explícito Sphinx limita a \\linewidth"""
+    options = options or ''
+    match = RELATIVE_WIDTH_RE.search(options)
+    if match:
+        return float(match.group(1)) * linewidth_in
+    match = PX_WIDTH_RE.search(options)
+    if match:
+        return min(float(match.group(1)) / PX_PER_INCH, linewidth_in)
+    return linewidth_in
+
+
+def collect_widths(outdir, linewidth_in):
+    """Ancho máximo con el que se imprime cada imagen en los .tex"""
+    widths = {}
+    for tex in outdir.glob("*.tex"):
+        for options, name, ext in INCLUDE_RE.findall(tex.read_text(encoding='utf-8')):
+            filename = name + ext
+            widths[filename] = max(widths.get(filename, 0), printed_width(options, linewidth_in))
+    return widths
+
+
+def downscale_output(app, exception):
+    if exception is not None or app.builder.format != 'latex':
+        return
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        logger.warning("latex_images: Pillow no está instalado, se usan las imágenes originales")
+        return
+
+    outdir = Path(app.outdir)
+    cache_dir = Path(app.config.latex_images_cache or Path(app.doctreedir).parent / "print_images")
+    dpi = app.config.latex_images_dpi
+    widths = collect_widths(outdir, app.config.latex_images_linewidth)
+
+    before = after = replaced = 0
+    for filename, width_in in sorted(widths.items()):
+        image = outdir / filename
+        if not image.is_file():
+            continue
+        prepared = Path(prepare_image(str(image), str(cache_dir), width_in=width_in, dpi=dpi))
+        before += image.stat().st_size
+        if prepared != image:
+            shutil.copyfile(prepared, image)
+            replaced += 1
+        after += image.stat().st_size
+
+    logger.info(
+        f"latex_images: {replaced} de {len(widths)} imágenes reducidas a {dpi} DPI "
+        f"({before / 1024:.0f} KB -> {after / 1024:.0f} KB)"
+    )
+
+
+def setup(app):
+    app.add_config_value('latex_images_dpi', PRINT_DPI, '')
+    # Ancho de texto de la clase por defecto (carta, márgenes de 1in)
+    app.add_config_value('latex_images_linewidth', 6.5, '')
+    app.add_config_value('latex_images_cache', None, '')
+    app.connect('build-finished', downscale_output)
+    return {'parallel_read_safe': True, 'parallel_write_safe': True}
@@ -10,11 +10,18 @@
 import os
 import sys
 sys.path.insert(0, os.path.abspath('.'))
+# Extensiones locales del proyecto
+sys.path.insert(0, os.path.abspath('_ext'))
+# print_images.py (reducción de imágenes para PDF) se comparte con generate_pdf.py
+sys.path.insert(0, os.path.abspath(os.path.join('..', '..', '..', 'documentation')))
 
 project = 'UNIT PULSAR H2'
 copyright = '2024, Unit Electronics'
 author = 'Cesar Bautista'
 release = '0.0.1'
+# Extensiones que aportan directivas, roles o datos del entorno a los .rst:
+# las necesitan todos los builders y deben ser las mismas para que html y
+# latex compartan los doctrees (viewcode declara env_version)
 extensions = [
     'sphinx.ext.autodoc',
     'sphinx.ext.viewcode',
@@ -22,20 +29,69 @@ extensions = [
     'sphinx.ext.doctest',
     'sphinx.ext.intersphinx',
     'sphinx.ext.todo',
-    'sphinx.ext.coverage',
-    'sphinx.ext.mathjax',
     'sphinx.ext.ifconfig',
-    'sphinx.ext.githubpages',
     'sphinx_togglebutton',
-    'rst2pdf.pdfbuilder',
     'sphinx_tabs.tabs',
-    'sphinx_copybutton',  # Add this extension
+]
 
+# Extensiones que solo afectan la salida de un builder; se cargan en setup() para no
+# cambiar `extensions` (Sphinx volvería a leer todo el entorno)
+builder_extensions = {
+    'html': [
+        'sphinx.ext.mathjax',
+        'sphinx.ext.githubpages',
+        'sphinx_copybutton',  # Add this extension
+        'image_optimizer',
+    ],
+    'latex': ['latex_images'],
+}
+# Builders que vienen de una extensión: Sphinx busca el builder antes de
+# llamar a setup(), así que esa extensión sí va en `extensions`.
+# rst2pdf además declara parallel_write_safe = False: cargarlo siempre
+# obligaría a escribir en serie también el HTML.
+builder_providers = {
+    'pdf': 'rst2pdf.pdfbuilder',
+    'coverage': 'sphinx.ext.coverage',
+}
+# Builders que usan el mismo conjunto que otro
+builder_aliases = {
+    'dirhtml': 'html',
+    'singlehtml': 'html',
+    'latexpdf': 'latex',
+    'latexpdfja': 'latex',
+}
 
-]
+
+def current_builder():
+    # Builder pedido: SPHINX_BUILDER (lo define build_docs.py) o -b/-M de sphinx-build
+    builder = os.environ.get('SPHINX_BUILDER')
+    if builder:
+        return builder
+    argv = sys.argv[1:]
+    for i, arg in enumerate(argv):
+        if arg in ('-b', '-M', '--builder') and i + 1 < len(argv):
+            return argv[i + 1]
+        if arg.startswith('-b') and len(arg) > 2:
+            return arg[2:]
+    return 'html'
+
+
+def extensions_for(builder):
+    # Extensiones que carga un builder, en el orden en que Sphinx las importa
+    builder = builder_aliases.get(builder, builder)
+    common = [name for name in extensions if name not in builder_providers.values()]
+    provider = [builder_providers[builder]] if builder in builder_providers else []
+    return common + provider + builder_extensions.get(builder, [])
+
+
+if current_builder() in builder_providers:
+    extensions.append(builder_providers[current_builder()])
 copybutton_prompt_text = ">>> "  # Removes prompts from code blocks
 copybutton_only_copy_prompt_lines = False  # Copies all lines, including those without a prompt
 
+# image_optimizer: anchos de las variantes WebP para srcset
+image_optimizer_widths = [480, 960, 1440]
+
 
 templates_path = ['_templates']
 html_theme_options = {
@@ -60,3 +116,9 @@ html_css_files = [
 
 # PDF configuration
 pdf_documents = [('index', 'unit_pulsar_h2', 'UNIT PULSAR H2 Documentation', 'Unit Electronics')]
+
+
+def setup(app):
+    builder = builder_aliases.get(current_builder(), current_builder())
+    for name in builder_extensions.get(builder, []):
+        app.setup_extension(name)